@@ -1,11 +1,14 @@
 import argparse
 import curses
 
+from .frontier import SolveFrontier
 from .objects.blacklistaction import BlacklistAction
 from .objects.bonemarketargumentparser import BoneMarketArgumentParser
 from .objects.enumaction import EnumAction
 from .objects.listaction import ListAction
+from .presets import PRESETS_FILE
 from .solve import *
+from .sweep import SolveShadowySweep
 
 parser = BoneMarketArgumentParser(
         prog='Bone Market Solver',
@@ -68,14 +71,34 @@ skeleton_parameters = parser.add_argument_group(
         "Parameters that determine what you want the solver to produce"
         )
 
-skeleton_parameters.add_argument(
+shadowy = skeleton_parameters.add_mutually_exclusive_group(required=True)
+
+shadowy.add_argument(
         "-s", "--shadowy",
         type=int,
-        required=True,
         help="the effective level of Shadowy used for selling to buyers",
         dest='shadowy_level'
         )
 
+def ShadowyRange(string):
+    try:
+        start, stop, step = (lambda bounds : (*bounds, 1) if len(bounds) == 2 else bounds)([int(bound) for bound in string.split(":")])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{string!r} is not of the form START:STOP or START:STOP:STEP")
+
+    if step <= 0 or start > stop:
+        raise argparse.ArgumentTypeError(f"{string!r} does not contain any levels")
+
+    return range(start, stop + 1, step)
+
+shadowy.add_argument(
+        "--shadowy-sweep",
+        type=ShadowyRange,
+        help="solve for every level of Shadowy from START to STOP inclusive, in increments of STEP (default: 1), and print the levels at which the best skeleton changes",
+        metavar="START:STOP[:STEP]",
+        dest='shadowy_sweep'
+        )
+
 skeleton_parameters.add_argument(
         "-b", "--buyer", "--desired-buyer",
         action=EnumAction,
@@ -129,6 +152,27 @@ solver_options.add_argument(
         dest='time_limit'
         )
 
+solver_options.add_argument(
+        "--deterministic-time",
+        type=float,
+        help="maximum number of deterministic seconds that the solver runs for, which measures work done and is the same on every machine",
+        dest='deterministic_time'
+        )
+
+solver_options.add_argument(
+        "--seed",
+        type=int,
+        help="random seed for the solver, so that repeated runs search the same way",
+        dest='random_seed'
+        )
+
+solver_options.add_argument(
+        "--interleave-search",
+        action=argparse.BooleanOptionalAction,
+        help="whether search workers should take turns instead of running freely, which makes results repeatable with several workers (default: false)",
+        dest='interleave_search'
+        )
+
 solver_options.add_argument(
         "-w", "--workers",
         type=int,
@@ -137,10 +181,111 @@ solver_options.add_argument(
         )
 
 
+solver_options.add_argument(
+        "--prune-dominated",
+        action=argparse.BooleanOptionalAction,
+        help="whether skulls and appendages that are never better than another option should be excluded before solving (default: true)",
+        dest='prune_dominated'
+        )
+
+solver_options.add_argument(
+        "--cost-tables",
+        action=argparse.BooleanOptionalAction,
+        help="whether the costs of adding joints and segments should be looked up in precomputed tables instead of calculated (default: false)",
+        dest='cost_tables'
+        )
+
+solver_options.add_argument(
+        "--precheck",
+        action=argparse.BooleanOptionalAction,
+        help="whether combinations of torso, declaration, and buyer that can never be satisfied should be ruled out before solving (default: true)",
+        dest='precheck'
+        )
+
+solver_options.add_argument(
+        "--search-strategy",
+        choices=SEARCH_STRATEGIES,
+        help="whether to search in the order a skeleton is built, either exclusively (fixed) or alternating with other strategies (portfolio) (default: default)",
+        dest='search_strategy'
+        )
+
+solver_options.add_argument(
+        "--value-heuristic",
+        choices=VALUE_HEURISTICS.keys(),
+        help="which number of each skull and appendage to try first when searching in build order (default: min)",
+        dest='value_heuristic'
+        )
+
+solver_options.add_argument(
+        "--preset",
+        help="name of a preset of solver parameters, as saved by `python -m bonemarketsolver.tuning`",
+        dest='preset'
+        )
+
+solver_options.add_argument(
+        "--presets-file",
+        help=f"file to load presets from, falling back to the presets shipped with the package (default: {PRESETS_FILE})",
+        dest='presets_file'
+        )
+
+solver_options.add_argument(
+        "--profile-memory",
+        action=argparse.BooleanOptionalAction,
+        help="whether to report the memory used to build the model, its size, and the peak memory used while solving (default: false)",
+        dest='profile_memory'
+        )
+
+solver_options.add_argument(
+        "--greedy-hint",
+        action=argparse.BooleanOptionalAction,
+        help="whether to build a skeleton greedily before solving, showing it straight away and hinting the solver with it (default: true)",
+        dest='greedy_hint'
+        )
+
+solver_options.add_argument(
+        "-p", "--processes",
+        type=int,
+        help="number of processes used to solve independent parts of a sweep in parallel (default: one process per available CPU thread)",
+        dest='processes'
+        )
+
+
+solver_modes = parser.add_argument_group(
+        "solver modes",
+        "Alternatives to devising a single skeleton"
+        )
+
+solver_modes.add_argument(
+        "--frontier",
+        choices=('margin', 'profit'),
+        help="solve for every exhaustion cap and print the skeletons that form the Pareto frontier of profit margin or absolute profit against exhaustion",
+        dest='frontier'
+        )
+
+
 args = parser.parse_args()
 
 arguments = vars(args)
 
+if 'frontier' in arguments or 'shadowy_sweep' in arguments:
+    for option in ('profile_memory', 'greedy_hint'):
+        if arguments.pop(option, False):
+            parser.error(f"argument --{option.replace('_', '-')}: only available when devising a single skeleton")
+
+if 'frontier' in arguments:
+    if 'shadowy_sweep' in arguments:
+        parser.error("argument --frontier: not allowed with argument --shadowy-sweep")
+    arguments.pop('verbose', None)
+    print(SolveFrontier(objective=arguments.pop('frontier'), **arguments))
+    parser.exit()
+
+arguments.pop('processes', None)
+
+if 'shadowy_sweep' in arguments:
+    arguments.pop('verbose', None)
+    print(SolveShadowySweep(shadowy_levels=arguments.pop('shadowy_sweep'), **arguments))
+    parser.exit()
+
 if not arguments.pop('verbose', False):
     def WrappedSolve(stdscr, arguments):
         # Prevents crash if window is too small to fit text
@@ -150,4 +295,4 @@ if not arguments.pop('verbose', False):
         return Solve(**arguments)
     print(curses.wrapper(WrappedSolve, arguments))
 else:
-    print(Solve(**arguments))
+    print(Solve(**arguments, on_greedy=lambda greedy : print(f"Greedy skeleton:\n{greedy}\n")))
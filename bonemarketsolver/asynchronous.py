@@ -0,0 +1,93 @@
+"""Solve without blocking an asyncio event loop, receiving each improving skeleton as it is found."""
+
+__all__ = ['SolveAsync']
+__author__ = "Jeremy Saklad"
+
+import asyncio
+from os import cpu_count
+
+from ortools.sat.python import cp_model
+
+from .presets import PRESETS_FILE, ApplyParameters, LoadPreset
+from .result import SolveResult
+from .solve import AddSearchStrategy, CreateModel, NewSolver
+
+class _SolutionForwarder(cp_model.CpSolverSolutionCallback):
+    """A callback that passes each solution from the solver thread to a queue on the event loop."""
+
+    __slots__ = 'this', '__actions', '__qualities', '__loop', '__queue'
+
+    def __init__(self, actions, qualities, loop, queue):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__actions = actions
+        self.__qualities = qualities
+        self.__loop = loop
+        self.__queue = queue
+
+    def OnSolutionCallback(self):
+        solution = SolveResult.FromResponse(self.Response(), self.__actions, self.__qualities, 'FEASIBLE')
+
+        # Queues are not thread-safe, so the put happens on the loop's own thread
+        self.__loop.call_soon_threadsafe(self.__queue.put_nowait, solution)
+
+
+async def SolveAsync(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = float('inf'), workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False, blacklist = [], prune_dominated = True, cost_tables = False, precheck = True, search_strategy = 'default', value_heuristic = 'min', preset = None, presets_file = PRESETS_FILE, executor = None):
+    """Asynchronously iterate over each improving skeleton, as a SolveResult.
+
+The model is built and solved on a thread of `executor` (by default, the event loop's default executor), so the event loop is never blocked. Each skeleton is reported as FEASIBLE while the search continues. Once the search ends, the best skeleton is yielded once more with the final status and bound, so the last result shows whether it was proved optimal. If the iteration is cancelled or abandoned, the search is stopped and its thread is released before this returns.
+
+Raises RuntimeError if there is no satisfactory skeleton."""
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def Build():
+        model, actions, qualities = CreateModel(
+                shadowy_level = shadowy_level,
+                bone_market_fluctuations = bone_market_fluctuations,
+                zoological_mania = zoological_mania,
+                occasional_buyer = occasional_buyer,
+                diplomat_fascination = diplomat_fascination,
+                desired_buyers = desired_buyers,
+                maximum_cost = maximum_cost,
+                maximum_exhaustion = maximum_exhaustion,
+                blacklist = blacklist,
+                prune_dominated = prune_dominated,
+                cost_tables = cost_tables,
+                precheck = precheck,
+                )
+
+        solver = NewSolver(time_limit, workers, deterministic_time, random_seed, interleave_search)
+
+        if preset is not None:
+            ApplyParameters(solver, LoadPreset(preset, presets_file))
+
+        AddSearchStrategy(model, actions, solver, search_strategy, value_heuristic)
+
+        return model, actions, qualities, solver
+
+    model, actions, qualities, solver = await loop.run_in_executor(executor, Build)
+
+    search = loop.run_in_executor(executor, solver.Solve, model, _SolutionForwarder(actions, qualities, loop, queue))
+
+    # Wakes the iteration once the search is over, after any solutions it queued
+    search.add_done_callback(lambda _ : queue.put_nowait(None))
+
+    try:
+        while (solution := await queue.get()) is not None:
+            yield solution
+
+        # Skeletons are reported before the search knows whether they are optimal, so the best is reported again with the final status and bound
+        if search.result() in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            yield SolveResult.FromResponse(solver.ResponseProto(), actions, qualities)
+    finally:
+        if not search.done():
+            solver.StopSearch()
+
+            # The solver thread must not outlive the iteration, even if it is being cancelled
+            await asyncio.shield(search)
+
+    if search.result() == cp_model.INFEASIBLE:
+        raise RuntimeError("There is no satisfactory skeleton.")
+    elif search.result() == cp_model.MODEL_INVALID:
+        raise RuntimeError(f"Unknown status returned: {solver.StatusName()}.")
@@ -0,0 +1,168 @@
+"""Evaluate many candidate skeletons at once using vectorized NumPy arithmetic."""
+
+__all__ = ['ACTIONS', 'BatchEvaluation', 'EvaluateBatch']
+__author__ = "Jeremy Saklad"
+
+from dataclasses import dataclass
+from typing import Final
+
+import numpy as np
+
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.costs import Cost
+from .data.declarations import Declaration
+from .data.skulls import Skull
+from .data.torsos import Torso
+from .evaluate import BUYER_FORMULAS, COEFFICIENTS, DECLARATION_REQUIREMENTS, LINEAR_TERMS, POWERS
+from .solve import DIFFICULTY_SCALER, HOLY_RELIC_COUNTER_CHURCH, MAXIMUM_ATTRIBUTE, PROFIT_MARGIN_MULTIPLIER, SKELETON_TYPES, AddJointsAmberCost, AddSegmentsBrassCost
+
+# The action represented by each column of a batch, in the same order as the actions of CreateModel
+ACTIONS: Final = tuple(COEFFICIENTS)
+
+# Each action's contribution to every linear term, with buyers excluded since every buyer is evaluated separately
+_COEFFICIENT_MATRIX: Final = np.array([COEFFICIENTS[action] if not isinstance(action, Buyer) else (0,)*len(LINEAR_TERMS) for action in ACTIONS], dtype=np.int64)
+
+_COLUMNS: Final = {action: column for column, action in enumerate(ACTIONS)}
+
+_TORSO_COLUMNS: Final = [_COLUMNS[torso] for torso in Torso]
+_TORSO_STYLES: Final = np.array([torso.value.torso_style for torso in Torso], dtype=np.int64)
+
+_DECLARATION_COLUMNS: Final = [_COLUMNS[declaration] for declaration in Declaration]
+
+# Counter-church added by each Holy Relic, indexed by Torso Style
+_HOLY_RELIC_COUNTER_CHURCH: Final = np.array([HOLY_RELIC_COUNTER_CHURCH.get(torso_style, 0) for torso_style in range(max(HOLY_RELIC_COUNTER_CHURCH) + 1)], dtype=np.int64)
+
+_POWERS: Final = {exp: np.array(table, dtype=np.int64) for exp, table in POWERS.items()}
+
+
+@dataclass(frozen=True)
+class BatchEvaluation:
+    """The qualities of many skeletons, with one row per candidate.
+
+`qualities` maps the names of buyer-independent qualities to 1-D arrays. Every other array is 2-D, with one column per buyer in `buyers`, and is masked wherever the buyer would not accept the candidate."""
+
+    buyers: tuple
+
+    qualities: dict
+
+    # Whether each candidate satisfies its torso, declaration, and slot requirements
+    valid: np.ndarray
+
+    # Whether each buyer would accept each candidate, ignoring limits on cost and exhaustion
+    feasible: np.ndarray
+
+    primary_revenue: np.ma.MaskedArray
+    secondary_revenue: np.ma.MaskedArray
+    total_revenue: np.ma.MaskedArray
+    exhaustion: np.ma.MaskedArray
+    cost: np.ma.MaskedArray
+    net_profit: np.ma.MaskedArray
+
+    # Multiplied by PROFIT_MARGIN_MULTIPLIER
+    profit_margin: np.ma.MaskedArray
+
+
+def EvaluateBatch(counts, shadowy_level, bone_market_fluctuations = None, zoological_mania = None, buyers = tuple(Buyer)) -> BatchEvaluation:
+    """Evaluate every candidate for every specified buyer.
+
+`counts` is a 2-D array of action counts, with one row per candidate and one column per member of ACTIONS. Each candidate must include exactly one torso and one declaration; buyer columns are ignored."""
+
+    counts = np.asarray(counts, dtype=np.int64)
+    rows = counts.shape[0]
+
+    totals = counts @ _COEFFICIENT_MATRIX
+    q = {term: totals[:, index] for index, term in enumerate(LINEAR_TERMS)}
+
+    torsos = counts[:, _TORSO_COLUMNS]
+    declarations = counts[:, _DECLARATION_COLUMNS]
+
+    valid = (torsos.sum(axis=1) == 1) & (torsos >= 0).all(axis=1) & (declarations.sum(axis=1) == 1) & (declarations >= 0).all(axis=1) & (counts >= 0).all(axis=1) & (counts[:, _COLUMNS[Appendage.SKIP_TAILS]] <= 1)
+    q['torso_style'] = torsos @ _TORSO_STYLES
+
+    # Vake skulls scale with repetition, using partial sum formulas
+    vake_skulls = counts[:, _COLUMNS[Skull.VAKE_SKULL]]
+    q['value'] = q['value'] - 250*vake_skulls*vake_skulls + 6750*vake_skulls
+    q['menace'] = np.maximum(q['menace'] + np.minimum(2*vake_skulls, 3), 0)
+    q['implausibility'] = q['implausibility'] + (-2*vake_skulls + vake_skulls*vake_skulls + vake_skulls % 2)//4
+
+    q['amalgamy'] = np.maximum(q['amalgamy'], 0)
+    q['antiquity'] = np.maximum(q['antiquity'], 0)
+
+    if zoological_mania:
+        q['zoological_mania_bonus'] = np.where(counts[:, _COLUMNS[zoological_mania]] == 1, ((15 if zoological_mania in (Declaration.FISH, Declaration.INSECT, Declaration.SPIDER) else 10)*q['value'])//100, 0)
+    else:
+        q['zoological_mania_bonus'] = np.zeros(rows, dtype=np.int64)
+
+    valid &= np.isin(q['torso_style'], tuple(HOLY_RELIC_COUNTER_CHURCH))
+    q['counter_church'] = q['counter_church'] + counts[:, _COLUMNS[Appendage.FIACRE_THIGH]]*_HOLY_RELIC_COUNTER_CHURCH[np.clip(q['torso_style'], 0, len(_HOLY_RELIC_COUNTER_CHURCH) - 1)]
+
+    q['skeleton_in_progress'] = np.zeros(rows, dtype=np.int64)
+    for declaration, column in zip(Declaration, _DECLARATION_COLUMNS):
+        chosen = counts[:, column] == 1
+        q['skeleton_in_progress'] = np.where(chosen, np.select([q['antiquity'] >= minimum_antiquity for minimum_antiquity, _ in reversed(SKELETON_TYPES[declaration])], [skeleton_type for _, skeleton_type in reversed(SKELETON_TYPES[declaration])]), q['skeleton_in_progress'])
+        valid &= ~chosen | DECLARATION_REQUIREMENTS[declaration](q)
+
+    valid &= np.all([q[quality] >= 0 for quality in ('value', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles', 'counter_church')], axis=0)
+
+    # Skeleton must have no unfilled skulls or limbs, and no unfilled tails unless they were skipped
+    valid &= (q['skulls_needed'] == 0) & (q['limbs_needed'] == 0) & np.where(counts[:, _COLUMNS[Appendage.SKIP_TAILS]] > 0, q['tails_needed'] > 0, q['tails_needed'] == 0)
+
+    valid &= (counts[:, _COLUMNS[Skull.SEGMENTED_RIBCAGE]] == 0) | (q['torso_style'] == 110)
+    valid &= (counts[:, _COLUMNS[Appendage.SEGMENTED_RIBCAGE]] == 0) | ((q['torso_style'] == 110) & (q['base_tails_needed'] >= 1))
+
+    # Cost of adding joints, using a partial sum formula
+    base_joints = q['base_joints']
+    add_joints = counts[:, _COLUMNS[Appendage.ADD_JOINTS]]
+    add_joints_amber_cost = AddJointsAmberCost(base_joints, add_joints)
+
+    # Cost of adding segments, using a partial sum formula
+    base_segments = q['base_segments'] - 1
+    add_segments = counts[:, _COLUMNS[Appendage.SEGMENTED_RIBCAGE]]
+    add_segments_brass_cost = AddSegmentsBrassCost(base_segments, add_segments)
+
+    base_cost = q['cost'] + add_joints_amber_cost + add_segments_brass_cost
+
+    columns = {name: np.empty((rows, len(buyers)), dtype=np.int64) for name in ('primary_revenue', 'secondary_revenue', 'exhaustion', 'cost')}
+    feasible = np.empty((rows, len(buyers)), dtype=bool)
+
+    for index, buyer in enumerate(buyers):
+        in_range = [valid]
+
+        # Fractional exponents are only tabulated up to a point
+        def Power(base, exp):
+            in_range.append((base >= 0) & (base <= MAXIMUM_ATTRIBUTE))
+            return _POWERS[exp][np.clip(base, 0, MAXIMUM_ATTRIBUTE)]
+
+        accepted, primary_revenue, secondary_revenue, difficulty_level, added_exhaustion = (np.broadcast_to(term, (rows,)) for term in BUYER_FORMULAS[buyer](q, bone_market_fluctuations, Power))
+
+        # Cost of the actions needed to sell the skeleton
+        sale_actions_times_action_value = round(DIFFICULTY_SCALER*shadowy_level*Cost.ACTION.value)//np.maximum(difficulty_level, 1)
+        sale_cost = np.maximum(Cost.ACTION.value**2//np.maximum(sale_actions_times_action_value, 1), Cost.ACTION.value)
+
+        columns['primary_revenue'][:, index] = primary_revenue
+        columns['secondary_revenue'][:, index] = secondary_revenue
+        columns['exhaustion'][:, index] = q['exhaustion'] + added_exhaustion
+        columns['cost'][:, index] = base_cost + COEFFICIENTS[buyer][LINEAR_TERMS.index('cost')] + sale_cost
+        feasible[:, index] = np.all(in_range, axis=0) & accepted & (primary_revenue >= 0) & (secondary_revenue >= 0) & (sale_actions_times_action_value > 0) & (primary_revenue + secondary_revenue > 0) & (columns['exhaustion'][:, index] >= 0)
+
+    total_revenue = columns['primary_revenue'] + columns['secondary_revenue']
+    net_profit = total_revenue - columns['cost']
+    profit_margin = np.where(net_profit >= 0, 1, -1)*(np.abs(net_profit*PROFIT_MARGIN_MULTIPLIER)//np.maximum(total_revenue, 1))
+
+    def Masked(array):
+        return np.ma.MaskedArray(array, mask=~feasible)
+
+    return BatchEvaluation(
+            buyers = tuple(buyers),
+            qualities = {quality: q[quality] for quality in ('torso_style', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles', 'value', 'zoological_mania_bonus', 'amalgamy', 'antiquity', 'menace', 'implausibility', 'counter_church', 'skeleton_in_progress')},
+            valid = valid,
+            feasible = feasible,
+            primary_revenue = Masked(columns['primary_revenue']),
+            secondary_revenue = Masked(columns['secondary_revenue']),
+            total_revenue = Masked(total_revenue),
+            exhaustion = Masked(columns['exhaustion']),
+            cost = Masked(columns['cost']),
+            net_profit = Masked(net_profit),
+            profit_margin = Masked(profit_margin),
+            )
@@ -0,0 +1,241 @@
+"""Solve a file of scenarios in a single process, streaming out each result as soon as it is known."""
+
+__all__ = ['ReadScenarios', 'SolveScenario', 'SolveScenarios', 'WarmModels']
+__author__ = "Jeremy Saklad"
+
+import argparse
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Final
+
+from ortools.sat.python import cp_model
+
+from .result import SolveResult
+from .scenario import DecodeScenario, EncodeScenario
+from .solve import CreateModel, NewSolver
+
+# Number of models each thread keeps built, in case later scenarios only differ in maximum exhaustion
+_WARM_MODELS: Final = 4
+
+
+class WarmModels:
+    """The last few models built by each thread, so that scenarios differing only in maximum exhaustion reuse one model.
+
+Each thread keeps its own models, since solving a model changes its bounds."""
+
+    __slots__ = '__local', '__size'
+
+    def __init__(self, size = _WARM_MODELS):
+        self.__local = threading.local()
+        self.__size = size
+
+    def Model(self, scenario):
+        """Return the model, actions, and qualities for a scenario, with its exhaustion bounded by the scenario's maximum exhaustion."""
+
+        scenario = dict(scenario)
+        maximum_exhaustion = scenario.pop('maximum_exhaustion', cp_model.INT32_MAX)
+        key = json.dumps(EncodeScenario(scenario), sort_keys = True)
+
+        models = self.__local.__dict__.setdefault('models', OrderedDict())
+
+        if key in models:
+            models.move_to_end(key)
+        else:
+            models[key] = CreateModel(**scenario)
+            if len(models) > self.__size:
+                models.popitem(last = False)
+
+        model, actions, qualities = models[key]
+        model.SetBounds(qualities['exhaustion'], 0, maximum_exhaustion)
+
+        return model, actions, qualities
+
+
+def SolveScenario(scenario, models = None, solvers = None, **solver_arguments):
+    """Solve a scenario, reusing a model from `models` if one has been built for it. `solver_arguments` are passed to NewSolver.
+
+While it is being solved, the solver is kept in `solvers` (if given), so that it can be stopped from another thread.
+
+Returns the name of the solver status and a SolveResult, or None if no skeleton was found."""
+
+    model, actions, qualities = (models or WarmModels(1)).Model(scenario)
+
+    solver = NewSolver(**solver_arguments)
+
+    if solvers is not None:
+        solvers.add(solver)
+    try:
+        status = solver.Solve(model)
+    finally:
+        if solvers is not None:
+            solvers.discard(solver)
+
+    return solver.StatusName(status), SolveResult.FromResponse(solver.ResponseProto(), actions, qualities) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+
+
+def ReadScenarios(lines):
+    """Yield each scenario in a file with one JSON object per line, as described by DecodeScenario.
+
+A line of the form {"defaults": {...}} sets arguments shared by every scenario after it, until the next such line. Each scenario's own arguments take precedence over the defaults. Blank lines are skipped.
+
+Raises ValueError, naming the line, if a line cannot be read."""
+
+    defaults = {}
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        try:
+            fields = json.loads(line)
+
+            if fields.keys() == {'defaults'}:
+                defaults = DecodeScenario(fields['defaults'])
+            else:
+                yield {**defaults, **DecodeScenario(fields)}
+        except (AttributeError, KeyError, ValueError) as error:
+            raise ValueError(f"line {number}: {type(error).__name__}: {error}") from error
+
+
+def SolveScenarios(scenarios, in_order = True, threads = 1, time_limit = float('inf'), deterministic_time = float('inf'), workers = 1, random_seed = None):
+    """Solve each scenario in turn, yielding its index, the name of the solver status, the SolveResult (or None), and the error that stopped it (or None).
+
+Every scenario is solved by this process, and models are reused whenever scenarios only differ in maximum exhaustion. Scenarios are read lazily, and only a few more than `threads` are in flight at once, so any number can be solved.
+
+With several `threads`, results are yielded in the order of `scenarios` if `in_order` is set, and otherwise as soon as each is finished. `workers` is the number of search workers each thread gives CP-SAT. If iteration stops early, any solves in progress are stopped."""
+
+    solver_arguments = {
+            'time_limit': time_limit,
+            'deterministic_time': deterministic_time,
+            'workers': workers,
+            'random_seed': random_seed,
+            'interleave_search': random_seed is not None and workers > 1,
+            }
+
+    models = WarmModels()
+    solvers = set()
+    scenarios = enumerate(scenarios)
+
+    def Outcome(future):
+        try:
+            status, result = future.result()
+        except Exception as error:
+            return future.index, None, None, f"{type(error).__name__}: {error}"
+        else:
+            return future.index, status, result, None
+
+    executor = ThreadPoolExecutor(threads)
+    in_flight = []
+
+    try:
+        while True:
+            for index, scenario in islice(scenarios, 2*threads - len(in_flight)):
+                future = executor.submit(SolveScenario, scenario, models, solvers, **solver_arguments)
+                future.index = index
+                in_flight.append(future)
+
+            if not in_flight:
+                break
+
+            if in_order:
+                yield Outcome(in_flight.pop(0))
+            else:
+                done, _ = wait(in_flight, return_when = FIRST_COMPLETED)
+                for future in sorted(done, key = lambda future : future.index):
+                    in_flight.remove(future)
+                    yield Outcome(future)
+    finally:
+        executor.shutdown(wait = False, cancel_futures = True)
+
+        # A thread may still be building its model, and would otherwise solve it in full once built. Cancelled futures never count as done.
+        while wait([future for future in in_flight if not future.cancelled()], timeout = 0.1).not_done:
+            for solver in list(solvers):
+                solver.StopSearch()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.batchsolve',
+            description="Solve a file of scenarios in a single process, printing each result as a JSON line as soon as it is known.",
+            )
+
+    parser.add_argument(
+            "scenarios",
+            type=argparse.FileType('r'),
+            help="file with one scenario per line, as a JSON object of arguments to CreateModel (e.g. {\"shadowy_level\": 300, \"desired_buyers\": [\"Buyer.A_NAIVE_COLLECTOR\"]}), where a line of the form {\"defaults\": {...}} sets arguments shared by the scenarios after it",
+            )
+
+    parser.add_argument(
+            "-o", "--output",
+            default=sys.stdout,
+            type=argparse.FileType('w'),
+            help="file to write results to (default: standard output)",
+            dest='output'
+            )
+
+    parser.add_argument(
+            "--completion-order",
+            action='store_false',
+            help="write each result as soon as it is finished, rather than in the order of the file",
+            dest='in_order'
+            )
+
+    parser.add_argument(
+            "-p", "--threads",
+            default=1,
+            type=int,
+            help="number of scenarios to solve at once (default: 1)",
+            dest='threads'
+            )
+
+    parser.add_argument(
+            "-t", "--time-limit",
+            default=float('inf'),
+            type=float,
+            help="maximum number of seconds to run each solve",
+            dest='time_limit'
+            )
+
+    parser.add_argument(
+            "-d", "--deterministic-time",
+            default=float('inf'),
+            type=float,
+            help="maximum number of deterministic seconds to run each solve",
+            dest='deterministic_time'
+            )
+
+    parser.add_argument(
+            "-w", "--workers",
+            default=1,
+            type=int,
+            help="number of search worker threads for each solve (default: 1)",
+            dest='workers'
+            )
+
+    parser.add_argument(
+            "-s", "--seed",
+            type=int,
+            help="random seed for the solver",
+            dest='random_seed'
+            )
+
+    args = parser.parse_args()
+
+    # Every scenario is checked before any is solved, so a mistake at the end of the file is not found hours later
+    try:
+        scenarios = list(ReadScenarios(args.scenarios))
+    except ValueError as error:
+        parser.error(f"{args.scenarios.name}, {error}")
+
+    for index, status, result, error in SolveScenarios(scenarios, args.in_order, args.threads, args.time_limit, args.deterministic_time, args.workers, args.random_seed):
+        print(json.dumps({
+            'index': index,
+            'scenario': EncodeScenario(scenarios[index]),
+            'status': status,
+            'result': json.loads(result.ToJSON()) if result is not None else None,
+            'error': error,
+            }), file=args.output, flush=True)
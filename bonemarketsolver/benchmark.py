@@ -0,0 +1,164 @@
+"""Compare how long the solver takes with and without a model option, across a corpus of scenarios."""
+
+__all__ = ['SCENARIOS', 'SEARCH_OPTIONS', 'Benchmark']
+__author__ = "Jeremy Saklad"
+
+import argparse
+from functools import partial
+from os import cpu_count
+from time import perf_counter
+from typing import Final
+
+from ortools.sat.python import cp_model
+
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.fluctuations import Fluctuation
+from .data.occasional_buyers import OccasionalBuyer
+from .profiling import PeakResidentSetSize, ProfileBuild, ResetPeakResidentSetSize
+from .solve import AddSearchStrategy, CreateModel, NewSolver
+
+# Representative scenarios, as keyword arguments to CreateModel
+SCENARIOS: Final = (
+        {'shadowy_level': 300},
+        {'shadowy_level': 300, 'bone_market_fluctuations': Fluctuation.ANTIQUITY, 'zoological_mania': Declaration.FISH},
+        {'shadowy_level': 300, 'occasional_buyer': OccasionalBuyer.AN_ENTHUSIAST_IN_SKULLS, 'maximum_exhaustion': 4},
+        {'shadowy_level': 200, 'desired_buyers': [Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES]},
+        {'shadowy_level': 200, 'desired_buyers': [Buyer.A_TELLER_OF_TERRORS]},
+        {'shadowy_level': 200, 'desired_buyers': [Buyer.A_TENTACLED_SERVANT], 'maximum_exhaustion': 2},
+        )
+
+
+# Options of AddSearchStrategy rather than CreateModel
+SEARCH_OPTIONS: Final = ('search_strategy', 'value_heuristic')
+
+
+class _FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Record how long the solver took to find its first solution."""
+
+    __slots__ = 'first_solution'
+
+    def __init__(self):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.first_solution = None
+
+    def OnSolutionCallback(self):
+        if self.first_solution is None:
+            self.first_solution = self.WallTime()
+
+
+def Benchmark(option, values = (False, True), scenarios = SCENARIOS, time_limit = 60.0, workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False, profile_memory = False):
+    """Solve every scenario once for each value of `option`, returning a table of build times, times to the first solution, solve times, deterministic solve times, model sizes, and peak memory used while solving.
+
+`option` may be a keyword argument of either CreateModel or AddSearchStrategy. Value heuristics are compared using fixed search.
+
+If `profile_memory` is set, the most memory allocated by Python while building each model is also reported. Build times then include the overhead of tracing allocations."""
+
+    output = f"{'Scenario':>8}  {option:>16}  {'Status':>10}  {'Objective':>10}  {'Build':>8}  {'First':>8}  {'Solve':>8}  {'Det.':>8}  {'Model':>10}  {'Peak RSS':>10}{'  Build Peak' if profile_memory else ''}\n"
+    totals = dict.fromkeys(values, 0.0)
+
+    for index, scenario in enumerate(scenarios):
+        for value in values:
+            build = partial(CreateModel, **scenario, **({} if option in SEARCH_OPTIONS else {option: value}))
+
+            start = perf_counter()
+            (model, actions, _), memory = ProfileBuild(build) if profile_memory else (build(), None)
+            built = perf_counter()
+
+            solver = NewSolver(time_limit, workers, deterministic_time, random_seed, interleave_search)
+
+            if option in SEARCH_OPTIONS:
+                AddSearchStrategy(model, actions, solver, **{'search_strategy': 'fixed', option: value})
+
+            ResetPeakResidentSetSize()
+
+            timer = _FirstSolutionTimer()
+            status = solver.Solve(model, timer)
+            solved = perf_counter()
+
+            totals[value] += solved - start
+
+            objective = f"{solver.ObjectiveValue():n}" if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else "-"
+            first_solution = f"{timer.first_solution:>7.2f}s" if timer.first_solution is not None else f"{'-':>8}"
+            peak_rss = f"{peak/2**20:>6,.1f} MiB" if (peak := PeakResidentSetSize()) is not None else f"{'-':>10}"
+            build_peak = f"  {memory.build_peak/2**20:>6,.1f} MiB" if profile_memory else ""
+            output += f"{index:>8n}  {str(value):>16}  {solver.StatusName(status):>10}  {objective:>10}  {built - start:>7.2f}s  {first_solution}  {solved - built:>7.2f}s  {solver.ResponseProto().deterministic_time:>7.2f}s  {model.Proto().ByteSize()/2**10:>6,.1f} KiB  {peak_rss}{build_peak}\n"
+
+    output += "\n" + "\n".join(f"Total with {option} = {value}: {total:.2f}s" for value, total in totals.items())
+
+    if len(values) == 2:
+        output += f"\nTime saved: {totals[values[0]] - totals[values[1]]:.2f}s"
+
+    return output
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.benchmark',
+            description="Measure the effect of a model or search option on solve times across representative scenarios.",
+            )
+
+    parser.add_argument(
+            "option",
+            help="keyword argument of CreateModel or AddSearchStrategy to vary",
+            )
+
+    parser.add_argument(
+            "-v", "--values",
+            nargs="+",
+            default=(False, True),
+            type=lambda value : {'False': False, 'True': True}.get(value, value),
+            help="values of the option to compare (default: False True)",
+            dest='values'
+            )
+
+    parser.add_argument(
+            "-t", "--time-limit",
+            default=60.0,
+            type=float,
+            help="maximum number of seconds to run each solve",
+            dest='time_limit'
+            )
+
+    parser.add_argument(
+            "-w", "--workers",
+            default=cpu_count(),
+            type=int,
+            help="number of search worker threads to run in parallel",
+            dest='workers'
+            )
+
+    parser.add_argument(
+            "-d", "--deterministic-time",
+            default=float('inf'),
+            type=float,
+            help="maximum number of deterministic seconds to run each solve, which is the same on every machine",
+            dest='deterministic_time'
+            )
+
+    parser.add_argument(
+            "-s", "--seed",
+            type=int,
+            help="random seed for the solver",
+            dest='random_seed'
+            )
+
+    parser.add_argument(
+            "-i", "--interleave-search",
+            action=argparse.BooleanOptionalAction,
+            default=False,
+            help="whether workers should take turns, which makes results repeatable with several workers",
+            dest='interleave_search'
+            )
+
+    parser.add_argument(
+            "-m", "--profile-memory",
+            action=argparse.BooleanOptionalAction,
+            default=False,
+            help="whether to also report the memory allocated while building each model, which slows down building",
+            dest='profile_memory'
+            )
+
+    args = parser.parse_args()
+
+    print(Benchmark(**vars(args)))
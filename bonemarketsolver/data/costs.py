@@ -3,8 +3,6 @@ __author__ = "Jeremy Saklad"
 
 from enum import Enum
 
-from ortools.sat.python import cp_model
-
 class Cost(Enum):
     """The number of pennies needed to produce a quality."""
 
@@ -55,7 +53,8 @@ class Cost(Enum):
 
     # Eyeless Skull
     # No consistent source
-    EYELESS_SKULL = cp_model.INT32_MAX/2
+    # Half of cp_model.INT32_MAX, written out so that the data can be imported without OR-Tools
+    EYELESS_SKULL = (2**31 - 1)/2
 
     # Holy Relic of the Thigh of Saint Fiacre
     # Jericho Locks statue, 2 at a time
@@ -0,0 +1,124 @@
+"""Find actions that can never do better than another action in a given scenario."""
+
+__all__ = ['BUYER_PREFERENCES', 'DominatedActions']
+__author__ = "Jeremy Saklad"
+
+from typing import Final
+
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.diplomat_fascinations import DiplomatFascination
+from .data.occasional_buyers import OccasionalBuyer
+from .data.skulls import Skull
+
+# How each buyer responds to an increase in each quality: 1 if it can only help, -1 if it can only hurt, or 0 if it may do either.
+#
+# Qualities that are omitted make no difference to the buyer. Exhaustion is always limited, so any quality that adds exhaustion may do either.
+BUYER_PREFERENCES: Final = {
+        Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES: {'value': 1, 'implausibility': -1},
+        Buyer.A_NAIVE_COLLECTOR: {'value': 1, 'implausibility': -1},
+        Buyer.A_FAMILIAR_BOHEMIAN_SCULPTRESS: {'value': 1, 'antiquity': -1, 'counter_church': 1, 'implausibility': -1},
+        Buyer.A_PEDAGOGICALLY_INCLINED_GRANDMOTHER: {'value': 1, 'menace': -1, 'implausibility': -1},
+        Buyer.A_THEOLOGIAN_OF_THE_OLD_SCHOOL: {'value': 1, 'amalgamy': -1, 'implausibility': -1},
+        Buyer.AN_ENTHUSIAST_OF_THE_ANCIENT_WORLD: {'value': 1, 'antiquity': 1, 'implausibility': -1},
+        Buyer.MRS_PLENTY: {'value': 1, 'menace': 1, 'implausibility': -1},
+        Buyer.A_TENTACLED_SERVANT: {'value': 1, 'amalgamy': 1, 'implausibility': -1},
+        Buyer.AN_INVESTMENT_MINDED_AMBASSADOR: {'value': 1, 'antiquity': 0, 'implausibility': -1},
+        Buyer.A_TELLER_OF_TERRORS: {'value': 1, 'menace': 0, 'implausibility': -1},
+        Buyer.A_TENTACLED_ENTREPRENEUR: {'value': 1, 'amalgamy': 0, 'implausibility': -1},
+        Buyer.AN_AUTHOR_OF_GOTHIC_TALES: {'value': 1, 'antiquity': 0, 'menace': 0, 'implausibility': -1},
+        Buyer.A_ZAILOR_WITH_PARTICULAR_INTERESTS: {'value': 1, 'antiquity': 0, 'amalgamy': 0, 'implausibility': -1},
+        Buyer.A_RUBBERY_COLLECTOR: {'value': 1, 'amalgamy': 0, 'menace': 0, 'implausibility': -1},
+        Buyer.A_CONSTABLE: {'value': 1, 'implausibility': -1},
+        Buyer.AN_ENTHUSIAST_IN_SKULLS: {'value': 1, 'implausibility': -1},
+        Buyer.A_DREARY_MIDNIGHTER: {'value': 1, 'amalgamy': -1, 'counter_church': -1, 'implausibility': -1},
+        Buyer.A_COLOURFUL_PHANTASIST_BAZAARINE: {'value': 1, 'amalgamy': 0, 'implausibility': 0},
+        Buyer.A_COLOURFUL_PHANTASIST_NOCTURNAL: {'value': 1, 'menace': 0, 'implausibility': 0},
+        Buyer.A_COLOURFUL_PHANTASIST_CELESTIAL: {'value': 1, 'antiquity': 0, 'implausibility': 0},
+        Buyer.AN_INGENUOUS_MALACOLOGIST: {'value': 1, 'implausibility': -1},
+        Buyer.AN_ENTERPRISING_BOOT_SALESMAN: {'value': 1, 'amalgamy': -1, 'menace': -1},
+        Buyer.THE_DUMBWAITER_OF_BALMORAL: {'value': 1},
+        Buyer.THE_CARPENTERS_GRANDDAUGHTER: {'value': 1, 'implausibility': -1},
+        Buyer.THE_TRIFLING_DIPLOMAT_AMALGAMY: {'value': 1, 'amalgamy': 0},
+        Buyer.THE_TRIFLING_DIPLOMAT_ANTIQUITY: {'value': 1, 'antiquity': 0},
+        Buyer.THE_TRIFLING_DIPLOMAT_MENACE: {'value': 1, 'menace': 0},
+        **{
+            diplomat: {'value': 1, 'amalgamy': 0, 'antiquity': 0, 'menace': 0}
+            for diplomat in (
+                Buyer.THE_TRIFLING_DIPLOMAT_AMPHIBIAN,
+                Buyer.THE_TRIFLING_DIPLOMAT_BIRD,
+                Buyer.THE_TRIFLING_DIPLOMAT_FISH,
+                Buyer.THE_TRIFLING_DIPLOMAT_INSECT,
+                Buyer.THE_TRIFLING_DIPLOMAT_LEGS,
+                Buyer.THE_TRIFLING_DIPLOMAT_REPTILE,
+                Buyer.THE_TRIFLING_DIPLOMAT_SKULLS,
+                Buyer.THE_TRIFLING_DIPLOMAT_SPIDER,
+            )
+            },
+        }
+
+# Properties that must match exactly for one action to replace another
+SLOTS: Final = ('torso_style', 'skulls_needed', 'limbs_needed', 'tails_needed', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles')
+
+# Actions whose effects are not simply proportional to how often they are used
+NONLINEAR_ACTIONS: Final = frozenset((
+        Skull.SEGMENTED_RIBCAGE,
+        Skull.VAKE_SKULL,
+        Appendage.ADD_JOINTS,
+        Appendage.FIACRE_THIGH,
+        Appendage.SEGMENTED_RIBCAGE,
+        Appendage.SKIP_TAILS,
+        ))
+
+
+def AvailableBuyers(occasional_buyer = None, diplomat_fascination = None, desired_buyers = []):
+    """Return every buyer that a skeleton could be sold to."""
+
+    if desired_buyers:
+        return tuple(desired_buyers)
+
+    return tuple(
+            buyer for buyer in Buyer
+            if all(buyer not in unavailable_buyer.value for unavailable_buyer in OccasionalBuyer if unavailable_buyer != occasional_buyer)
+            and all(buyer != outmoded_fascination.value for outmoded_fascination in DiplomatFascination if outmoded_fascination != diplomat_fascination)
+            )
+
+
+def DominatedActions(occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], blacklist = [], **_) -> dict:
+    """Find skulls and appendages that can be replaced by another without making any skeleton worse for the available buyers.
+
+Returns a dictionary mapping each dominated action to an action that dominates it."""
+
+    # Combine the preferences of every buyer that could be chosen
+    preferences = {'exhaustion': -1}
+    for buyer in AvailableBuyers(occasional_buyer, diplomat_fascination, desired_buyers):
+        for quality, preference in BUYER_PREFERENCES[buyer].items():
+            preferences[quality] = preferences.get(quality, preference) if preferences.get(quality, preference) == preference else 0
+
+    candidates = [action for enum in (Skull, Appendage) for action in enum if action not in NONLINEAR_ACTIONS and action not in blacklist]
+
+    def Dominates(better, worse) -> bool:
+        if any(getattr(better.value, slot) != getattr(worse.value, slot) for slot in SLOTS):
+            return False
+
+        differences = [
+                *((getattr(better.value, quality) - getattr(worse.value, quality))*preference for quality, preference in preferences.items()),
+                int(worse.value.cost) - int(better.value.cost),
+                ]
+
+        # Qualities that may either help or hurt must be identical
+        if any(getattr(better.value, quality) != getattr(worse.value, quality) for quality, preference in preferences.items() if preference == 0):
+            return False
+
+        if any(difference < 0 for difference in differences):
+            return False
+
+        # Identical actions are only dominated by those that come first
+        return any(difference > 0 for difference in differences) or candidates.index(better) < candidates.index(worse)
+
+    return {
+            worse: better
+            for worse in candidates
+            for better in (next((better for better in candidates if better is not worse and Dominates(better, worse)), None),)
+            if better is not None
+            }
@@ -0,0 +1,409 @@
+"""Evaluate a skeleton directly from the actions that comprise it, using the same formulas as the solver."""
+
+__all__ = ['Evaluate', 'Evaluation']
+__author__ = "Jeremy Saklad"
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Final
+
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.costs import Cost
+from .data.declarations import Declaration
+from .data.embellishments import Embellishment
+from .data.fluctuations import Fluctuation
+from .data.skulls import Skull
+from .data.torsos import Torso
+from .solve import DIFFICULTY_SCALER, HOLY_RELIC_COUNTER_CHURCH, MAXIMUM_ATTRIBUTE, PROFIT_MARGIN_MULTIPLIER, SKELETON_TYPES, AddJointsAmberCost, AddSegmentsBrassCost
+
+# Terms that are the sum of each action's contribution, including cost as the solver rounds it.
+#
+# Joints and segments may be added once the torso and skulls are chosen, so the sum of their properties are tracked separately.
+LINEAR_TERMS: Final = ('value', 'skulls_needed', 'limbs_needed', 'tails_needed', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles', 'amalgamy', 'antiquity', 'menace', 'implausibility', 'counter_church', 'exhaustion', 'cost', 'base_joints', 'base_segments', 'base_tails_needed')
+
+# Each action's contribution to every linear term
+COEFFICIENTS: Final = {
+        action: (
+            *(getattr(action.value, term) for term in LINEAR_TERMS[:-4]),
+            int(action.value.cost),
+            *((action.value.limbs_needed + action.value.arms + action.value.legs + action.value.wings + action.value.fins + action.value.tentacles, action.value.segments, action.value.tails_needed) if isinstance(action, (Torso, Skull)) else (0, 0, 0)),
+            )
+        for enum in (Torso, Skull, Appendage, Adjustment, Declaration, Embellishment, Buyer) for action in enum
+        }
+
+# Requirements imposed by each declaration, which accept either integers or arrays
+DECLARATION_REQUIREMENTS: Final = {
+        Declaration.AMPHIBIAN: lambda q : (q['tails'] == 0) & (q['fins'] == 0) & (q['wings'] == 0) & (q['arms'] == 0) & (q['skulls'] == 1) & (q['legs'] == 4) & (q['torso_style'] >= 20),
+        Declaration.APE: lambda q : (q['legs'] == 0) & (q['tails'] == 0) & (q['fins'] == 0) & (q['wings'] == 0) & (q['skulls'] == 1) & (q['arms'] == 4) & (q['torso_style'] >= 10) & (q['torso_style'] <= 20),
+        Declaration.BIRD: lambda q : (q['arms'] == 0) & (q['fins'] == 0) & (q['tails'] < 2) & (q['legs'] == 2) & (q['wings'] == 2) & (q['torso_style'] >= 20),
+        Declaration.CHIMERA: lambda q : True,
+        Declaration.CURATOR: lambda q : (q['fins'] == 0) & (q['tails'] == 0) & (q['skulls'] == 1) & (q['arms'] == 2) & (q['legs'] == 2) & (q['wings'] == 2),
+        Declaration.FISH: lambda q : (q['arms'] == 0) & (q['legs'] == 0) & (q['wings'] == 0) & (q['tails'] <= 1) & (q['skulls'] == 1) & (q['fins'] >= 2) & (q['torso_style'] >= 20),
+        Declaration.HUMANOID: lambda q : (q['tails'] == 0) & (q['fins'] == 0) & (q['wings'] == 0) & (q['skulls'] == 1) & (q['legs'] == 2) & (q['arms'] == 2) & (q['torso_style'] >= 10) & (q['torso_style'] <= 20),
+        Declaration.INSECT: lambda q : (q['arms'] == 0) & (q['fins'] == 0) & (q['tails'] == 0) & (q['skulls'] == 1) & (q['wings'] < 5) & (q['legs'] == 6) & (q['torso_style'] >= 20),
+        Declaration.MONKEY: lambda q : (q['legs'] == 0) & (q['fins'] == 0) & (q['wings'] == 0) & (q['skulls'] == 1) & (q['tails'] == 1) & (q['arms'] == 4) & (q['torso_style'] >= 10) & (q['torso_style'] <= 20),
+        Declaration.REPTILE: lambda q : (q['fins'] == 0) & (q['wings'] == 0) & (q['arms'] == 0) & (q['tails'] == 1) & (q['skulls'] == 1) & (q['legs'] < 5) & (q['torso_style'] >= 20),
+        Declaration.SPIDER: lambda q : (q['skulls'] == 0) & (q['arms'] == 0) & (q['wings'] == 0) & (q['fins'] == 0) & (q['tails'] <= 1) & (q['legs'] == 8) & (q['torso_style'] >= 20),
+        }
+
+
+def _Multiple(numerator, denominator):
+    """Round down to a multiple of the denominator, as buyers do with value."""
+    return denominator * (numerator // denominator)
+
+
+# The terms of each buyer, which accept either integers or arrays as qualities.
+#
+# Each formula is called with the skeleton's qualities, the current Bone Market Fluctuations, and an approximate exponentiation function.
+# It returns whether the buyer accepts the skeleton, the primary revenue, the secondary revenue, the difficulty level, and the added exhaustion.
+BUYER_FORMULAS: Final = {
+        Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES: lambda q, f, power : (
+            q['skeleton_in_progress'] >= 100,
+            q['value'] + q['zoological_mania_bonus'] + 5,
+            500,
+            40*q['implausibility'],
+            0,
+            ),
+        Buyer.A_NAIVE_COLLECTOR: lambda q, f, power : (
+            q['skeleton_in_progress'] >= 100,
+            _Multiple(q['value'] + q['zoological_mania_bonus'], 250),
+            0,
+            25*q['implausibility'],
+            0,
+            ),
+        Buyer.A_FAMILIAR_BOHEMIAN_SCULPTRESS: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['antiquity'] == 0),
+            1000 + _Multiple(q['value'] + q['zoological_mania_bonus'], 250),
+            250*q['counter_church'],
+            50*q['implausibility'],
+            0,
+            ),
+        Buyer.A_PEDAGOGICALLY_INCLINED_GRANDMOTHER: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['menace'] == 0),
+            1000 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            0,
+            50*q['implausibility'],
+            0,
+            ),
+        Buyer.A_THEOLOGIAN_OF_THE_OLD_SCHOOL: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['amalgamy'] == 0),
+            1000 + _Multiple(q['value'] + q['zoological_mania_bonus'], 250),
+            0,
+            50*q['implausibility'],
+            0,
+            ),
+        Buyer.AN_ENTHUSIAST_OF_THE_ANCIENT_WORLD: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['antiquity'] > 0),
+            _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*(q['antiquity'] + (1 if f == Fluctuation.ANTIQUITY else 0)),
+            45*q['implausibility'],
+            0,
+            ),
+        Buyer.MRS_PLENTY: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['menace'] > 0),
+            _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*q['menace'],
+            45*q['implausibility'],
+            0,
+            ),
+        Buyer.A_TENTACLED_SERVANT: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['amalgamy'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*(q['amalgamy'] + (1 if f == Fluctuation.AMALGAMY else 0)),
+            45*q['implausibility'],
+            0,
+            ),
+        Buyer.AN_INVESTMENT_MINDED_AMBASSADOR: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['antiquity'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*((4*(power(q['antiquity'], 2.1) if f == Fluctuation.ANTIQUITY else q['antiquity']*q['antiquity']))//5),
+            75*q['implausibility'],
+            (q['antiquity']*q['antiquity'])//25,
+            ),
+        Buyer.A_TELLER_OF_TERRORS: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['menace'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 10),
+            200*(power(q['menace'], 2.1) if f == Fluctuation.MENACE else q['menace']*q['menace']),
+            75*q['implausibility'],
+            (q['menace']*q['menace'])//25,
+            ),
+        Buyer.A_TENTACLED_ENTREPRENEUR: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['amalgamy'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            200*(power(q['amalgamy'], 2.1) if f == Fluctuation.AMALGAMY else q['amalgamy']*q['amalgamy']),
+            75*q['implausibility'],
+            (q['amalgamy']*q['amalgamy'])//25,
+            ),
+        Buyer.AN_AUTHOR_OF_GOTHIC_TALES: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['antiquity'] > 0) & (q['menace'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*(((2*q['antiquity'] + 1)*q['menace'])//2) if f == Fluctuation.MENACE else
+            250*((q['antiquity']*(2*q['menace'] + 1))//2) if f == Fluctuation.ANTIQUITY else
+            250*q['antiquity']*q['menace'],
+            75*q['implausibility'],
+            (q['antiquity']*q['menace'])//20,
+            ),
+        Buyer.A_ZAILOR_WITH_PARTICULAR_INTERESTS: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['antiquity'] > 0) & (q['amalgamy'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 10),
+            250*(((2*q['antiquity'] + 1)*q['amalgamy'])//2) if f == Fluctuation.AMALGAMY else
+            250*((q['antiquity']*(2*q['amalgamy'] + 1))//2) if f == Fluctuation.ANTIQUITY else
+            250*q['antiquity']*q['amalgamy'],
+            75*q['implausibility'],
+            (q['antiquity']*q['amalgamy'])//20,
+            ),
+        Buyer.A_RUBBERY_COLLECTOR: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['amalgamy'] > 0) & (q['menace'] > 0),
+            250 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            250*(((2*q['amalgamy'] + 1)*q['menace'])//2) if f == Fluctuation.MENACE else
+            250*((q['amalgamy']*(2*q['menace'] + 1))//2) if f == Fluctuation.AMALGAMY else
+            250*q['amalgamy']*q['menace'],
+            75*q['implausibility'],
+            (q['amalgamy']*q['menace'])//20,
+            ),
+        Buyer.A_CONSTABLE: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 110) & (q['skeleton_in_progress'] <= 119),
+            1000 + _Multiple(q['value'], 50),
+            0,
+            50*q['implausibility'],
+            0,
+            ),
+        Buyer.AN_ENTHUSIAST_IN_SKULLS: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['skulls'] >= 2),
+            q['value'] + q['zoological_mania_bonus'],
+            1250*power(q['skulls'] - 1, 1.8),
+            60*q['implausibility'],
+            (1250*power(q['skulls'] - 1, 1.8))//5000,
+            ),
+        Buyer.A_DREARY_MIDNIGHTER: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 110) & (q['skeleton_in_progress'] <= 299) & (q['amalgamy'] == 0) & (q['counter_church'] == 0),
+            300 + _Multiple(q['value'] + q['zoological_mania_bonus'], 3),
+            250,
+            100*q['implausibility'],
+            0,
+            ),
+        **{
+            buyer: lambda q, f, power, attribute=attribute : (
+                (q['skeleton_in_progress'] >= 100) & (q['implausibility'] >= 2) & (q[attribute] >= 4),
+                100 + _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+                250 + 250*q[attribute]*q['implausibility'],
+                0,
+                (250 + 250*q[attribute]*q['implausibility'])//5000,
+                ) for buyer, attribute in (
+                    (Buyer.A_COLOURFUL_PHANTASIST_BAZAARINE, 'amalgamy'),
+                    (Buyer.A_COLOURFUL_PHANTASIST_NOCTURNAL, 'menace'),
+                    (Buyer.A_COLOURFUL_PHANTASIST_CELESTIAL, 'antiquity'),
+                )
+            },
+        Buyer.AN_INGENUOUS_MALACOLOGIST: lambda q, f, power : (
+            (q['tentacles'] >= 4) & (q['skeleton_in_progress'] >= 100),
+            250 + _Multiple(q['value'], 250),
+            250*(power(q['tentacles'], 2.2)//5),
+            60*q['implausibility'],
+            (q['tentacles']*q['tentacles'])//100,
+            ),
+        Buyer.AN_ENTERPRISING_BOOT_SALESMAN: lambda q, f, power : (
+            (q['menace'] == 0) & (q['amalgamy'] == 0) & (q['skeleton_in_progress'] >= 100) & (q['legs'] >= 4),
+            _Multiple(q['value'] + q['zoological_mania_bonus'], 50),
+            50*power(q['legs'], 2.2),
+            0,
+            (q['legs']*q['legs'])//100,
+            ),
+        Buyer.THE_DUMBWAITER_OF_BALMORAL: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 180) & (q['skeleton_in_progress'] <= 189) & (q['value'] >= 250),
+            _Multiple(q['value'], 250),
+            0,
+            200,
+            0,
+            ),
+        Buyer.THE_CARPENTERS_GRANDDAUGHTER: lambda q, f, power : (
+            (q['skeleton_in_progress'] >= 100) & (q['value'] + q['zoological_mania_bonus'] >= 30000),
+            31250,
+            0,
+            100*q['implausibility'],
+            0,
+            ),
+        **{
+            buyer: lambda q, f, power, attribute=attribute : (
+                (q['skeleton_in_progress'] >= 100) & (q[attribute] >= 5),
+                50 + _Multiple(q['value'], 50),
+                50*q[attribute]*q[attribute],
+                0,
+                (50*q[attribute]*q[attribute])//5000,
+                ) for buyer, attribute in (
+                    (Buyer.THE_TRIFLING_DIPLOMAT_AMALGAMY, 'amalgamy'),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_ANTIQUITY, 'antiquity'),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_MENACE, 'menace'),
+                )
+            },
+        **{
+            buyer: lambda q, f, power, criteria=criteria : (
+                criteria(q),
+                50 + _Multiple(q['value'], 50),
+                50*power((q['amalgamy'] + q['antiquity'] + q['menace'])//3, 2.2),
+                0,
+                (50*power((q['amalgamy'] + q['antiquity'] + q['menace'])//3, 2.2))//5000,
+                ) for buyer, criteria in (
+                    (Buyer.THE_TRIFLING_DIPLOMAT_AMPHIBIAN, lambda q : (q['skeleton_in_progress'] >= 170) & (q['skeleton_in_progress'] <= 179)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_BIRD, lambda q : (q['skeleton_in_progress'] >= 180) & (q['skeleton_in_progress'] <= 189)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_FISH, lambda q : (q['skeleton_in_progress'] >= 190) & (q['skeleton_in_progress'] <= 199)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_INSECT, lambda q : (q['skeleton_in_progress'] >= 210) & (q['skeleton_in_progress'] <= 219)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_LEGS, lambda q : (q['skeleton_in_progress'] >= 100) & (q['legs'] >= 10)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_REPTILE, lambda q : (q['skeleton_in_progress'] >= 160) & (q['skeleton_in_progress'] <= 169)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_SKULLS, lambda q : (q['skeleton_in_progress'] >= 100) & (q['skulls'] >= 5)),
+                    (Buyer.THE_TRIFLING_DIPLOMAT_SPIDER, lambda q : (q['skeleton_in_progress'] >= 200) & (q['skeleton_in_progress'] <= 209)),
+                )
+            },
+        }
+
+# Lookup tables matching those of AddApproximateExponentiationEquality
+POWERS: Final = {exp: tuple(int(base**exp) for base in range(MAXIMUM_ATTRIBUTE + 1)) for exp in (1.8, 2.1, 2.2)}
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """The qualities of a finished skeleton, named after the corresponding variables of CreateModel."""
+
+    torso_style: int
+    skulls: int
+    arms: int
+    legs: int
+    tails: int
+    wings: int
+    fins: int
+    segments: int
+    tentacles: int
+    value: int
+    zoological_mania_bonus: int
+    amalgamy: int
+    antiquity: int
+    menace: int
+    implausibility: int
+    counter_church: int
+    exhaustion: int
+    skeleton_in_progress: int
+    primary_revenue: int
+    secondary_revenue: int
+    total_revenue: int
+    cost: int
+    net_profit: int
+
+    # Multiplied by PROFIT_MARGIN_MULTIPLIER
+    profit_margin: int
+
+    # Whether the solver would accept this skeleton, ignoring limits on cost and exhaustion
+    feasible: bool
+
+
+def Evaluate(actions: Mapping, shadowy_level, declaration = None, buyer = None, bone_market_fluctuations = None, zoological_mania = None) -> Evaluation:
+    """Evaluate the skeleton produced by taking each action the specified number of times.
+
+`actions` maps actions to counts. If `declaration` or `buyer` is not specified, it is taken from `actions` instead."""
+
+    if declaration is None:
+        declaration = next(action for action, count in actions.items() if isinstance(action, Declaration) and count)
+    if buyer is None:
+        buyer = next(action for action, count in actions.items() if isinstance(action, Buyer) and count)
+
+    counts = {action: count for action, count in actions.items() if count and not isinstance(action, (Declaration, Buyer))}
+    counts[declaration] = counts[buyer] = 1
+
+    torsos = [action for action in counts if isinstance(action, Torso)]
+    feasible = len(torsos) == 1 and counts[torsos[0]] == 1 and counts.get(Appendage.SKIP_TAILS, 0) <= 1 and all(count >= 0 for count in counts.values())
+    torso_style = torsos[0].value.torso_style if torsos else 0
+
+    totals = [0]*len(LINEAR_TERMS)
+    for action, count in counts.items():
+        totals = [total + coefficient*count for total, coefficient in zip(totals, COEFFICIENTS[action])]
+
+    q = dict(zip(LINEAR_TERMS, totals))
+    q['torso_style'] = torso_style
+
+    # Vake skulls scale with repetition, using partial sum formulas
+    vake_skulls = counts.get(Skull.VAKE_SKULL, 0)
+    q['value'] += -250*vake_skulls*vake_skulls + 6750*vake_skulls
+    q['menace'] = max(q['menace'] + min(2*vake_skulls, 3), 0)
+    q['implausibility'] += (-2*vake_skulls + vake_skulls*vake_skulls + vake_skulls % 2)//4
+
+    q['amalgamy'] = max(q['amalgamy'], 0)
+    q['antiquity'] = max(q['antiquity'], 0)
+
+    q['zoological_mania_bonus'] = ((15 if zoological_mania in (Declaration.FISH, Declaration.INSECT, Declaration.SPIDER) else 10)*q['value'])//100 if declaration == zoological_mania else 0
+
+    feasible &= torso_style in HOLY_RELIC_COUNTER_CHURCH
+    q['counter_church'] += counts.get(Appendage.FIACRE_THIGH, 0)*HOLY_RELIC_COUNTER_CHURCH.get(torso_style, 0)
+
+    q['skeleton_in_progress'] = next(skeleton_type for minimum_antiquity, skeleton_type in reversed(SKELETON_TYPES[declaration]) if q['antiquity'] >= minimum_antiquity)
+
+    feasible &= all(q[quality] >= 0 for quality in ('value', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles', 'counter_church'))
+
+    # Skeleton must have no unfilled skulls or limbs, and no unfilled tails unless they were skipped
+    feasible &= q['skulls_needed'] == 0 and q['limbs_needed'] == 0 and (q['tails_needed'] > 0 if counts.get(Appendage.SKIP_TAILS) else q['tails_needed'] == 0)
+
+    feasible &= not counts.get(Skull.SEGMENTED_RIBCAGE) or torso_style == 110
+    feasible &= not counts.get(Appendage.SEGMENTED_RIBCAGE) or (torso_style == 110 and q['base_tails_needed'] >= 1)
+
+    feasible &= bool(DECLARATION_REQUIREMENTS[declaration](q))
+
+    # Fractional exponents are only tabulated up to a point
+    def Power(base, exp):
+        nonlocal feasible
+        feasible &= 0 <= base <= MAXIMUM_ATTRIBUTE
+        return POWERS[exp][min(max(base, 0), MAXIMUM_ATTRIBUTE)]
+
+    accepted, primary_revenue, secondary_revenue, difficulty_level, added_exhaustion = BUYER_FORMULAS[buyer](q, bone_market_fluctuations, Power)
+    feasible &= bool(accepted) and primary_revenue >= 0 and secondary_revenue >= 0
+
+    q['exhaustion'] += added_exhaustion
+
+    # Cost of adding joints, using a partial sum formula
+    base_joints = q['base_joints']
+    add_joints = counts.get(Appendage.ADD_JOINTS, 0)
+    add_joints_amber_cost = AddJointsAmberCost(base_joints, add_joints)
+
+    # Cost of adding segments, using a partial sum formula
+    base_segments = q['base_segments'] - 1
+    add_segments = counts.get(Appendage.SEGMENTED_RIBCAGE, 0)
+    add_segments_brass_cost = AddSegmentsBrassCost(base_segments, add_segments)
+
+    # Cost of the actions needed to sell the skeleton
+    sale_actions_times_action_value = round(DIFFICULTY_SCALER*shadowy_level*Cost.ACTION.value)//max(difficulty_level, 1)
+    feasible &= sale_actions_times_action_value > 0
+    sale_cost = max(Cost.ACTION.value**2//max(sale_actions_times_action_value, 1), Cost.ACTION.value)
+
+    cost = q['cost'] + add_joints_amber_cost + add_segments_brass_cost + sale_cost
+
+    total_revenue = primary_revenue + secondary_revenue
+    net_profit = total_revenue - cost
+    feasible &= total_revenue > 0 and q['exhaustion'] >= 0
+    profit_margin = (1 if net_profit >= 0 else -1)*(abs(net_profit*PROFIT_MARGIN_MULTIPLIER)//max(total_revenue, 1))
+
+    return Evaluation(
+            torso_style = torso_style,
+            skulls = q['skulls'],
+            arms = q['arms'],
+            legs = q['legs'],
+            tails = q['tails'],
+            wings = q['wings'],
+            fins = q['fins'],
+            segments = q['segments'],
+            tentacles = q['tentacles'],
+            value = q['value'],
+            zoological_mania_bonus = q['zoological_mania_bonus'],
+            amalgamy = q['amalgamy'],
+            antiquity = q['antiquity'],
+            menace = q['menace'],
+            implausibility = q['implausibility'],
+            counter_church = q['counter_church'],
+            exhaustion = q['exhaustion'],
+            skeleton_in_progress = q['skeleton_in_progress'],
+            primary_revenue = primary_revenue,
+            secondary_revenue = secondary_revenue,
+            total_revenue = total_revenue,
+            cost = cost,
+            net_profit = net_profit,
+            profit_margin = profit_margin,
+            feasible = bool(feasible),
+            )
@@ -0,0 +1,206 @@
+"""Find which combinations of torso, declaration, and buyer could possibly be satisfied, without searching."""
+
+__all__ = ['FeasibleCombinations']
+__author__ = "Jeremy Saklad"
+
+from typing import Final
+
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.declarations import Declaration
+from .data.embellishments import Embellishment
+from .data.skulls import Skull
+from .data.torsos import Torso
+from .dominance import AvailableBuyers, DominatedActions
+from .evaluate import BUYER_FORMULAS, DECLARATION_REQUIREMENTS
+from .solve import HOLY_RELIC_COUNTER_CHURCH, SKELETON_TYPES
+
+# Stands in for quantities without a practical limit
+_UNBOUNDED: Final = 10**12
+
+# Qualities whose bounds are tracked for every torso
+_QUALITIES: Final = ('value', 'skulls_needed', 'limbs_needed', 'tails_needed', 'skulls', 'arms', 'legs', 'tails', 'wings', 'fins', 'segments', 'tentacles', 'amalgamy', 'antiquity', 'menace', 'implausibility', 'counter_church')
+
+
+class _Interval:
+    """A closed range of integers supporting the arithmetic and comparisons used by the buyer and declaration formulas.
+
+Comparisons return an interval within [0, 1], where [0, 0] means the comparison can never be true."""
+
+    __slots__ = ('lo', 'hi')
+
+    def __init__(self, lo, hi = None):
+        self.lo = lo
+        self.hi = lo if hi is None else hi
+
+    @staticmethod
+    def Of(other):
+        return other if isinstance(other, _Interval) else _Interval(int(other))
+
+    def __add__(self, other):
+        other = _Interval.Of(other)
+        return _Interval(self.lo + other.lo, self.hi + other.hi)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return _Interval(-self.hi, -self.lo)
+
+    def __sub__(self, other):
+        return self + -_Interval.Of(other)
+
+    def __rsub__(self, other):
+        return _Interval.Of(other) + -self
+
+    def __mul__(self, other):
+        other = _Interval.Of(other)
+        products = (self.lo*other.lo, self.lo*other.hi, self.hi*other.lo, self.hi*other.hi)
+        return _Interval(min(products), max(products))
+
+    __rmul__ = __mul__
+
+    def __floordiv__(self, other):
+        # Only division by a positive constant is needed
+        return _Interval(self.lo // other, self.hi // other)
+
+    def __ge__(self, other):
+        other = _Interval.Of(other)
+        return _Interval(int(self.lo >= other.hi), int(self.hi >= other.lo))
+
+    def __gt__(self, other):
+        return self >= _Interval.Of(other) + 1
+
+    def __le__(self, other):
+        return _Interval.Of(other) >= self
+
+    def __lt__(self, other):
+        return _Interval.Of(other) > self
+
+    def __eq__(self, other):
+        other = _Interval.Of(other)
+        return _Interval(int(self.lo == self.hi == other.lo == other.hi), int(self.lo <= other.hi and other.lo <= self.hi))
+
+    def __and__(self, other):
+        other = _Interval.Of(other)
+        return _Interval(min(self.lo, other.lo), min(self.hi, other.hi))
+
+    __rand__ = __and__
+
+    def Possible(self) -> bool:
+        return self.hi > 0
+
+
+def _Hull(actions, quality):
+    """Return the range of a quality across several actions."""
+    values = [getattr(action.value, quality) for action in actions]
+    return _Interval(min(values), max(values))
+
+
+def _Repeated(actions, quality):
+    """Return the range of a quality added by any number of uses of each action."""
+    return sum((_Interval(0, _UNBOUNDED)*getattr(action.value, quality) for action in actions), _Interval(0))
+
+
+def ReachableQualities(torso, excluded = frozenset()):
+    """Bound every quality of a skeleton built on the specified torso, or return None if it cannot be completed.
+
+Each slot is bounded independently, so the bounds may include combinations that are not actually possible. Amalgamy, antiquity, and menace are not yet clamped at zero, since the declaration still adds to them."""
+
+    usable_skulls = [skull for skull in Skull if skull not in excluded and (skull != Skull.SEGMENTED_RIBCAGE or torso.value.torso_style == 110)]
+    usable_appendages = [appendage for appendage in Appendage if appendage not in excluded and (appendage != Appendage.SEGMENTED_RIBCAGE or torso.value.torso_style == 110)]
+
+    # Actions that create more limb slots
+    extensions = [appendage for appendage in usable_appendages if appendage.value.limbs_needed > 0]
+    limbs = [appendage for appendage in usable_appendages if appendage.value.limbs_needed < 0]
+    tails = [appendage for appendage in usable_appendages if appendage.value.tails_needed < 0]
+
+    # Actions that may be repeated without filling a slot
+    others = [
+            *(appendage for appendage in usable_appendages if appendage not in extensions and appendage not in limbs and appendage not in tails and appendage != Appendage.SKIP_TAILS),
+            *(adjustment for adjustment in Adjustment if adjustment not in excluded),
+            *(embellishment for embellishment in Embellishment if embellishment not in excluded),
+            ]
+
+    skull_slots = torso.value.skulls_needed
+    if skull_slots > 0 and not usable_skulls:
+        return None
+
+    q = {quality: _Interval(getattr(torso.value, quality)) for quality in _QUALITIES}
+
+    if skull_slots > 0:
+        for quality in _QUALITIES:
+            q[quality] += skull_slots*_Hull(usable_skulls, quality)
+
+    for quality in _QUALITIES:
+        q[quality] += _Repeated(extensions, quality) + _Repeated(others, quality)
+
+    limb_slots = q['limbs_needed']
+    if limb_slots.lo > 0 and not limbs:
+        return None
+    if limbs and limb_slots.hi > 0:
+        for quality in _QUALITIES:
+            q[quality] += _Interval(max(limb_slots.lo, 0), limb_slots.hi)*_Hull(limbs, quality)
+
+    # Tails may be skipped, leaving some slots unfilled
+    tail_slots = q['tails_needed']
+    filled_tail_slots = _Interval(0 if Appendage.SKIP_TAILS not in excluded else max(tail_slots.lo, 0), max(tail_slots.hi, 0))
+    if filled_tail_slots.lo > 0 and not tails:
+        return None
+    if tails and filled_tail_slots.hi > 0:
+        for quality in _QUALITIES:
+            q[quality] += filled_tail_slots*_Hull(tails, quality)
+
+    # Vake skulls and Holy Relics of the Thigh of Saint Fiacre do not scale linearly
+    if Skull.VAKE_SKULL in usable_skulls:
+        q['value'] += _Interval(-_UNBOUNDED, _UNBOUNDED)
+        q['menace'] += _Interval(0, 3)
+        q['implausibility'] += _Interval(0, _UNBOUNDED)
+    if Appendage.FIACRE_THIGH in limbs:
+        q['counter_church'] += _Interval(0, _UNBOUNDED)*HOLY_RELIC_COUNTER_CHURCH.get(torso.value.torso_style, 0)
+
+    q['torso_style'] = _Interval(torso.value.torso_style)
+    q['zoological_mania_bonus'] = _Interval(0, _UNBOUNDED)
+
+    return q
+
+
+def FeasibleCombinations(occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], blacklist = [], bone_market_fluctuations = None, prune_dominated = True, **_) -> frozenset:
+    """Return every (torso, declaration, buyer) combination that is not ruled out by bounds on the qualities it could reach.
+
+Combinations that are omitted cannot produce a skeleton that the buyer accepts, regardless of anything else."""
+
+    excluded = frozenset((*blacklist, *(DominatedActions(occasional_buyer, diplomat_fascination, desired_buyers, blacklist) if prune_dominated else ())))
+
+    def Power(base, exp):
+        return _Interval(0, _UNBOUNDED)
+
+    combinations = set()
+
+    for torso in Torso:
+        if torso in excluded or (reachable := ReachableQualities(torso, excluded)) is None:
+            continue
+
+        for declaration in Declaration:
+            if declaration in excluded:
+                continue
+
+            q = {quality: bounds + getattr(declaration.value, quality) if quality in _QUALITIES else bounds for quality, bounds in reachable.items()}
+
+            # Clamped only once every action, including the declaration, has been counted
+            for quality in ('amalgamy', 'antiquity', 'menace'):
+                q[quality] = _Interval(max(q[quality].lo, 0), max(q[quality].hi, 0))
+
+            if not _Interval.Of(DECLARATION_REQUIREMENTS[declaration](q)).Possible():
+                continue
+
+            # Only the rungs that the range of antiquity can reach
+            skeleton_types = [skeleton_type for index, (minimum_antiquity, skeleton_type) in enumerate(SKELETON_TYPES[declaration]) if q['antiquity'].hi >= minimum_antiquity and (index + 1 == len(SKELETON_TYPES[declaration]) or q['antiquity'].lo < SKELETON_TYPES[declaration][index + 1][0])]
+            q['skeleton_in_progress'] = _Interval(min(skeleton_types), max(skeleton_types))
+
+            combinations.update(
+                    (torso, declaration, buyer)
+                    for buyer in AvailableBuyers(occasional_buyer, diplomat_fascination, desired_buyers)
+                    if buyer not in excluded and _Interval.Of(BUYER_FORMULAS[buyer](q, bone_market_fluctuations, Power)[0]).Possible()
+                    )
+
+    return frozenset(combinations)
@@ -0,0 +1,170 @@
+"""Trace the trade-off between profit and exhaustion by solving for every exhaustion cap."""
+
+__all__ = ['FrontierPoint', 'PrintableFrontier', 'SolveFrontier']
+__author__ = "Jeremy Saklad"
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from os import cpu_count
+
+from ortools.sat.python import cp_model
+
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.torsos import Torso
+from .presets import PRESETS_FILE, ApplyParameters, LoadPreset
+from .solve import PROFIT_MARGIN_MULTIPLIER, AddSearchStrategy, CreateModel, NewSolver
+
+@dataclass(frozen=True)
+class FrontierPoint:
+    """The best skeleton found when exhaustion is limited to a certain cap."""
+
+    # Maximum exhaustion the skeleton was allowed to generate
+    maximum_exhaustion: int
+
+    # Exhaustion actually generated by the skeleton
+    exhaustion: int
+
+    net_profit: int = 0
+
+    # Multiplied by PROFIT_MARGIN_MULTIPLIER
+    profit_margin: int = 0
+
+    total_revenue: int = 0
+
+    cost: int = 0
+
+    # Each action used by the skeleton and the number of times it is used
+    actions: tuple = ()
+
+    # Whether the solver proved that no better skeleton exists under this cap
+    optimal: bool = False
+
+    def Objective(self, objective):
+        return self.profit_margin if objective == 'margin' else self.net_profit
+
+    def Action(self, enum):
+        """Return the first action of the specified enumeration used by the skeleton."""
+        return next((action for action, _ in self.actions if isinstance(action, enum)), None)
+
+
+def _SweepExhaustion(arguments, objective, caps, solver_arguments, search_strategy = 'default', value_heuristic = 'min', parameters = {}):
+    """Solve a single model for each exhaustion cap in ascending order, hinting each solve with the last skeleton found.
+
+Returns the points found and the total deterministic time spent solving."""
+
+    model, actions, qualities = CreateModel(**arguments)
+
+    if objective == 'profit':
+        model.Maximize(qualities['net_profit'])
+
+    solver = NewSolver(**solver_arguments)
+    ApplyParameters(solver, parameters)
+
+    AddSearchStrategy(model, actions, solver, search_strategy, value_heuristic)
+
+    points = []
+    deterministic_time = 0.0
+
+    for cap in caps:
+        model.SetBounds(qualities['exhaustion'], 0, cap)
+
+        status = solver.Solve(model)
+        deterministic_time += solver.ResponseProto().deterministic_time
+
+        # Caps below the least exhaustion possible have no skeleton to report
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            continue
+
+        # The skeleton for this cap is also valid for every higher cap
+        model.HintSolution(solver.ResponseProto().solution)
+
+        points.append(FrontierPoint(
+            maximum_exhaustion = cap,
+            exhaustion = solver.Value(qualities['exhaustion']),
+            net_profit = solver.Value(qualities['net_profit']),
+            profit_margin = solver.Value(qualities['profit_margin']),
+            total_revenue = solver.Value(qualities['total_revenue']),
+            cost = solver.Value(qualities['cost']),
+            actions = tuple((action, count) for action, variable in actions.items() if (count := solver.Value(variable))),
+            optimal = status == cp_model.OPTIMAL,
+            ))
+
+    return points, deterministic_time
+
+
+def PrintableFrontier(points, deterministic_time = None):
+    """Format frontier points as a table, from least to most exhaustion, followed by the total deterministic time if it is provided."""
+
+    output = f"{'Exhaustion':>10}  {'Profit':>12}  {'Profit Margin':>13}  {'Revenue':>12}  {'Cost':>12}  Torso / Declaration / Buyer\n"
+
+    for point in points:
+        output += f"{point.exhaustion:>10n}{' ' if point.optimal else '*'} {f'£{point.net_profit/100:,.2f}':>12}  {point.profit_margin/PROFIT_MARGIN_MULTIPLIER:>+13,.2%}  {f'£{point.total_revenue/100:,.2f}':>12}  {f'£{point.cost/100:,.2f}':>12}  {point.Action(Torso).name} / {point.Action(Declaration).name} / {point.Action(Buyer).name}\n"
+
+    if not all(point.optimal for point in points):
+        output += "\n* skeleton may be suboptimal for this amount of exhaustion"
+
+    if deterministic_time is not None:
+        output += f"\nDeterministic Time: {deterministic_time:,.2f}s"
+
+    return output.rstrip()
+
+
+def SolveFrontier(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = float('inf'), workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False, blacklist = [], prune_dominated = True, cost_tables = False, precheck = True, search_strategy = 'default', value_heuristic = 'min', preset = None, presets_file = PRESETS_FILE, objective = 'margin', processes = None):
+    """Find the Pareto frontier of profit margin (or absolute profit, if `objective` is 'profit') against exhaustion.
+
+Each exhaustion cap is solved separately, with `time_limit` and `deterministic_time` applying to each solve. Contiguous ranges of caps are distributed across `processes` worker processes."""
+
+    arguments = {
+            'shadowy_level': shadowy_level,
+            'bone_market_fluctuations': bone_market_fluctuations,
+            'zoological_mania': zoological_mania,
+            'occasional_buyer': occasional_buyer,
+            'diplomat_fascination': diplomat_fascination,
+            'desired_buyers': desired_buyers,
+            'maximum_cost': maximum_cost,
+            'maximum_exhaustion': maximum_exhaustion,
+            'blacklist': blacklist,
+            'prune_dominated': prune_dominated,
+            'cost_tables': cost_tables,
+            'precheck': precheck,
+            }
+
+    solver_arguments = {
+            'time_limit': time_limit,
+            'workers': workers,
+            'deterministic_time': deterministic_time,
+            'random_seed': random_seed,
+            'interleave_search': interleave_search,
+            }
+
+    parameters = LoadPreset(preset, presets_file) if preset is not None else {}
+
+    # The least restrictive cap determines the most exhaustion worth considering
+    points, total_deterministic_time = _SweepExhaustion(arguments, objective, (maximum_exhaustion,), solver_arguments, search_strategy, value_heuristic, parameters)
+
+    if not points:
+        raise RuntimeError("There is no satisfactory skeleton.")
+
+    caps = range(points[0].exhaustion)
+
+    if caps:
+        processes = min(processes or cpu_count(), len(caps))
+        ranges = [caps[len(caps)*index//processes:len(caps)*(index + 1)//processes] for index in range(processes)]
+
+        # Each process builds its own model, so CP-SAT workers are divided between them
+        range_solver_arguments = {**solver_arguments, 'workers': max(1, (workers or cpu_count())//processes)}
+
+        with ProcessPoolExecutor(processes) as executor:
+            for future in [executor.submit(_SweepExhaustion, arguments, objective, cap_range, range_solver_arguments, search_strategy, value_heuristic, parameters) for cap_range in ranges]:
+                range_points, range_deterministic_time = future.result()
+                points += range_points
+                total_deterministic_time += range_deterministic_time
+
+    # Only keep skeletons that are more profitable than every skeleton with less exhaustion
+    frontier = []
+    for point in sorted(points, key = lambda point : (point.exhaustion, -point.Objective(objective))):
+        if not frontier or point.Objective(objective) > frontier[-1].Objective(objective):
+            frontier.append(point)
+
+    return PrintableFrontier(frontier, total_deterministic_time)
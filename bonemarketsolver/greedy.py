@@ -0,0 +1,227 @@
+"""Build a good skeleton by greedy construction, without searching."""
+
+__all__ = ['GreedySkeleton']
+__author__ = "Jeremy Saklad"
+
+from dataclasses import asdict
+from functools import cache
+from itertools import combinations_with_replacement
+from typing import Final
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+from .batch import ACTIONS, EvaluateBatch
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.declarations import Declaration
+from .data.embellishments import Embellishment
+from .data.torsos import Torso
+from .dominance import AvailableBuyers, DominatedActions
+from .evaluate import COEFFICIENTS, DECLARATION_REQUIREMENTS, LINEAR_TERMS, Evaluate
+from .result import SolveResult
+from .solve import PROFIT_MARGIN_MULTIPLIER
+
+_COLUMNS: Final = {action: column for column, action in enumerate(ACTIONS)}
+
+_TERMS: Final = {term: index for index, term in enumerate(LINEAR_TERMS)}
+
+# Parts that fill one slot of each kind, and so may be swapped for each other
+_FILLERS: Final = {slot: tuple(action for action in ACTIONS if COEFFICIENTS[action][_TERMS[slot]] == -1) for slot in ('skulls_needed', 'limbs_needed', 'tails_needed')}
+
+# Kinds of limb that declarations distinguish between
+_LIMBS: Final = ('arms', 'legs', 'wings', 'fins', 'tentacles')
+
+# Actions that may be added or removed at any time without filling a slot
+_TWEAKS: Final = (*Adjustment, *Embellishment, Appendage.REMOVE_TAIL)
+
+# Lowers the score of a skeleton the buyer would not accept below that of any skeleton it would, since no profit margin is anywhere near this large
+_INFEASIBLE: Final = 2**50
+
+
+def _Cheapest(actions):
+    return min(actions, key = lambda action : int(action.value.cost), default = None)
+
+
+@cache
+def _Compositions(kinds, slots):
+    """Return the number of each kind of part, with one row for every way to fill the slots."""
+    return np.array([np.bincount(chosen, minlength=kinds) for chosen in combinations_with_replacement(range(kinds), slots)], dtype=np.int64).reshape(-1, kinds)
+
+
+def _Plans(torso, allowed, declarations):
+    """Return a row of action counts for each way to fill the torso's slots with the cheapest parts that some declaration would accept."""
+
+    torso_coefficients = dict(zip(LINEAR_TERMS, COEFFICIENTS[torso]))
+
+    skull = _Cheapest(action for action in _FILLERS['skulls_needed'] if action in allowed and action.value.skulls == 1)
+    blank = _Cheapest(action for action in _FILLERS['skulls_needed'] if action in allowed and action.value.skulls == 0)
+    tail = _Cheapest(action for action in _FILLERS['tails_needed'] if action in allowed)
+    limbs = {kind: limb for kind in _LIMBS if (limb := _Cheapest(action for action in _FILLERS['limbs_needed'] if action in allowed and getattr(action.value, kind) == 1)) is not None}
+
+    skull_slots = torso_coefficients['skulls_needed']
+    tail_slots = torso_coefficients['tails_needed']
+
+    # Number of real skulls, with any other skull slots filled by something that is not a skull
+    skull_counts = range(0 if blank is not None else skull_slots, skull_slots + 1) if skull is not None else (0,) if blank is not None else ()
+
+    # Number of tails, with any other tail slots skipped
+    tail_counts = range(0 if Appendage.SKIP_TAILS in allowed else tail_slots, tail_slots + 1) if tail is not None else (0,) if Appendage.SKIP_TAILS in allowed or not tail_slots else ()
+
+    rows = []
+
+    for joints in (0, 1) if Appendage.ADD_JOINTS in allowed else (0,):
+        limb_slots = torso_coefficients['limbs_needed'] + 4*joints
+
+        # The number of each kind of limb, for every way to fill the limb slots
+        compositions = _Compositions(len(limbs), limb_slots)
+
+        composition_index, skulls, tails = (grid.ravel() for grid in np.meshgrid(np.arange(len(compositions)), np.array(skull_counts, dtype=np.int64), np.array(tail_counts, dtype=np.int64), indexing='ij'))
+        if not len(composition_index):
+            continue
+
+        q = {kind: torso_coefficients[kind] + (compositions[composition_index, tuple(limbs).index(kind)] if kind in limbs else 0) for kind in _LIMBS}
+        q.update(skulls = skulls, tails = torso_coefficients['tails'] + tails, torso_style = torso.value.torso_style)
+
+        # Chimeras accept anything, so only one arrangement is needed as a starting point
+        chimera = (skulls == skull_counts[-1]) & (tails == tail_counts[-1]) & (joints == 0) & ((compositions > 0).sum(axis=1) <= 1)[composition_index]
+
+        parts = np.zeros((len(composition_index), len(ACTIONS)), dtype=np.int64)
+        parts[:, _COLUMNS[torso]] = 1
+        parts[:, _COLUMNS[Appendage.ADD_JOINTS]] = joints
+        parts[:, _COLUMNS[Appendage.SKIP_TAILS]] = tails < tail_slots
+        if skull is not None:
+            parts[:, _COLUMNS[skull]] += skulls
+        if blank is not None:
+            parts[:, _COLUMNS[blank]] += skull_slots - skulls
+        if tail is not None:
+            parts[:, _COLUMNS[tail]] += tails
+        for index, limb in enumerate(limbs.values()):
+            parts[:, _COLUMNS[limb]] += compositions[composition_index, index]
+
+        for declaration in declarations:
+            accepted = parts[chimera if declaration == Declaration.CHIMERA else np.broadcast_to(DECLARATION_REQUIREMENTS[declaration](q), chimera.shape)]
+            accepted[:, _COLUMNS[declaration]] = 1
+            rows.append(accepted)
+
+    return rows
+
+
+def _Neighbours(skeletons, swaps, tweaks):
+    """Return every skeleton that differs from one of `skeletons` by swapping one or every part of one kind for another that fills the same slots, or by taking one more or one less adjustment, along with the index of the skeleton each came from."""
+
+    removed, added = swaps.T
+
+    origins, moves = np.nonzero(skeletons[:, removed] > 0)
+    amounts = skeletons[origins, removed[moves]]
+
+    # Swapping every part only differs from swapping one when there are several
+    origins, moves, amounts = np.concatenate((origins, origins[amounts > 1])), np.concatenate((moves, moves[amounts > 1])), np.concatenate((np.ones_like(amounts), amounts[amounts > 1]))
+
+    swapped = skeletons[origins]
+    swapped[np.arange(len(origins)), removed[moves]] -= amounts
+    swapped[np.arange(len(origins)), added[moves]] += amounts
+
+    # Every adjustment, once more and once less, for every skeleton
+    tweak_origins = np.tile(np.repeat(np.arange(len(skeletons)), len(tweaks)), 2)
+    tweak_moves = np.tile(np.arange(len(tweaks)), 2*len(skeletons))
+    changes = np.repeat((1, -1), len(skeletons)*len(tweaks))
+
+    tweaked = skeletons[tweak_origins]
+    tweaked[np.arange(len(tweak_origins)), tweaks[tweak_moves]] += changes
+
+    # Taking an adjustment fewer times than never is not possible
+    possible = tweaked[np.arange(len(tweak_origins)), tweaks[tweak_moves]] >= 0
+
+    return np.concatenate((swapped, tweaked[possible])), np.concatenate((origins, tweak_origins[possible]))
+
+
+def GreedySkeleton(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, blacklist = [], prune_dominated = True, starts = 40, iterations = 50):
+    """Quickly build a skeleton that is good, but not necessarily the best, returning it as a SolveResult (or None, if no skeleton was found).
+
+Every torso is combined with each declaration that can accept it, with each slot filled by the cheapest suitable part, and the `starts` most profitable pairs of torso and buyer are kept, along with the most profitable for each buyer. Each skeleton is then repeatedly improved by whichever change would most improve its profit margin, swapping one or every part of a kind for another or adding or removing an adjustment, for up to `iterations` rounds.
+
+This takes around half a second for a scenario open to every buyer, which is spent before the solver starts.
+
+The result is reported as FEASIBLE, with a bound that no skeleton can exceed, since nothing is known about how close it is to the best."""
+
+    excluded = {*blacklist}
+    if prune_dominated:
+        excluded.update(DominatedActions(occasional_buyer, diplomat_fascination, desired_buyers, blacklist))
+
+    allowed = frozenset(action for action in ACTIONS if action not in excluded)
+    buyers = tuple(buyer for buyer in AvailableBuyers(occasional_buyer, diplomat_fascination, desired_buyers) if buyer in allowed)
+    declarations = tuple(declaration for declaration in Declaration if declaration in allowed)
+
+    plans = np.concatenate([rows for torso in Torso if torso in allowed for rows in _Plans(torso, allowed, declarations)] or [np.empty((0, len(ACTIONS)), dtype=np.int64)])
+    if not buyers or not len(plans):
+        return None
+
+    def Scores(counts):
+        """Score every skeleton for every buyer, so that any skeleton a buyer accepts beats every one it does not."""
+
+        evaluation = EvaluateBatch(counts, shadowy_level, bone_market_fluctuations, zoological_mania, buyers)
+        feasible = evaluation.feasible & (evaluation.cost.data <= maximum_cost) & (evaluation.exhaustion.data <= maximum_exhaustion)
+        return evaluation.profit_margin.data - _INFEASIBLE*~feasible
+
+    scores = Scores(plans)
+
+    # The best plan for each pair of torso and buyer
+    torsos = plans[:, [_COLUMNS[torso] for torso in Torso]].argmax(axis=1)
+    best_rows = np.array([np.where(torsos[:, np.newaxis] == torso, scores, -2*_INFEASIBLE).argmax(axis=0) for torso in np.unique(torsos)])
+    best_scores = np.take_along_axis(scores, best_rows, axis=0)
+
+    # The most promising of these are the starting points, along with the best for each buyer
+    promising = np.argsort(-best_scores, axis=None, kind='stable')[:starts]
+    promising = np.union1d(promising, np.ravel_multi_index((best_scores.argmax(axis=0), np.arange(len(buyers))), best_scores.shape))
+    pair_torsos, owners = np.unravel_index(promising, best_scores.shape)
+
+    skeletons = plans[best_rows[pair_torsos, owners]]
+    skeleton_scores = best_scores[pair_torsos, owners]
+
+    swaps = np.array([(_COLUMNS[removed], _COLUMNS[added]) for fillers in _FILLERS.values() for removed in fillers for added in fillers if added is not removed and added in allowed], dtype=np.int64).reshape(-1, 2)
+    tweaks = np.array([_COLUMNS[tweak] for tweak in _TWEAKS if tweak in allowed], dtype=np.int64)
+
+    # Skeletons that are still being improved
+    active = np.arange(len(skeletons))
+
+    for _ in range(iterations):
+        if not len(active):
+            break
+
+        candidates, origins = _Neighbours(skeletons[active], swaps, tweaks)
+        origins = active[origins]
+
+        # Each neighbour is only scored for the buyer of the skeleton it came from
+        candidate_scores = Scores(candidates)[np.arange(len(origins)), owners[origins]]
+
+        # The best neighbour of each skeleton
+        ranked = np.lexsort((-candidate_scores, origins))
+        improvable, first = np.unique(origins[ranked], return_index=True)
+        chosen = ranked[first]
+
+        improved = candidate_scores[chosen] > skeleton_scores[improvable]
+        skeletons[improvable[improved]] = candidates[chosen[improved]]
+        skeleton_scores[improvable[improved]] = candidate_scores[chosen[improved]]
+
+        active = improvable[improved]
+
+    index = skeleton_scores.argmax()
+    if skeleton_scores[index] < -_INFEASIBLE//2:
+        return None
+
+    counts = {action: int(count) for action, count in zip(ACTIONS, skeletons[index]) if count}
+    counts[buyers[owners[index]]] = 1
+
+    evaluation = Evaluate(counts, shadowy_level, bone_market_fluctuations = bone_market_fluctuations, zoological_mania = zoological_mania)
+    qualities = {'shadowy_level': shadowy_level, **asdict(evaluation)}
+    del qualities['feasible']
+
+    return SolveResult(
+            status = 'FEASIBLE',
+            objective = evaluation.profit_margin,
+            bound = PROFIT_MARGIN_MULTIPLIER,
+            actions = tuple((action, counts[action]) for action in ACTIONS if action in counts),
+            qualities = qualities,
+            )
@@ -0,0 +1,343 @@
+"""Solve a queue of scenarios with long-lived worker processes, keeping track of jobs in a SQLite database."""
+
+__all__ = ['JOBS_FILE', 'EnqueueScenarios', 'JobCounts', 'JobResults', 'RunWorkers']
+__author__ = "Jeremy Saklad"
+
+import argparse
+import json
+import multiprocessing
+import sqlite3
+from contextlib import contextmanager
+from os import cpu_count, getpid
+from socket import gethostname
+from time import sleep, time
+from typing import Final
+
+from .batchsolve import ReadScenarios, SolveScenario, WarmModels
+from .scenario import DecodeScenario, EncodeScenario, ScenarioHash
+
+# Where jobs are kept, unless another database is specified
+JOBS_FILE: Final = 'jobs.sqlite'
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    leased_until REAL,
+    status TEXT,
+    result TEXT,
+    error TEXT
+)
+"""
+
+
+def _Connect(database):
+    # Transactions are managed explicitly, so that claiming a job can lock the database before reading it
+    connection = sqlite3.connect(database, timeout = 60, isolation_level = None)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+@contextmanager
+def _Transaction(connection):
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    else:
+        connection.execute("COMMIT")
+
+
+def EnqueueScenarios(scenarios, database = JOBS_FILE, shard = 0, shards = 1):
+    """Add each scenario to the queue, unless an identical scenario is already in it, and return the number added.
+
+To split the same scenarios between several machines, give each machine its own database and a different `shard` from 0 to `shards` - 1. Each then only queues the scenarios whose hash falls in its shard."""
+
+    connection = _Connect(database)
+
+    with _Transaction(connection):
+        added = sum(connection.execute("INSERT OR IGNORE INTO jobs (key, scenario) VALUES (?, ?)", (key, json.dumps(EncodeScenario(scenario)))).rowcount
+                for scenario in scenarios
+                if int(key := ScenarioHash(scenario), 16) % shards == shard)
+
+    connection.close()
+    return added
+
+
+def _Claim(connection, worker, max_attempts, lease):
+    """Lease the next job that is pending, or whose last lease ran out, to a worker. Returns its key and scenario, or None if there is no such job."""
+
+    now = time()
+
+    with _Transaction(connection):
+        job = connection.execute("SELECT key, scenario FROM jobs WHERE attempts < ? AND (state = 'pending' OR (state = 'running' AND leased_until < ?)) ORDER BY rowid LIMIT 1", (max_attempts, now)).fetchone()
+
+        if job is not None:
+            connection.execute("UPDATE jobs SET state = 'running', attempts = attempts + 1, worker = ?, leased_until = ? WHERE key = ?", (worker, now + lease, job[0]))
+
+    return job
+
+
+def _Release(connection, worker, max_attempts, error, key = None, refund = False):
+    """Return the jobs leased to a worker (or just the one with `key`) to the queue, or fail them if they have no attempts left.
+
+If `refund` is set, the attempt is not counted against the job."""
+
+    connection.execute(f"""UPDATE jobs SET
+            attempts = attempts - ?,
+            state = CASE WHEN attempts - ? < ? THEN 'pending' ELSE 'failed' END,
+            error = ?,
+            worker = NULL,
+            leased_until = NULL
+            WHERE state = 'running' AND worker = ?{' AND key = ?' if key is not None else ''}""",
+            (int(refund), int(refund), max_attempts, error, worker, *((key,) if key is not None else ())))
+
+
+# Models built by this worker, in case later scenarios only differ in maximum exhaustion
+_MODELS: Final = WarmModels()
+
+
+def _SolveJob(scenario, solver_arguments):
+    """Solve a scenario, reusing a model already built by this process if only the maximum exhaustion differs.
+
+Returns the name of the solver status and the result as JSON, or None if no skeleton was found."""
+
+    status, result = SolveScenario(scenario, _MODELS, **solver_arguments)
+    return status, result.ToJSON() if result is not None else None
+
+
+def _Work(database, max_attempts, lease, solver_arguments):
+    """Solve jobs until there are none left to claim."""
+
+    worker = f"{gethostname()}:{getpid()}"
+    connection = _Connect(database)
+
+    while (job := _Claim(connection, worker, max_attempts, lease)) is not None:
+        key, fields = job
+
+        try:
+            status, result = _SolveJob(DecodeScenario(json.loads(fields)), solver_arguments)
+        except Exception as error:
+            _Release(connection, worker, max_attempts, f"{type(error).__name__}: {error}", key)
+        else:
+            connection.execute("UPDATE jobs SET state = 'done', status = ?, result = ?, error = NULL, worker = NULL, leased_until = NULL WHERE key = ? AND worker = ?", (status, result, key, worker))
+
+    connection.close()
+
+
+def RunWorkers(database = JOBS_FILE, processes = None, max_attempts = 3, lease = 3600.0, poll_interval = 1.0, time_limit = float('inf'), deterministic_time = float('inf'), workers = 1, random_seed = None):
+    """Solve every job in the queue with `processes` worker processes, returning once no job can be claimed and every worker has finished.
+
+If a worker crashes, its job is returned to the queue and the worker is replaced. Jobs fail after `max_attempts` attempts, or if a lease of `lease` seconds runs out on the last attempt. `workers` is the number of search workers each process gives CP-SAT."""
+
+    processes = processes or cpu_count()
+    host = gethostname()
+    solver_arguments = {
+            'time_limit': time_limit,
+            'deterministic_time': deterministic_time,
+            'workers': workers,
+            'random_seed': random_seed,
+            'interleave_search': random_seed is not None and workers > 1,
+            }
+
+    connection = _Connect(database)
+    running = set()
+
+    try:
+        while True:
+            for process in [process for process in running if not process.is_alive()]:
+                process.join()
+                running.remove(process)
+
+                if process.exitcode:
+                    _Release(connection, f"{host}:{process.pid}", max_attempts, f"worker exited with code {process.exitcode}")
+
+            claimable, = connection.execute("SELECT COUNT(*) FROM jobs WHERE attempts < ? AND (state = 'pending' OR (state = 'running' AND leased_until < ?))", (max_attempts, time())).fetchone()
+
+            for _ in range(min(processes - len(running), claimable)):
+                process = multiprocessing.Process(target = _Work, args = (database, max_attempts, lease, solver_arguments))
+                process.start()
+                running.add(process)
+
+            if not running:
+                break
+
+            sleep(poll_interval)
+    finally:
+        for process in running:
+            process.terminate()
+            process.join()
+            _Release(connection, f"{host}:{process.pid}", max_attempts, "worker was stopped", refund = True)
+
+        # Leases that ran out on the last attempt will never be claimed again
+        connection.execute("UPDATE jobs SET state = 'failed', error = 'lease expired', worker = NULL, leased_until = NULL WHERE state = 'running' AND attempts >= ? AND leased_until < ?", (max_attempts, time()))
+        connection.close()
+
+
+def JobCounts(database = JOBS_FILE):
+    """Return a dictionary mapping each state to the number of jobs in it."""
+
+    connection = _Connect(database)
+    counts = dict(connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+    connection.close()
+    return counts
+
+
+def JobResults(database = JOBS_FILE):
+    """Yield a dictionary for each job, with its scenario and result in the same form as EncodeScenario and SolveResult.ToJSON."""
+
+    connection = _Connect(database)
+
+    for key, scenario, state, attempts, status, result, error in connection.execute("SELECT key, scenario, state, attempts, status, result, error FROM jobs ORDER BY rowid"):
+        yield {
+                'key': key,
+                'scenario': json.loads(scenario),
+                'state': state,
+                'attempts': attempts,
+                'status': status,
+                'result': json.loads(result) if result is not None else None,
+                'error': error,
+                }
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.jobs',
+            description="Queue scenarios and solve them with long-lived worker processes.",
+            )
+
+    parser.add_argument(
+            "-j", "--jobs",
+            default=JOBS_FILE,
+            help=f"SQLite database of jobs (default: {JOBS_FILE})",
+            dest='database'
+            )
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser(
+            "enqueue",
+            help="add scenarios to the queue",
+            description="Add each scenario in a file to the queue, skipping scenarios that are already queued.",
+            )
+
+    enqueue.add_argument(
+            "scenarios",
+            type=argparse.FileType('r'),
+            help="file with one scenario per line, as a JSON object of arguments to CreateModel (e.g. {\"shadowy_level\": 300, \"desired_buyers\": [\"Buyer.A_NAIVE_COLLECTOR\"]}), where a line of the form {\"defaults\": {...}} sets arguments shared by the scenarios after it",
+            )
+
+    def Shard(string):
+        try:
+            shard, shards = (int(number) for number in string.split("/"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"{string!r} is not of the form INDEX/COUNT")
+
+        if not 1 <= shard <= shards:
+            raise argparse.ArgumentTypeError(f"{string!r} is not a shard between 1/{shards} and {shards}/{shards}")
+
+        return shard - 1, shards
+
+    enqueue.add_argument(
+            "--shard",
+            default=(0, 1),
+            type=Shard,
+            help="only queue this machine's share of the scenarios, when the same file is split between several machines",
+            metavar="INDEX/COUNT",
+            dest='shard'
+            )
+
+    work = commands.add_parser(
+            "work",
+            help="solve queued scenarios",
+            description="Solve queued scenarios until none are left, retrying any whose worker crashed.",
+            )
+
+    work.add_argument(
+            "-p", "--processes",
+            type=int,
+            help="number of worker processes (default: one per available CPU thread)",
+            dest='processes'
+            )
+
+    work.add_argument(
+            "-t", "--time-limit",
+            default=float('inf'),
+            type=float,
+            help="maximum number of seconds to run each solve",
+            dest='time_limit'
+            )
+
+    work.add_argument(
+            "-d", "--deterministic-time",
+            default=float('inf'),
+            type=float,
+            help="maximum number of deterministic seconds to run each solve",
+            dest='deterministic_time'
+            )
+
+    work.add_argument(
+            "-w", "--workers",
+            default=1,
+            type=int,
+            help="number of search worker threads in each process (default: 1)",
+            dest='workers'
+            )
+
+    work.add_argument(
+            "-s", "--seed",
+            type=int,
+            help="random seed for the solver",
+            dest='random_seed'
+            )
+
+    work.add_argument(
+            "--attempts",
+            default=3,
+            type=int,
+            help="number of times a job may be tried before it fails (default: 3)",
+            dest='max_attempts'
+            )
+
+    work.add_argument(
+            "--lease",
+            default=3600.0,
+            type=float,
+            help="seconds after which a job is assumed abandoned by its worker and may be tried again (default: 3600)",
+            dest='lease'
+            )
+
+    commands.add_parser(
+            "status",
+            help="count jobs in each state",
+            )
+
+    commands.add_parser(
+            "results",
+            help="print every job and its result as JSON lines",
+            )
+
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        try:
+            scenarios = list(ReadScenarios(args.scenarios))
+        except ValueError as error:
+            parser.error(f"{args.scenarios.name}, {error}")
+
+        print(f"Queued {EnqueueScenarios(scenarios, args.database, *args.shard)} of {len(scenarios)} scenarios")
+    elif args.command == 'work':
+        RunWorkers(args.database, args.processes, args.max_attempts, args.lease, time_limit=args.time_limit, deterministic_time=args.deterministic_time, workers=args.workers, random_seed=args.random_seed)
+        print(*(f"{state}: {count}" for state, count in JobCounts(args.database).items()), sep="\n")
+    elif args.command == 'status':
+        print(*(f"{state}: {count}" for state, count in JobCounts(args.database).items()), sep="\n")
+    else:
+        for job in JobResults(args.database):
+            print(json.dumps(job))
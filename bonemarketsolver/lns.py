@@ -0,0 +1,267 @@
+"""Improve the best skeleton found by repeatedly solving again for only part of it, favouring whichever parts have paid off."""
+
+__all__ = ['NEIGHBOURHOODS', 'CompareLNS', 'SolveLNS']
+__author__ = "Jeremy Saklad"
+
+import argparse
+import json
+import random
+from contextlib import contextmanager
+from dataclasses import replace
+from os import cpu_count
+from time import perf_counter
+from typing import Final
+
+from ortools.sat.python import cp_model
+
+from .benchmark import SCENARIOS
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.embellishments import Embellishment
+from .data.skulls import Skull
+from .data.torsos import Torso
+from .greedy import GreedySkeleton
+from .result import SolveResult
+from .scenario import DecodeScenario
+from .solve import PROFIT_MARGIN_MULTIPLIER, CreateModel, NewSolver
+
+# Kinds of action kept as they are in the best skeleton so far, while every other action may change
+NEIGHBOURHOODS: Final = {
+        'torso_skulls': (Torso, Skull),
+        'buyer_declaration': (Buyer, Declaration),
+        'torso_declaration': (Torso, Declaration),
+        'parts': (Torso, Skull, Appendage),
+        'adjustments': (Adjustment, Embellishment, Buyer),
+        'free': (),
+        }
+
+# Added to the weight of every neighbourhood when choosing one, so that none is never tried again
+_MINIMUM_WEIGHT: Final = 0.05
+
+
+@contextmanager
+def _Bounded(model, bounds):
+    """Replace the bounds of some variables while the context is active, then restore their original domains.
+
+`bounds` maps the index of each variable to the variable and its new bounds."""
+
+    originals = [(variable, list(cp_model.IntVar.Proto(variable).domain)) for variable, _, _ in bounds.values()]
+
+    try:
+        for variable, lb, ub in bounds.values():
+            model.SetBounds(variable, lb, ub)
+        yield
+    finally:
+        for variable, domain in originals:
+            cp_model.IntVar.Proto(variable).domain[:] = domain
+
+
+def _HintGreedy(model, actions, scenario):
+    """Hint the greedy skeleton for a scenario of arguments to CreateModel, returning it (or None, if none was found)."""
+
+    greedy = GreedySkeleton(**{key: value for key, value in scenario.items() if key not in ('reusable', 'cost_tables', 'precheck')})
+
+    if greedy is not None:
+        # Excluded actions may share a single constant, which must only be hinted once
+        counts = dict(greedy.actions)
+        for variable, value in {variable.Index(): (variable, counts.get(action, 0)) for action, variable in actions.items()}.values():
+            model.AddHint(variable, value)
+
+    return greedy
+
+
+def SolveLNS(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = 60.0, sub_time_limit = 5.0, workers = cpu_count(), random_seed = None, blacklist = [], prune_dominated = True, cost_tables = False, precheck = True, decay = 0.8):
+    """Find a good skeleton by large neighbourhood search, returning it as a SolveResult (or None, if no skeleton was found).
+
+A single model is built, and the search starts from the greedy skeleton. Until `time_limit` seconds have passed since the start, one of NEIGHBOURHOODS is chosen, the actions it names are fixed to those of the best skeleton so far, and the rest is solved again for at most `sub_time_limit` seconds, requiring a better profit margin. Any improvement is kept.
+
+Each neighbourhood is chosen in proportion to its weight, which moves towards the gain in profit margin (in percentage points) of each of its solves by a factor of `1 - decay`. A neighbourhood that is proved to hold no improvement is not chosen again until the skeleton improves. If the free neighbourhood, which fixes nothing, holds no improvement, the skeleton is optimal and the search stops early."""
+
+    start = perf_counter()
+
+    scenario = {
+            'shadowy_level': shadowy_level,
+            'bone_market_fluctuations': bone_market_fluctuations,
+            'zoological_mania': zoological_mania,
+            'occasional_buyer': occasional_buyer,
+            'diplomat_fascination': diplomat_fascination,
+            'desired_buyers': desired_buyers,
+            'maximum_cost': maximum_cost,
+            'maximum_exhaustion': maximum_exhaustion,
+            'blacklist': blacklist,
+            'prune_dominated': prune_dominated,
+            'cost_tables': cost_tables,
+            'precheck': precheck,
+            }
+
+    model, actions, qualities = CreateModel(**scenario)
+    greedy = _HintGreedy(model, actions, scenario)
+
+    solver = NewSolver(workers = workers, random_seed = random_seed)
+
+    # Probing fixed actions during presolve ignores the time limit, and can take far longer than a neighbourhood is given
+    solver.parameters.cp_model_probing_level = 0
+    rng = random.Random(random_seed)
+
+    profit_margin = qualities['profit_margin']
+    upper_bound = cp_model.IntVar.Proto(profit_margin).domain[-1]
+
+    # The best skeleton so far, and the count of each action in it by variable index
+    incumbent = greedy
+    counts = {variable.Index(): dict(greedy.actions).get(action, 0) for action, variable in actions.items()} if greedy is not None else None
+
+    bound = PROFIT_MARGIN_MULTIPLIER
+    proved = False
+    deterministic_time = 0.0
+
+    weights = dict.fromkeys(NEIGHBOURHOODS, 1.0)
+    exhausted = set()
+
+    while (remaining := time_limit - (perf_counter() - start)) > 0:
+        if incumbent is None:
+            # Nothing can be fixed until a skeleton has been found
+            name = 'free'
+            bounds = {}
+        else:
+            candidates = [name for name in NEIGHBOURHOODS if name not in exhausted]
+            name, = rng.choices(candidates, [weights[name] + _MINIMUM_WEIGHT for name in candidates])
+
+            bounds = {variable.Index(): (variable, value, value) for action, variable in actions.items() if isinstance(action, NEIGHBOURHOODS[name]) for value in (counts[variable.Index()],)}
+            bounds[profit_margin.Index()] = (profit_margin, incumbent.objective + 1, upper_bound)
+
+        solver.parameters.max_time_in_seconds = min(sub_time_limit, remaining)
+
+        with _Bounded(model, bounds):
+            status = solver.Solve(model)
+
+        response = solver.ResponseProto()
+        deterministic_time += response.deterministic_time
+
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            result = SolveResult.FromResponse(response, actions, qualities)
+            gain = result.objective - incumbent.objective if incumbent is not None else 0
+
+            incumbent = result
+            counts = {variable.Index(): response.solution[variable.Index()] for variable in actions.values()}
+            model.HintSolution(response.solution)
+            exhausted.clear()
+        elif status == cp_model.INFEASIBLE:
+            gain = 0
+
+            # Without a skeleton to improve on, nothing can satisfy the buyers
+            if incumbent is None:
+                return None
+
+            exhausted.add(name)
+        else:
+            gain = 0
+
+        # Any better skeleton would also satisfy the free neighbourhood, so its bound holds everywhere
+        if name == 'free':
+            if status == cp_model.OPTIMAL or status == cp_model.INFEASIBLE:
+                proved = True
+                bound = incumbent.objective
+                break
+            elif incumbent is not None and response.best_objective_bound > incumbent.objective:
+                bound = min(bound, round(response.best_objective_bound))
+
+        weights[name] = decay*weights[name] + (1 - decay)*100*gain/PROFIT_MARGIN_MULTIPLIER
+
+    if incumbent is None:
+        return None
+
+    return replace(incumbent,
+            status = 'OPTIMAL' if proved else 'FEASIBLE',
+            bound = bound,
+            wall_time = perf_counter() - start,
+            deterministic_time = deterministic_time,
+            )
+
+
+def CompareLNS(scenarios = tuple(scenario for scenario in SCENARIOS if 'desired_buyers' not in scenario), time_limit = 60.0, sub_time_limit = 5.0, workers = cpu_count(), random_seed = None):
+    """Solve every scenario with plain CP-SAT and with large neighbourhood search, each given the same wall-clock budget, returning a table of the profit margins found.
+
+Both include building the model in their budget, and both start from the greedy skeleton. By default, the benchmark scenarios open to every buyer are solved."""
+
+    output = f"{'Scenario':>8}  {'Plain':>10}  {'Plain Bound':>11}  {'LNS':>10}  {'LNS Bound':>11}  {'Gain':>9}\n"
+    wins = 0
+
+    def Margin(value):
+        return f"{value/PROFIT_MARGIN_MULTIPLIER:+.2%}"
+
+    for index, scenario in enumerate(scenarios):
+        start = perf_counter()
+
+        model, actions, qualities = CreateModel(**scenario)
+        greedy = _HintGreedy(model, actions, scenario)
+
+        solver = NewSolver(max(time_limit - (perf_counter() - start), 0.0), workers, random_seed = random_seed)
+        status = solver.Solve(model)
+
+        plain = SolveResult.FromResponse(solver.ResponseProto(), actions, qualities) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else greedy
+        lns = SolveLNS(**scenario, time_limit = time_limit, sub_time_limit = sub_time_limit, workers = workers, random_seed = random_seed)
+
+        plain_objective, lns_objective = (result.objective if result is not None else None for result in (plain, lns))
+
+        if None in (plain_objective, lns_objective):
+            gain = "-"
+        else:
+            gain = f"{(lns_objective - plain_objective)/PROFIT_MARGIN_MULTIPLIER:+.2%}"
+            wins += lns_objective > plain_objective
+
+        output += f"{index:>8n}  {Margin(plain_objective) if plain is not None else '-':>10}  {Margin(plain.bound) if plain is not None else '-':>11}  {Margin(lns_objective) if lns is not None else '-':>10}  {Margin(lns.bound) if lns is not None else '-':>11}  {gain:>9}\n"
+
+    output += f"\nLNS found a better skeleton in {wins:n} of {len(scenarios):n} scenarios with {time_limit:n}s each"
+
+    return output
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.lns',
+            description="Compare large neighbourhood search against plain CP-SAT, giving both the same wall-clock budget for each scenario.",
+            )
+
+    parser.add_argument(
+            "scenarios",
+            nargs="*",
+            type=lambda scenario : DecodeScenario(json.loads(scenario)),
+            help="scenarios to solve, as JSON objects of arguments to CreateModel (default: the benchmark scenarios open to every buyer)",
+            )
+
+    parser.add_argument(
+            "-t", "--time-limit",
+            default=60.0,
+            type=float,
+            help="number of seconds to spend on each scenario with each method",
+            dest='time_limit'
+            )
+
+    parser.add_argument(
+            "-n", "--sub-time-limit",
+            default=5.0,
+            type=float,
+            help="maximum number of seconds to spend on each neighbourhood",
+            dest='sub_time_limit'
+            )
+
+    parser.add_argument(
+            "-w", "--workers",
+            default=cpu_count(),
+            type=int,
+            help="number of search worker threads to run in parallel",
+            dest='workers'
+            )
+
+    parser.add_argument(
+            "-s", "--seed",
+            type=int,
+            help="random seed for the solver and for choosing neighbourhoods",
+            dest='random_seed'
+            )
+
+    args = parser.parse_args()
+
+    print(CompareLNS(**{key: value for key, value in vars(args).items() if key != 'scenarios'}, **({'scenarios': args.scenarios} if args.scenarios else {})))
@@ -1,7 +1,7 @@
 __all__ = ['Action']
 __author__ = "Jeremy Saklad"
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 
 @dataclass(frozen=True)
 class Action:
@@ -71,5 +71,9 @@ class Action:
     # Bone Market Exhaustion
     exhaustion: int = 0
 
+    def __reduce__(self):
+        # Frozen fields cannot be restored by assignment, so they are passed to the constructor instead
+        return (self.__class__, tuple(getattr(self, field.name) for field in fields(self)))
+
     def __str__(self):
         return str(self.name)
@@ -1,7 +1,7 @@
 __author__: str = "Jeremy Saklad"
 
 from collections.abc import Iterable
-from functools import cache, partialmethod, reduce, singledispatch, singledispatchmethod
+from functools import partialmethod, reduce, singledispatch, singledispatchmethod
 from numbers import Integral, Number
 from typing import Final
 
@@ -10,10 +10,18 @@ from ortools.sat.python import cp_model
 class BoneMarketModel(cp_model.CpModel):
     """A CpModel with additional functions for common constraints and enhanced enforcement literal support."""
 
-    __slots__: tuple[()] = ()
+    __slots__: tuple[str, ...] = ('_bool_expressions', '_subterms')
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # Kept on the model rather than in a functools cache, which would keep every model alive
+        self._bool_expressions: dict = {}
+        self._subterms: dict = {}
 
     def AddAllowedAssignments(self, variables: Iterable[Iterable], tuples_list: Iterable[Iterable]) -> tuple:
-        intermediate_variables, constraints = (lambda invocation : zip(*(self.NewIntermediateIntVar(variable, f'{invocation}: {variable}') for variable in variables)))(repr((variables, tuples_list)))
+        # Tables may be large, so only the variables are used for names
+        intermediate_variables, constraints = (lambda invocation : zip(*(self.NewIntermediateIntVar(variable, f'{invocation}: {variable}') for variable in variables)))(f'{repr(variables)} in table')
         super().AddAllowedAssignments(intermediate_variables, tuples_list)
         return constraints
 
@@ -42,7 +50,12 @@ Each parameter is interpreted as a BoundedLinearExpression, and a layer of indir
     def AddIf(self, variable, *constraints: tuple) -> frozenset:
         """Add constraints to the model, only enforced if the specified variable is true.
 
-Each item in `constraints` must be either a BoundedLinearExpression, a Constraint compatible with OnlyEnforceIf, a 0-arity partial method of CpModel returning a valid item, or an iterable containing valid items."""
+Each item in `constraints` must be either a BoundedLinearExpression, a Constraint compatible with OnlyEnforceIf, a 0-arity partial method of CpModel returning a valid item, or an iterable containing valid items.
+
+If the variable is a constant false, nothing is added to the model, so partial methods are never called."""
+
+        if isinstance(variable, cp_model.IntVar) and tuple(cp_model.IntVar.Proto(variable).domain) == (0, 0):
+            return frozenset()
 
         @singledispatch
         def Add(constraint: Iterable) -> frozenset:
@@ -65,36 +78,91 @@ Each item in `constraints` must be either a BoundedLinearExpression, a Constrain
     def AddMultiplicationEquality(self, target, variables: Iterable) -> tuple:
         """Adds `target == variables[0] * .. * variables[n]`.
 
+Constant factors are folded into a single coefficient, repeated factors are raised to a power by squaring, and the remaining factors are multiplied as a balanced tree.
+
 Each parameter is interpreted as a BoundedLinearExpression, and a layer of indirection is applied such that each Constraint in the returned tuple can accept an enforcement literal."""
 
         superclass: Final = super()
 
-        def Multiply(end, stack: list) -> tuple:
-            intermediate_variable, variable_constraint = self.NewIntermediateIntVar(stack.pop(), f'{repr(end)} == {"*".join((repr(variable) for variable in stack))}: last variable')
+        # Iterated more than once, so a generator would be exhausted after naming
+        variables = tuple(variables)
+
+        # Used for variable names
+        invocation: Final[str] = f'{repr(target)} == {"*".join((repr(variable) for variable in variables))}'
+
+        coefficient: Integral = 1
+
+        # Each distinct factor and the number of times it occurs, keyed by structure
+        factors: Final[dict] = {}
+
+        for variable in variables:
+            if isinstance(variable, cp_model.IntVar) and (lambda domain : domain[0] == domain[1])(cp_model.IntVar.Proto(variable).domain):
+                coefficient *= cp_model.IntVar.Proto(variable).domain[0]
+            elif isinstance(variable, Integral):
+                coefficient *= variable
+            else:
+                key = _Structure(variable) if isinstance(variable, cp_model.LinearExpr) else id(variable)
+                factors[key] = (variable, factors[key][1] + 1 if key in factors else 1)
+
+        if coefficient == 0 or not factors:
+            return (self.Add(target == coefficient),)
+
+        def Product(left: cp_model.IntVar, right: cp_model.IntVar) -> cp_model.IntVar:
+            product: Final[cp_model.IntVar] = self.NewIntVar(f'{invocation}: product')
+            superclass.AddMultiplicationEquality(product, (left, right))
+            return product
+
+        def Power(base: cp_model.IntVar, exp: Integral) -> cp_model.IntVar:
+            if exp == 1:
+                return base
+            square: Final[cp_model.IntVar] = (lambda root : Product(root, root))(Power(base, exp // 2))
+            return Product(square, base) if exp % 2 else square
+
+        def Tree(terms: list) -> cp_model.IntVar:
+            return terms[0] if len(terms) == 1 else Product(Tree(terms[:len(terms)//2]), Tree(terms[len(terms)//2:]))
 
-            partial_target: Final[cp_model.IntVar] = self.NewIntVar(f'{repr(end)} == {"*".join((repr(variable) for variable in stack))}: partial target')
-            recursive_constraints: Final[tuple] = self.AddMultiplicationEquality(partial_target, stack) if len(stack) > 1 else (self.Add(partial_target == stack.pop()),)
+        intermediate_variables, variable_constraints = zip(*(self.NewIntermediateIntVar(variable, f'{invocation}: factor') for variable, _ in factors.values()))
 
-            intermediate_target, target_constraint = self.NewIntermediateIntVar(end, f'{repr(end)} == {"*".join((repr(variable) for variable in stack))}: target')
+        product: Final[cp_model.IntVar] = Tree([Power(intermediate_variable, exp) for intermediate_variable, (_, exp) in zip(intermediate_variables, factors.values())])
 
-            superclass.AddMultiplicationEquality(intermediate_target, (partial_target, intermediate_variable))
+        return (*variable_constraints, self.Add(target == coefficient*product))
 
-            return (variable_constraint, *recursive_constraints, target_constraint)
+    def AddSharedDivisionEquality(self, target, num, denom: Integral) -> tuple:
+        """Adds `target == num // denom`, sharing the division with every identical quotient in the model.
 
-        # Avoid mutating parameter directly
-        return Multiply(target, variables.copy() if isinstance(variables, list) else list(variables))
+The quotient itself is added unconditionally the first time it is needed, so `num` must always be nonnegative. Only the returned Constraint linking it to `target` can accept an enforcement literal."""
+        return (self.Add(target == self._SharedIntVar(('//', _Structure(num), denom), partialmethod(BoneMarketModel.AddDivisionEquality, num=num, denom=denom), f'{repr(num)} // {repr(denom)}')),)
+
+    def AddSharedMultiplicationEquality(self, target, variables: Iterable) -> tuple:
+        """Adds `target == variables[0] * .. * variables[n]`, sharing the multiplication with every identical product in the model.
+
+The product itself is added unconditionally the first time it is needed. Only the returned Constraint linking it to `target` can accept an enforcement literal."""
+        variables = tuple(variables)
+        return (self.Add(target == self._SharedIntVar(('*', *sorted(_Structure(variable) for variable in variables)), partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=variables), "*".join(repr(variable) for variable in variables))),)
 
-    @cache
     def BoolExpression(self, bounded_linear_exp: cp_model.BoundedLinearExpression) -> cp_model.IntVar:
         """Add a fully-reified implication using an intermediate Boolean variable."""
 
+        expressions: Final[dict] = self._bool_expressions
+        if bounded_linear_exp in expressions:
+            return expressions[bounded_linear_exp]
+
         intermediate: Final[cp_model.IntVar] = self.NewBoolVar(str(bounded_linear_exp))
+        expressions[bounded_linear_exp] = intermediate
         linear_exp: Final[cp_model.LinearExp] = bounded_linear_exp.Expression()
         domain: Final[cp_model.Domain] = cp_model.Domain(*bounded_linear_exp.Bounds())
         self.AddLinearExpressionInDomain(linear_exp, domain).OnlyEnforceIf(intermediate)
         self.AddLinearExpressionInDomain(linear_exp, domain.Complement()).OnlyEnforceIf(intermediate.Not())
         return intermediate
 
+    def HintSolution(self, solution: Iterable[Integral]) -> None:
+        """Replace any existing hints with a complete solution to this model, such as the `solution` field of a previous response."""
+
+        self.ClearHints()
+        hint: Final = self.Proto().solution_hint
+        hint.vars.extend(range(len(solution)))
+        hint.values.extend(solution)
+
     @singledispatchmethod
     def NewIntermediateIntVar(self, expression: cp_model.LinearExpr, name: str, *, lb: Integral = cp_model.INT32_MIN, ub: Integral = cp_model.INT32_MAX) -> tuple:
         """Creates an integer variable equivalent to the given expression and returns a tuple consisting of the variable and constraints for use with enforcement literals.
@@ -117,3 +185,26 @@ Each parameter is interpreted as a BoundedLinearExpression, and a layer of indir
 
     def NewIntVar(self, name: str, *, lb: Integral = cp_model.INT32_MIN, ub: Integral = cp_model.INT32_MAX) -> cp_model.IntVar:
         return super().NewIntVar(lb, ub, name)
+
+    def _SharedIntVar(self, key: tuple, expression: partialmethod, name: str) -> cp_model.IntVar:
+        """Return the variable for a shared subterm, creating it from `expression` if no subterm with the same key exists."""
+
+        subterms: Final[dict] = self._subterms
+        if key not in subterms:
+            subterms[key], _ = self.NewIntermediateIntVar(expression, f'shared: {name}')
+        return subterms[key]
+
+    def SetBounds(self, variable: cp_model.IntVar, lb: Integral, ub: Integral) -> None:
+        """Replace the domain of an existing variable, allowing the same model to be solved again under different limits."""
+
+        cp_model.IntVar.Proto(variable).domain[:] = (lb, ub)
+
+
+def _Structure(expression) -> tuple:
+    """Return a hashable representation of a linear expression or constant that is equal for identical expressions."""
+
+    if isinstance(expression, Integral):
+        return ((), int(expression))
+
+    coefficients, constant = expression.GetIntegerVarValueMap()
+    return (tuple(sorted((variable.Index(), coefficient) for variable, coefficient in coefficients.items() if coefficient)), constant)
@@ -0,0 +1,56 @@
+"""Save and load named sets of CP-SAT parameters."""
+
+__all__ = ['PRESETS_FILE', 'SHIPPED_PRESETS_FILE', 'ApplyParameters', 'LoadPreset', 'SavePresets']
+__author__ = "Jeremy Saklad"
+
+import json
+from pathlib import Path
+from typing import Final
+
+from google.protobuf import json_format
+
+# Where presets are saved and loaded from, unless another file is specified
+PRESETS_FILE: Final = 'presets.json'
+
+# Presets tuned before release, used for any preset that is not in the file loaded from
+SHIPPED_PRESETS_FILE: Final = Path(__file__).with_name('presets.json')
+
+
+def ApplyParameters(solver, parameters):
+    """Merge a dictionary of CP-SAT parameters, as named in SatParameters, into the parameters of a solver."""
+    json_format.ParseDict(parameters, solver.parameters)
+
+
+def _ReadPresets(path):
+    """Return the presets saved to a file, or no presets if it does not exist."""
+
+    try:
+        with open(path) as presets_file:
+            return json.load(presets_file)
+    except FileNotFoundError:
+        return {}
+
+
+def LoadPreset(name, path = PRESETS_FILE):
+    """Return the parameters of the preset with the specified name.
+
+Presets saved to `path` take precedence over the presets shipped with the package."""
+
+    presets = {**_ReadPresets(SHIPPED_PRESETS_FILE), **_ReadPresets(path)}
+
+    if name not in presets:
+        raise KeyError(f"There is no preset named {name!r} in {path} or the shipped presets. Available presets: {', '.join(presets) or 'none'}")
+
+    return presets[name]['parameters']
+
+
+def SavePresets(presets, path = PRESETS_FILE):
+    """Save a dictionary mapping preset names to presets, replacing any presets with the same names.
+
+Each preset is a dictionary of its `parameters`, along with the number of `workers` it was tuned with."""
+
+    existing = _ReadPresets(path)
+
+    with open(path, 'w') as presets_file:
+        json.dump({**existing, **presets}, presets_file, indent=4)
+        presets_file.write("\n")
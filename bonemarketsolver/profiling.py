@@ -0,0 +1,100 @@
+"""Measure the memory used to build and solve models."""
+
+__all__ = ['MemoryProfile', 'PeakResidentSetSize', 'ProfileBuild', 'ResetPeakResidentSetSize']
+__author__ = "Jeremy Saklad"
+
+import re
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class MemoryProfile:
+    """Memory used while building and solving a single model. Sizes are in bytes."""
+
+    # Most memory allocated by Python at once while building the model
+    build_peak: int = 0
+
+    # Memory allocated by Python while building the model that was still in use afterwards
+    build_retained: int = 0
+
+    # The lines that allocated the most retained memory, as (location, size, number of blocks)
+    top_allocators: tuple = ()
+
+    # Serialized size of the model
+    proto_size: int = 0
+
+    # Peak resident set size of the whole process while solving, or None if it cannot be measured on this platform
+    solve_peak_rss: int = None
+
+    def __str__(self):
+        output = f"""Build Peak: {self.build_peak/2**20:,.1f} MiB
+Build Retained: {self.build_retained/2**20:,.1f} MiB
+Model Size: {self.proto_size/2**10:,.1f} KiB
+Solve Peak RSS: {f'{self.solve_peak_rss/2**20:,.1f} MiB' if self.solve_peak_rss is not None else 'unknown'}"""
+
+        if self.top_allocators:
+            output += "\n\nTop Allocators:\n" + "\n".join(f"{size/2**10:>10,.1f} KiB  {count:>8n} blocks  {location}" for location, size, count in self.top_allocators)
+
+        return output
+
+
+def ProfileBuild(build, limit = 10):
+    """Call `build` while tracing memory allocations, returning its result and a MemoryProfile of the build.
+
+Tracing slows the build considerably, so it should not be timed at the same time."""
+
+    # Tracing may already be in use, such as by `python -X tracemalloc`
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    start, _ = tracemalloc.get_traced_memory()
+
+    try:
+        result = build()
+        snapshot = tracemalloc.take_snapshot()
+        end, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    statistics = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),)).statistics('lineno')
+
+    return result, MemoryProfile(
+            build_peak = peak - start,
+            build_retained = end - start,
+            top_allocators = tuple((f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}", statistic.size, statistic.count) for statistic in statistics[:limit]),
+            )
+
+
+def ResetPeakResidentSetSize():
+    """Start measuring peak resident set size from now, if the platform allows it. Returns whether it was reset."""
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def PeakResidentSetSize():
+    """Return the peak resident set size of this process in bytes since it was last reset, or None if it cannot be measured.
+
+Where it cannot be reset, this is the peak since the process started."""
+
+    try:
+        with open('/proc/self/status') as status:
+            return int(re.search(r'VmHWM:\s+(\d+) kB', status.read()).group(1))*2**10
+    except (OSError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Reported in bytes on macOS, and kibibytes elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*(1 if sys.platform == 'darwin' else 2**10)
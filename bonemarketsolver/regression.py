@@ -0,0 +1,235 @@
+"""Record the results of a corpus of scenarios, and check later changes against them."""
+
+__all__ = ['CORPUS', 'GOLDEN_FILE', 'CheckAsynchronousTimeLimit', 'CheckWarmModelsReleased', 'CompareResults', 'ScenarioKey', 'SolveCorpus']
+__author__ = "Jeremy Saklad"
+
+import argparse
+import asyncio
+import gc
+import json
+import weakref
+from enum import Enum
+from multiprocessing import Pool
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import Final
+
+from ortools.sat.python import cp_model
+
+from .asynchronous import SolveAsync
+from .batchsolve import WarmModels
+from .benchmark import SCENARIOS
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.fluctuations import Fluctuation
+from .data.occasional_buyers import OccasionalBuyer
+from .profiling import PeakResidentSetSize, ResetPeakResidentSetSize
+from .solve import CreateModel, NewSolver
+
+# Where golden results are saved and loaded from, unless another file is specified
+GOLDEN_FILE: Final = Path(__file__).with_name('golden.json')
+
+# Scenarios that are proved optimal within a few deterministic seconds, so that a change in objective means the optimum moved and a change in solve time can be measured
+CORPUS: Final = (
+        {'shadowy_level': 300, 'maximum_cost': 7000},
+        {'shadowy_level': 300, 'desired_buyers': [Buyer.A_NAIVE_COLLECTOR, Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES, Buyer.A_TENTACLED_SERVANT]},
+        {'shadowy_level': 200, 'desired_buyers': [Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES]},
+        {'shadowy_level': 200, 'desired_buyers': [Buyer.A_TENTACLED_SERVANT], 'maximum_exhaustion': 2},
+        {'shadowy_level': 300, 'occasional_buyer': OccasionalBuyer.AN_ENTHUSIAST_IN_SKULLS, 'desired_buyers': [Buyer.AN_ENTHUSIAST_IN_SKULLS]},
+        {'shadowy_level': 300, 'bone_market_fluctuations': Fluctuation.ANTIQUITY, 'zoological_mania': Declaration.FISH, 'desired_buyers': [Buyer.A_NAIVE_COLLECTOR]},
+        {'shadowy_level': 200, 'bone_market_fluctuations': Fluctuation.MENACE, 'desired_buyers': [Buyer.A_TELLER_OF_TERRORS]},
+        )
+
+
+def _Describe(value):
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    elif isinstance(value, (list, tuple)):
+        return f"[{', '.join(_Describe(element) for element in value)}]"
+    else:
+        return repr(value)
+
+
+def ScenarioKey(scenario):
+    """Return a stable description of a scenario, which identifies its results."""
+    return ", ".join(f"{argument}={_Describe(value)}" for argument, value in sorted(scenario.items()))
+
+
+def _SolveScenario(scenario, deterministic_time, workers, random_seed):
+    """Solve a single scenario, returning a dictionary of its results that can be saved as JSON."""
+
+    model, actions, _ = CreateModel(**scenario)
+
+    solver = NewSolver(workers = workers, deterministic_time = deterministic_time, random_seed = random_seed, interleave_search = True)
+
+    ResetPeakResidentSetSize()
+
+    start = perf_counter()
+    status = solver.Solve(model)
+    wall_time = perf_counter() - start
+
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    return {
+            'status': solver.StatusName(status),
+            'objective': solver.ObjectiveValue() if found else None,
+            'bound': solver.BestObjectiveBound() if found else None,
+            'recipe': {_Describe(action): count for action, variable in actions.items() if found and (count := solver.Value(variable))},
+            'wall_time': wall_time,
+            'deterministic_time': solver.ResponseProto().deterministic_time,
+            'model_size': model.Proto().ByteSize(),
+            'peak_rss': PeakResidentSetSize(),
+            }
+
+
+def SolveCorpus(scenarios = CORPUS, deterministic_time = 60.0, processes = None, workers = 1, random_seed = 0):
+    """Solve every scenario in parallel worker processes, returning a dictionary mapping each scenario key to its results.
+
+Each solve is limited by deterministic time with a fixed seed, so results can be compared across machines. Each scenario is solved in a fresh process, so its peak memory does not depend on which scenarios the same process solved before."""
+
+    with Pool(processes or cpu_count(), maxtasksperchild = 1) as pool:
+        results = {ScenarioKey(scenario): pool.apply_async(_SolveScenario, (scenario, deterministic_time, workers, random_seed)) for scenario in scenarios}
+
+        return {key: result.get() for key, result in results.items()}
+
+
+def CompareResults(golden, current, tolerance = 0.5, slack = 1.0):
+    """Return a list of differences between golden and current results that need attention.
+
+A scenario's solve time has regressed if it takes more than `tolerance` times as long again as the golden result, plus `slack` deterministic seconds. Its model size and peak memory have regressed if they grow by more than `tolerance` times the golden result. Different recipes with the same objective are not flagged, since there may be several optimal skeletons. Unless both results are optimal, an objective is only flagged if the range between it and its bound no longer overlaps the golden range, since a search that was cut short may stop anywhere within it."""
+
+    differences = []
+
+    for key, expected in golden.items():
+        if (actual := current.get(key)) is None:
+            differences.append(f"{key}: not solved")
+            continue
+
+        if actual['status'] != expected['status']:
+            differences.append(f"{key}: status changed from {expected['status']} to {actual['status']}")
+
+        if actual['status'] == expected['status'] == 'OPTIMAL' or None in (expected.get('bound'), actual.get('bound')):
+            moved = actual['objective'] != expected['objective']
+        else:
+            moved = actual['bound'] < expected['objective'] or expected['bound'] < actual['objective']
+
+        if moved:
+            differences.append(f"{key}: objective changed from {expected['objective']} to {actual['objective']}")
+
+            changes = sorted(action for action in {*expected['recipe'], *actual['recipe']} if expected['recipe'].get(action, 0) != actual['recipe'].get(action, 0))
+            differences.extend(f"    {action}: {expected['recipe'].get(action, 0)} -> {actual['recipe'].get(action, 0)}" for action in changes)
+
+        if actual['deterministic_time'] > expected['deterministic_time']*(1 + tolerance) + slack:
+            differences.append(f"{key}: solve time regressed from {expected['deterministic_time']:.2f}s to {actual['deterministic_time']:.2f}s (deterministic)")
+
+        # Golden results recorded before memory was measured, or on platforms where it cannot be, have nothing to compare against
+        for measurement, description in (('model_size', 'model size'), ('peak_rss', 'peak memory')):
+            if expected.get(measurement) and actual.get(measurement) and actual[measurement] > expected[measurement]*(1 + tolerance):
+                differences.append(f"{key}: {description} regressed from {expected[measurement]/2**20:,.2f} MiB to {actual[measurement]/2**20:,.2f} MiB")
+
+    return differences
+
+
+def CheckAsynchronousTimeLimit(scenario = SCENARIOS[0], time_limit = 10.0, slack = 5.0):
+    """Solve a scenario from start to finish with SolveAsync, returning a list of problems found.
+
+By default, the scenario is open to every buyer, which is the hardest to solve. The search must yield at least one skeleton, end with a final status, and finish within `slack` seconds of `time_limit`, including building the model."""
+
+    async def Solutions():
+        return [solution async for solution in SolveAsync(**scenario, time_limit = time_limit)]
+
+    start = perf_counter()
+    solutions = asyncio.run(Solutions())
+    elapsed = perf_counter() - start
+
+    problems = []
+    key = ScenarioKey(scenario)
+
+    if not solutions:
+        problems.append(f"{key}: no skeleton found asynchronously within {time_limit:.2f}s")
+    elif solutions[-1].status not in ('OPTIMAL', 'FEASIBLE') or solutions[-1].bound < solutions[-1].objective:
+        problems.append(f"{key}: asynchronous search ended with status {solutions[-1].status} and bound {solutions[-1].bound}")
+
+    if elapsed > time_limit + slack:
+        problems.append(f"{key}: asynchronous search took {elapsed:.2f}s with a time limit of {time_limit:.2f}s")
+
+    return problems
+
+
+def CheckWarmModelsReleased(scenarios = SCENARIOS, size = 2):
+    """Build a model for each scenario through WarmModels keeping only `size` of them, returning a list of problems if any model it evicted is still alive.
+
+Long-lived workers keep their warm models for hours, so an evicted model that is never freed grows memory without bound. The scenarios must differ in more than maximum exhaustion."""
+
+    models = WarmModels(size)
+    references = [weakref.ref(models.Model(scenario)[0]) for scenario in scenarios]
+
+    gc.collect()
+
+    return [f"{ScenarioKey(scenario)}: model still alive after being evicted from warm models" for scenario, reference in zip(scenarios[:-size], references[:-size]) if reference() is not None]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.regression',
+            description="Record golden results for a corpus of scenarios, or check the current solver against them.",
+            )
+
+    parser.add_argument(
+            "mode",
+            choices=('record', 'check'),
+            help="whether to save the current results as golden, or compare them to the saved golden results",
+            )
+
+    parser.add_argument(
+            "-g", "--golden",
+            default=GOLDEN_FILE,
+            help=f"file of golden results (default: {GOLDEN_FILE.name} in the package)",
+            dest='golden'
+            )
+
+    parser.add_argument(
+            "-d", "--deterministic-time",
+            default=60.0,
+            type=float,
+            help="maximum number of deterministic seconds to run each solve",
+            dest='deterministic_time'
+            )
+
+    parser.add_argument(
+            "-p", "--processes",
+            type=int,
+            help="number of scenarios to solve in parallel (default: one per available CPU thread)",
+            dest='processes'
+            )
+
+    parser.add_argument(
+            "--tolerance",
+            default=0.5,
+            type=float,
+            help="fraction by which deterministic solve time may grow before it is flagged (default: 0.5)",
+            dest='tolerance'
+            )
+
+    args = parser.parse_args()
+
+    results = SolveCorpus(deterministic_time=args.deterministic_time, processes=args.processes)
+
+    if args.mode == 'record':
+        with open(args.golden, 'w') as golden_file:
+            json.dump(results, golden_file, indent=4)
+            golden_file.write("\n")
+
+        print(f"Recorded {len(results)} scenarios to {args.golden}")
+    else:
+        with open(args.golden) as golden_file:
+            golden = json.load(golden_file)
+
+        differences = CompareResults(golden, results, args.tolerance) + CheckAsynchronousTimeLimit() + CheckWarmModelsReleased()
+
+        if differences:
+            print(*differences, sep="\n")
+            parser.exit(1, f"{len(differences)} differences from {args.golden}\n")
+
+        print(f"All {len(golden)} scenarios match {args.golden}")
@@ -0,0 +1,204 @@
+"""The outcome of a solve, as structured data that is only formatted as text when needed."""
+
+__all__ = ['SolveResult']
+__author__ = "Jeremy Saklad"
+
+import json
+from dataclasses import asdict, astuple, dataclass
+from enum import Enum
+
+from ortools.sat import cp_model_pb2
+
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.embellishments import Embellishment
+from .data.skulls import Skull
+from .data.torsos import Torso
+from .profiling import MemoryProfile
+from .solve import PROFIT_MARGIN_MULTIPLIER
+
+# Every enumeration an action can belong to, keyed by the name used when serializing
+_ENUMERATIONS = {enum.__name__: enum for enum in (Torso, Skull, Appendage, Adjustment, Declaration, Embellishment, Buyer)}
+
+
+def _Name(action: Enum) -> str:
+    return f"{type(action).__name__}.{action.name}"
+
+
+def _Action(name: str) -> Enum:
+    enum, member = name.split(".")
+    return _ENUMERATIONS[enum][member]
+
+
+def _Memory(*args, **kwargs) -> MemoryProfile:
+    """Rebuild a memory profile from serialized fields, in which tuples may have become lists."""
+    profile = MemoryProfile(*args, **kwargs)
+    return MemoryProfile(**{**asdict(profile), 'top_allocators': tuple(tuple(allocator) for allocator in profile.top_allocators)})
+
+
+@dataclass(frozen=True, slots=True)
+class SolveResult:
+    """A skeleton found by the solver, along with the state of the search when it was found."""
+
+    # Name of the CpSolverStatus, such as 'OPTIMAL'
+    status: str
+
+    # Profit margin (multiplied by PROFIT_MARGIN_MULTIPLIER) or profit, whichever was maximized
+    objective: int
+
+    # No skeleton can have a better objective than this, as far as the solver knows
+    bound: int
+
+    # Each action used by the skeleton and the number of times it is used, in the order of the model
+    actions: tuple
+
+    # The value of each skeleton quality, keyed by the names used by CreateModel
+    qualities: dict
+
+    wall_time: float = 0.0
+
+    deterministic_time: float = 0.0
+
+    # Only measured if requested, since tracing allocations slows down building the model
+    memory: MemoryProfile = None
+
+    @classmethod
+    def FromResponse(cls, response: cp_model_pb2.CpSolverResponse, actions: dict, qualities: dict, status: str = None):
+        """Read a result from a solver response, or from the Response() of a solution callback, in a single pass over its solution.
+
+`status` overrides the status of the response, which is still unknown during a solution callback."""
+
+        solution = response.solution
+
+        return cls(
+                status = status or cp_model_pb2.CpSolverStatus.Name(response.status),
+                objective = round(response.objective_value),
+                bound = round(response.best_objective_bound),
+                actions = tuple((action, count) for action, variable in actions.items() if (count := solution[variable.Index()])),
+                qualities = {name: solution[variable.Index()] for name, variable in qualities.items()},
+                wall_time = response.wall_time,
+                deterministic_time = response.deterministic_time,
+                )
+
+    def Action(self, enum):
+        """Return the first action of the specified enumeration used by the skeleton."""
+        return next((action for action, _ in self.actions if isinstance(action, enum)), None)
+
+    @property
+    def torso(self):
+        return self.Action(Torso)
+
+    @property
+    def declaration(self):
+        return self.Action(Declaration)
+
+    @property
+    def buyer(self):
+        return self.Action(Buyer)
+
+    @property
+    def net_profit(self):
+        return self.qualities['net_profit']
+
+    @property
+    def profit_margin(self):
+        """Profit margin as a fraction, rather than multiplied."""
+        return self.qualities['profit_margin']/PROFIT_MARGIN_MULTIPLIER
+
+    @property
+    def total_revenue(self):
+        return self.qualities['total_revenue']
+
+    @property
+    def cost(self):
+        return self.qualities['cost']
+
+    @property
+    def gap(self):
+        """Relative difference between the objective and the bound, which is zero once the skeleton is known to be optimal."""
+        return abs(self.bound - self.objective)/max(abs(self.objective), 1)
+
+    @property
+    def optimal(self):
+        """Whether this skeleton is known to be the best possible."""
+        return self.status == 'OPTIMAL' or self.objective >= self.bound
+
+    def __str__(self):
+        return "".join(f"{action}\n"*count for action, count in self.actions) + f"""
+Profit: £{self.qualities['net_profit']/100:,.2f}
+Profit Margin: {self.qualities['profit_margin']/PROFIT_MARGIN_MULTIPLIER:+,.2%}
+
+Total Revenue: £{self.qualities['total_revenue']/100:,.2f}
+Primary Revenue: £{self.qualities['primary_revenue']/100:,.2f}
+Secondary Revenue: £{self.qualities['secondary_revenue']/100:,.2f}
+
+Cost: £{self.qualities['cost']/100:,.2f}
+
+Value: £{self.qualities['value']/100:,.2f}
+Amalgamy: {self.qualities['amalgamy']:n}
+Antiquity: {self.qualities['antiquity']:n}
+Menace: {self.qualities['menace']:n}
+Counter-Church: {self.qualities['counter_church']:n}
+Implausibility: {self.qualities['implausibility']:n}
+
+Exhaustion: {self.qualities['exhaustion']:n}
+
+Deterministic Time: {self.deterministic_time:,.2f}s""" + (f"\n\n{self.memory}" if self.memory is not None else "")
+
+    def ToTuple(self) -> tuple:
+        """Return the result as nested tuples of strings and numbers, in field order, which any MessagePack or similar encoder can pack compactly.
+
+Actions are stored as alternating names and counts, and qualities as parallel tuples of names and values. The memory profile, if any, is stored as a tuple of its fields."""
+        return (
+                self.status,
+                self.objective,
+                self.bound,
+                tuple(element for action, count in self.actions for element in (_Name(action), count)),
+                tuple(self.qualities),
+                tuple(self.qualities.values()),
+                self.wall_time,
+                self.deterministic_time,
+                astuple(self.memory) if self.memory is not None else None,
+                )
+
+    @classmethod
+    def FromTuple(cls, packed):
+        """Read a result returned by ToTuple, or the lists an encoder may turn its tuples into."""
+
+        status, objective, bound, actions, names, values, wall_time, deterministic_time, memory = packed
+
+        return cls(
+                status = status,
+                objective = objective,
+                bound = bound,
+                actions = tuple((_Action(name), count) for name, count in zip(actions[::2], actions[1::2])),
+                qualities = dict(zip(names, values)),
+                wall_time = wall_time,
+                deterministic_time = deterministic_time,
+                memory = _Memory(*memory) if memory is not None else None,
+                )
+
+    def ToJSON(self) -> str:
+        """Return the result as a compact JSON object."""
+        return json.dumps({
+            'status': self.status,
+            'objective': self.objective,
+            'bound': self.bound,
+            'actions': {_Name(action): count for action, count in self.actions},
+            'qualities': self.qualities,
+            'wall_time': self.wall_time,
+            'deterministic_time': self.deterministic_time,
+            'memory': asdict(self.memory) if self.memory is not None else None,
+            }, separators=(',', ':'), ensure_ascii=False)
+
+    @classmethod
+    def FromJSON(cls, string: str):
+        """Read a result returned by ToJSON."""
+
+        fields = json.loads(string)
+        fields['actions'] = tuple((_Action(name), count) for name, count in fields['actions'].items())
+        fields['memory'] = _Memory(**fields['memory']) if fields.get('memory') is not None else None
+
+        return cls(**fields)
@@ -0,0 +1,61 @@
+"""Convert scenarios, as keyword arguments to CreateModel, to and from JSON-compatible dictionaries."""
+
+__all__ = ['DecodeScenario', 'EncodeScenario', 'ScenarioHash']
+__author__ = "Jeremy Saklad"
+
+import hashlib
+import json
+from enum import Enum
+from typing import Final
+
+from .data.adjustments import Adjustment
+from .data.appendages import Appendage
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.diplomat_fascinations import DiplomatFascination
+from .data.embellishments import Embellishment
+from .data.fluctuations import Fluctuation
+from .data.occasional_buyers import OccasionalBuyer
+from .data.skulls import Skull
+from .data.torsos import Torso
+
+# Every enumeration a scenario may refer to, keyed by name
+_ENUMERATIONS: Final = {enum.__name__: enum for enum in (Adjustment, Appendage, Buyer, Declaration, DiplomatFascination, Embellishment, Fluctuation, OccasionalBuyer, Skull, Torso)}
+
+
+def _Encode(value):
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return [_Encode(element) for element in value]
+    else:
+        return value
+
+
+def _Decode(value):
+    if isinstance(value, str) and (lambda parts : len(parts) == 2 and parts[0] in _ENUMERATIONS)(value.split(".", 1)):
+        enum, member = value.split(".", 1)
+        return _ENUMERATIONS[enum][member.upper()]
+    elif isinstance(value, list):
+        return [_Decode(element) for element in value]
+    else:
+        return value
+
+
+def EncodeScenario(scenario):
+    """Return a scenario with each enumeration member replaced by its identifier (e.g. "Buyer.A_NAIVE_COLLECTOR"), so it can be saved as JSON."""
+    return {argument: _Encode(value) for argument, value in scenario.items()}
+
+
+def DecodeScenario(fields):
+    """Return the scenario described by a dictionary returned by EncodeScenario, or written by hand in the same form.
+
+Member names are not case-sensitive."""
+    return {argument: _Decode(value) for argument, value in fields.items()}
+
+
+def ScenarioHash(scenario):
+    """Return a hexadecimal digest that is the same for every scenario with the same arguments, regardless of their order."""
+
+    canonical = {argument: sorted(value) if isinstance(value, list) else value for argument, value in EncodeScenario(scenario).items()}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
@@ -1,10 +1,12 @@
 """Use constraint programming to devise the optimal skeleton at the Bone Market in Fallen London."""
 
-__all__ = ['Adjustment', 'Appendage', 'Buyer', 'Declaration', 'DiplomatFascination', 'Embellishment', 'Fluctuation', 'OccasionalBuyer', 'Skull', 'Solve', 'Torso']
+__all__ = ['Adjustment', 'AddSearchStrategy', 'Appendage', 'Buyer', 'CreateModel', 'Declaration', 'DiplomatFascination', 'Embellishment', 'Fluctuation', 'NewSolver', 'OccasionalBuyer', 'SEARCH_STRATEGIES', 'Skull', 'Solve', 'Torso', 'VALUE_HEURISTICS']
 __author__ = "Jeremy Saklad"
 
-from functools import partialmethod
-from itertools import chain, repeat
+from dataclasses import replace
+from functools import partial, partialmethod
+from itertools import chain, count, repeat
+from numbers import Integral
 from os import cpu_count
 
 from ortools.sat.python import cp_model
@@ -20,7 +22,10 @@ from .data.fluctuations import Fluctuation
 from .data.occasional_buyers import OccasionalBuyer
 from .data.skulls import Skull
 from .data.torsos import Torso
+from .dominance import AvailableBuyers, DominatedActions
 from .objects.bone_market_model import BoneMarketModel
+from .presets import PRESETS_FILE, ApplyParameters, LoadPreset
+from .profiling import PeakResidentSetSize, ProfileBuild, ResetPeakResidentSetSize
 
 # This multiplier is applied to the profit margin to avoid losing precision due to rounding.
 PROFIT_MARGIN_MULTIPLIER = 10000
@@ -31,61 +36,273 @@ MAXIMUM_ATTRIBUTE = 100
 # This is a constant used to calculate difficulty checks. You almost certainly do not need to change this.
 DIFFICULTY_SCALER = 0.6
 
+# The amount of Counter-church added by each Holy Relic of the Thigh of Saint Fiacre, keyed by Torso Style.
+#
+# The precise formula for this is unknown as of this writing, so it is being hard-coded as a stopgap.
+HOLY_RELIC_COUNTER_CHURCH = {
+        10: 1, # Human
+        15: 1, # Human
+        20: 2, # Thorny-Breasted
+        30: 2, # Seven-necked
+        40: 3, # Many-limbed
+        45: 3, # Segmented
+        50: 4, # Mammoth
+        55: 5, # Luminous
+        60: 5, # Baroque
+        70: 6, # Deep-water
+        80: 6, # Prismatic
+        100: 7, # Starved
+        }
+
+# The type of skeleton produced by each declaration, as a ladder of (minimum antiquity, skeleton type) rungs in ascending order.
+SKELETON_TYPES = {
+        Declaration.CHIMERA: (
+            (0, 100), # Chimera
+            ),
+        Declaration.HUMANOID: (
+            (0, 110), # Humanoid
+            (1, 111), # Ancient Humanoid (UNCERTAIN)
+            (6, 112), # Neanderthal
+            ),
+        Declaration.APE: (
+            (0, 120), # Ape (UNCERTAIN)
+            (2, 121), # Primordial Ape (UNCERTAIN)
+            ),
+        Declaration.MONKEY: (
+            (0, 125), # Monkey
+            (1, 126), # Catarrhine Monkey (UNCERTAIN)
+            (9, 128), # Catarrhine Monkey
+            ),
+        Declaration.REPTILE: (
+            (0, 160), # Crocodile
+            (2, 161), # Dinosaur
+            (5, 162), # Mesosaur (UNCERTAIN)
+            ),
+        Declaration.AMPHIBIAN: (
+            (0, 170), # Toad
+            (2, 171), # Primordial Amphibian
+            (5, 172), # Temnospondyl
+            ),
+        Declaration.BIRD: (
+            (0, 180), # Owl
+            (2, 181), # Archaeopteryx
+            (5, 182), # Ornithomimosaur (UNCERTAIN)
+            ),
+        Declaration.FISH: (
+            (0, 190), # Lamprey
+            (1, 191), # Coelacanth (UNCERTAIN)
+            ),
+        Declaration.SPIDER: (
+            (0, 200), # Spider (UNCERTAIN)
+            (2, 201), # Primordial Orb-Weaver (UNCERTAIN)
+            (8, 203), # Trigonotarbid
+            ),
+        Declaration.INSECT: (
+            (0, 210), # Beetle (UNCERTAIN)
+            (2, 211), # Primordial Beetle (UNCERTAIN)
+            (7, 212), # Rhyniognatha
+            ),
+        Declaration.CURATOR: (
+            (0, 300), # Curator
+            ),
+        }
+
+# Ways for the solver to use the build order strategy. 'default' leaves the search to CP-SAT.
+SEARCH_STRATEGIES = ('default', 'fixed', 'portfolio')
+
+# Which value to try first for the number of each skull and appendage
+VALUE_HEURISTICS = {
+        'min': cp_model.SELECT_MIN_VALUE,
+        'max': cp_model.SELECT_MAX_VALUE,
+        'lower-half': cp_model.SELECT_LOWER_HALF,
+        'upper-half': cp_model.SELECT_UPPER_HALF,
+        }
+
+
+def AddJointsAmberCost(base_joints, add_joints):
+    """Return the cost of adding joints `add_joints` times to a skeleton that starts with `base_joints` joints.
+
+This is a partial sum formula, which works with both integers and NumPy arrays."""
+    return Cost.WARM_AMBER.value*(25*base_joints*base_joints*add_joints + 100*base_joints*add_joints*add_joints - 100*base_joints*add_joints + (400*add_joints**3 + 200*add_joints)//3 - 200*add_joints*add_joints)
+
+
+def AddSegmentsBrassCost(base_segments, add_segments):
+    """Return the cost of adding `add_segments` segments to a skeleton that starts with one more than `base_segments` segments.
+
+This is a partial sum formula, which works with both integers and NumPy arrays."""
+    return Cost.NEVERCOLD_BRASS.value*((
+            25*add_segments**4
+            + 100*add_segments**3*base_segments
+            + 50*add_segments**3
+            + 150*add_segments**2*base_segments**2
+            + 150*add_segments**2*base_segments
+            + 25*add_segments**2
+            + 100*add_segments*base_segments**3
+            + 150*add_segments*base_segments**2
+            + 50*add_segments*base_segments
+            )//2)
+
+
+def SaleCost(shadowy_level, difficulty_level):
+    """Return the cost of the actions needed to sell a skeleton with the specified difficulty level, or None if it cannot be sold."""
+
+    sale_actions_times_action_value = round(DIFFICULTY_SCALER*shadowy_level*Cost.ACTION.value)//max(difficulty_level, 1)
+    if sale_actions_times_action_value <= 0:
+        return None
+
+    return max(Cost.ACTION.value**2//sale_actions_times_action_value, Cost.ACTION.value)
+
+
+def _AddedPartTable(formula, bases, maximum_cost):
+    """Tabulate the cost of every number of additions to every base, stopping once the cost exceeds `maximum_cost`.
+
+Each addition costs at least as much as the last, so nothing beyond the table could be afforded."""
+    for base in bases:
+        for added in count():
+            if (cost := formula(base, added)) > maximum_cost:
+                break
+            yield (base, added, cost)
+
+
+def AddSearchStrategy(model, actions, solver, search_strategy = 'default', value_heuristic = 'min'):
+    """Direct the search to follow the order a skeleton is built in: torso, then declaration and buyer, then skulls and appendages.
+
+With `search_strategy` 'fixed', every worker follows this order. With 'portfolio', it is one of several strategies that workers alternate between. `value_heuristic` is a key of VALUE_HEURISTICS."""
+
+    if search_strategy == 'default':
+        return
+
+    model.AddDecisionStrategy([value for (key, value) in actions.items() if isinstance(key, Torso)], cp_model.CHOOSE_FIRST, cp_model.SELECT_MAX_VALUE)
+    model.AddDecisionStrategy([value for (key, value) in actions.items() if isinstance(key, (Declaration, Buyer))], cp_model.CHOOSE_FIRST, cp_model.SELECT_MAX_VALUE)
+    model.AddDecisionStrategy([value for (key, value) in actions.items() if isinstance(key, (Skull, Appendage))], cp_model.CHOOSE_FIRST, VALUE_HEURISTICS[value_heuristic])
+
+    solver.parameters.search_branching = cp_model.FIXED_SEARCH if search_strategy == 'fixed' else cp_model.PORTFOLIO_SEARCH
+
+
+def NewSolver(time_limit = float('inf'), workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False):
+    """Create a solver with the specified limits.
+
+`deterministic_time` is measured in deterministic seconds, which count work done rather than time elapsed, so a solve stops at the same point on any machine regardless of load. A fixed `random_seed` and `interleave_search` make the search itself repeatable, even with several workers."""
+
+    solver = cp_model.CpSolver()
+    if workers:
+        solver.parameters.num_workers = workers
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.max_deterministic_time = deterministic_time
+    if random_seed is not None:
+        solver.parameters.random_seed = random_seed
+    solver.parameters.interleave_search = interleave_search
+
+    return solver
+
+
+def CreateModel(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, blacklist = [], prune_dominated = True, reusable = False, cost_tables = False, precheck = True):
+    """Build a model of the Bone Market that maximizes profit margin.
+
+If `prune_dominated` is set, skulls and appendages that another action always does at least as well as are excluded. This is skipped if `reusable` is set, since an action is only dominated for the buyers and blacklist the model was built with.
+
+If `precheck` is set, combinations of torso, declaration, and buyer that cannot possibly be satisfied are forbidden before solving.
+
+If `cost_tables` is set, the costs of adding joints and segments are looked up in precomputed tables rather than calculated with polynomials.
+
+`shadowy_level` may also be a collection of levels, in which case Shadowy becomes a variable that can take any of them. Its bounds can then be changed to solve the same model for each level.
+
+Unless `reusable` is set, excluded actions and buyers are replaced by constants and their constraints are never created. Otherwise, they are excluded by assumptions and constraints that may be removed from the model later.
+
+Returns a tuple of the model, a dictionary mapping each action to its variable, and a dictionary mapping the name of each skeleton quality to its variable."""
 
-def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = float('inf'), workers = cpu_count(), blacklist = [], stdscr = None):
     model = BoneMarketModel()
 
+    shadowy_levels = (shadowy_level,) if isinstance(shadowy_level, Integral) else tuple(shadowy_level)
+    shadowy = model.NewIntVarFromDomain(cp_model.Domain.FromValues(shadowy_levels), 'shadowy level')
+
     actions = {}
 
+    # Actions and buyers that are known to be excluded
+    excluded = {*blacklist}
+    # Which actions are dominated depends on the buyers, which a reusable model may later change
+    if prune_dominated and not reusable:
+        excluded.update(DominatedActions(occasional_buyer, diplomat_fascination, desired_buyers, blacklist))
+    if not reusable:
+        excluded.update(set(Buyer).difference(AvailableBuyers(occasional_buyer, diplomat_fascination, desired_buyers)))
+
+    def NewActionVar(action, upto = None):
+        if action in excluded and not reusable:
+            return model.NewConstant(0)
+        elif upto == 1:
+            return model.NewBoolVar(action.value.name)
+        else:
+            return model.NewIntVar(action.value.name, lb = 0)
+
     # Torso
     for torso in Torso:
-        actions[torso] = model.NewBoolVar(torso.value.name)
+        actions[torso] = NewActionVar(torso, upto = 1)
 
     # Skull
     for skull in Skull:
-        actions[skull] = model.NewIntVar(skull.value.name, lb = 0)
+        actions[skull] = NewActionVar(skull)
 
     # Appendage
     for appendage in Appendage:
-        if appendage == Appendage.SKIP_TAILS:
-            actions[appendage] = model.NewBoolVar(appendage.value.name)
-        else:
-            actions[appendage] = model.NewIntVar(appendage.value.name, lb = 0)
+        actions[appendage] = NewActionVar(appendage, upto = 1 if appendage == Appendage.SKIP_TAILS else None)
 
     # Adjustment
     for adjustment in Adjustment:
-        actions[adjustment] = model.NewIntVar(adjustment.value.name, lb = 0)
+        actions[adjustment] = NewActionVar(adjustment)
 
     # Declaration
     for declaration in Declaration:
-        actions[declaration] = model.NewBoolVar(declaration.value.name)
+        actions[declaration] = NewActionVar(declaration, upto = 1)
 
     # Embellishment
     for embellishment in Embellishment:
-        actions[embellishment] = model.NewIntVar(embellishment.value.name, lb = 0)
+        actions[embellishment] = NewActionVar(embellishment)
 
 
     # Buyer
     for buyer in Buyer:
-        actions[buyer] = model.NewBoolVar(buyer.value.name)
+        actions[buyer] = NewActionVar(buyer, upto = 1)
+
+    if reusable:
+        # Mark unavailable buyers
+        model.AddAssumptions([
+            actions[buyer].Not()
+            for unavailable_buyer in OccasionalBuyer if unavailable_buyer != occasional_buyer
+            for buyer in unavailable_buyer.value if buyer not in desired_buyers
+            ])
+        model.AddAssumptions([
+            actions[outmoded_fascination.value].Not()
+            for outmoded_fascination in DiplomatFascination if outmoded_fascination != diplomat_fascination and outmoded_fascination.value not in desired_buyers
+            ])
+
+        # Restrict to desired buyers
+        if desired_buyers:
+            model.Add(cp_model.LinearExpr.Sum([actions[desired_buyer] for desired_buyer in desired_buyers]) == 1)
+
+        # Blacklist
+        model.Add(cp_model.LinearExpr.Sum([actions[forbidden] for forbidden in excluded]) == 0)
+
+    if precheck:
+        # Imported here, since the analysis uses formulas that are defined in terms of this module
+        from .feasibility import FeasibleCombinations
+
+        # A reusable model may later allow any action or buyer
+        feasible = FeasibleCombinations(desired_buyers = list(Buyer), bone_market_fluctuations = bone_market_fluctuations, prune_dominated = False) if reusable else FeasibleCombinations(occasional_buyer, diplomat_fascination, desired_buyers, blacklist, bone_market_fluctuations, prune_dominated)
 
-    # Mark unavailable buyers
-    model.AddAssumptions([
-        actions[buyer].Not()
-        for unavailable_buyer in OccasionalBuyer if unavailable_buyer != occasional_buyer
-        for buyer in unavailable_buyer.value if buyer not in desired_buyers
-        ])
-    model.AddAssumptions([
-        actions[outmoded_fascination.value].Not()
-        for outmoded_fascination in DiplomatFascination if outmoded_fascination != diplomat_fascination and outmoded_fascination.value not in desired_buyers
-        ])
+        for torso in Torso:
+            for declaration in Declaration:
+                # Excluded actions are already constants
+                if not reusable and (torso in excluded or declaration in excluded):
+                    continue
 
-    # Restrict to desired buyers
-    if desired_buyers:
-        model.Add(cp_model.LinearExpr.Sum([actions[desired_buyer] for desired_buyer in desired_buyers]) == 1)
+                buyers = [actions[buyer] for buyer in Buyer if (torso, declaration, buyer) in feasible]
 
-    # Blacklist
-    model.Add(cp_model.LinearExpr.Sum([actions[forbidden] for forbidden in blacklist]) == 0)
+                if buyers:
+                    model.Add(cp_model.LinearExpr.Sum(buyers) == 1).OnlyEnforceIf([actions[torso], actions[declaration]])
+                else:
+                    model.AddBoolOr([actions[torso].Not(), actions[declaration].Not()])
+
+    del excluded
 
 
     # One torso
@@ -247,25 +464,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
     # Calculate amount of Counter-church from Holy Relics of the Thigh of Saint Fiacre
 
     # The amount of Counter-church added by each Holy Relic, which is based on the Torso Style.
-    #
-    # The precise formula for this is unknown as of this writing, so it is being hard-coded as a stopgap.
     holy_relic_counter_church_each = model.NewIntVar('holy relic counter-church each')
     model.AddAllowedAssignments(
             (torso_style, holy_relic_counter_church_each),
-            (
-                (10, 1), # Human
-                (15, 1), # Human
-                (20, 2), # Thorny-Breasted
-                (30, 2), # Seven-necked
-                (40, 3), # Many-limbed
-                (45, 3), # Segmented
-                (50, 4), # Mammoth
-                (55, 5), # Luminous
-                (60, 5), # Baroque
-                (70, 6), # Deep-water
-                (80, 6), # Prismatic
-                (100, 7) # Starved
-            )
+            HOLY_RELIC_COUNTER_CHURCH.items()
     )
 
     holy_relic_counter_church = model.NewIntVar('holy relic counter-church', lb = 0)
@@ -294,19 +496,73 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
 
     # Cost
     # Calculate value of actions needed to sell the skeleton.
-    difficulty_level = model.NewIntVar('difficulty level')
+    # For a given Shadowy, this only depends on implausibility and how much each buyer is affected by it, so it is precomputed.
+    sale_cost = model.NewIntVar('sale cost', lb = 0)
 
-    non_zero_difficulty_level = model.NewIntVar('non-zero difficulty level', lb = 1)
-    model.AddMaxEquality(non_zero_difficulty_level, [difficulty_level, 1])
+    # Implausibility below zero does not make selling any easier
+    positive_implausibility = model.NewIntVar('positive implausibility', lb = 0)
+    model.AddMaxEquality(positive_implausibility, [implausibility, 0])
 
-    sale_actions_times_action_value = model.NewIntVar('sale actions times action value', lb = 0)
-    model.AddDivisionEquality(sale_actions_times_action_value, model.NewConstant(round(DIFFICULTY_SCALER*shadowy_level*Cost.ACTION.value)), non_zero_difficulty_level)
-    abstract_sale_cost = model.NewIntVar('abstract sale cost', lb = 0)
-    model.AddDivisionEquality(abstract_sale_cost, Cost.ACTION.value**2, sale_actions_times_action_value)
-    sale_cost = model.NewIntVar('sale cost', lb = 0)
-    model.AddMaxEquality(sale_cost, [abstract_sale_cost, Cost.ACTION.value])
+    # Literals for Shadowy being each level, only needed when it may take several
+    at_shadowy_levels = {level: model.BoolExpression(shadowy == level) for level in shadowy_levels} if len(shadowy_levels) > 1 else {}
+
+    # Literals for implausibility reaching each level at which some sale cost rises
+    at_least_implausibility = {}
+
+    # Sale cost and greatest sellable implausibility for each difficulty factor, shared between buyers
+    factor_sale_costs = {}
+
+    def SharedSaleCost(difficulty_factor):
+        """Return variables for the sale cost of a buyer whose difficulty level is `difficulty_factor` times implausibility, and for the most implausibility it will accept, adding them the first time each factor is needed.
+
+The sale cost only rises at a few levels of implausibility, so it is the cost at zero plus one step for each distinct cost after that."""
+
+        if difficulty_factor not in factor_sale_costs:
+            factor_sale_cost = model.NewIntVar(f'sale cost at difficulty factor {difficulty_factor}', lb = 0)
+            factor_implausibility_limit = model.NewIntVar(f'implausibility limit at difficulty factor {difficulty_factor}', lb = -1)
+
+            for level in shadowy_levels:
+                # Implausibility at which each distinct cost begins
+                steps = {}
+                for implausibility_level in count():
+                    if (level_cost := SaleCost(level, difficulty_factor*implausibility_level)) is None:
+                        break
+                    steps.setdefault(level_cost, implausibility_level)
+
+                for threshold in steps.values():
+                    if threshold not in at_least_implausibility:
+                        at_least_implausibility[threshold] = model.BoolExpression(positive_implausibility >= threshold)
+
+                costs = tuple(steps)
+                constraints = (
+                        model.Add(factor_sale_cost == (costs[0] if costs else 0) + cp_model.LinearExpr.WeightedSum([at_least_implausibility[threshold] for threshold in tuple(steps.values())[1:]], [later - earlier for earlier, later in zip(costs, costs[1:])])),
+                        model.Add(factor_implausibility_limit == implausibility_level - 1),
+                        )
+
+                if at_shadowy_levels:
+                    for constraint in constraints:
+                        constraint.OnlyEnforceIf(at_shadowy_levels[level])
+
+            factor_sale_costs[difficulty_factor] = (factor_sale_cost, factor_implausibility_limit)
+
+        return factor_sale_costs[difficulty_factor]
+
+    def ScaledSaleCost(difficulty_factor):
+        """Return a partial method that sets the sale cost for a buyer whose difficulty level is `difficulty_factor` times implausibility."""
+
+        def SaleCostConstraints(self):
+            factor_sale_cost, factor_implausibility_limit = SharedSaleCost(difficulty_factor)
+            return (self.Add(sale_cost == factor_sale_cost), self.Add(positive_implausibility <= factor_implausibility_limit))
 
-    del non_zero_difficulty_level, sale_actions_times_action_value, abstract_sale_cost
+        return partialmethod(SaleCostConstraints)
+
+    def FixedSaleCost(difficulty_level):
+        """Return a partial method that sets the sale cost for a buyer whose difficulty level does not depend on implausibility."""
+
+        return partialmethod(BoneMarketModel.AddAllowedAssignments,
+            (shadowy, sale_cost),
+            tuple((level, cost) for level in shadowy_levels if (cost := SaleCost(level, difficulty_level)) is not None),
+        )
 
 
     # Calculate cost of adding joints
@@ -316,38 +572,48 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
     add_joints = actions[Appendage.ADD_JOINTS]
 
     # Joints may be added once the torso and skulls are chosen, so the sum of their properties are the starting point.
+    joints = {action: action.value.limbs_needed + action.value.arms + action.value.legs + action.value.wings + action.value.fins + action.value.tentacles for action in chain(Torso, Skull)}
     base_joints = model.NewIntVar('base joints', lb = 0)
-    model.Add(base_joints == cp_model.LinearExpr.WeightedSum([value for (key, value) in actions.items() if isinstance(key, (Torso, Skull))], [action.value.limbs_needed + action.value.arms + action.value.legs + action.value.wings + action.value.fins + action.value.tentacles for action in chain(Torso, Skull)]))
+    model.Add(base_joints == cp_model.LinearExpr.WeightedSum([actions[action] for action in joints.keys()], list(joints.values())))
+
+    if cost_tables:
+        # Each skull slot of the torso can hold the skull with the most joints
+        model.AddAllowedAssignments(
+                (base_joints, add_joints, add_joints_amber_cost),
+                _AddedPartTable(AddJointsAmberCost, range(max(joints[torso] + torso.value.skulls_needed*max(joints[skull] for skull in Skull) for torso in Torso) + 1), maximum_cost)
+        )
+    else:
+        add_joints_amber_cost_multiple = model.NewIntVar('add joints amber cost multiple', lb = 0)
 
-    add_joints_amber_cost_multiple = model.NewIntVar('add joints amber cost multiple', lb = 0)
+        add_joints_amber_cost_multiple_first_term = model.NewIntVar('add joints amber cost multiple first term', lb = 0)
+        model.AddMultiplicationEquality(add_joints_amber_cost_multiple_first_term, (25, base_joints, base_joints, add_joints))
 
-    add_joints_amber_cost_multiple_first_term = model.NewIntVar('add joints amber cost multiple first term', lb = 0)
-    model.AddMultiplicationEquality(add_joints_amber_cost_multiple_first_term, (25, base_joints, base_joints, add_joints))
+        add_joints_amber_cost_multiple_second_term = model.NewIntVar('add joints amber cost multiple second term', lb = 0)
+        model.AddMultiplicationEquality(add_joints_amber_cost_multiple_second_term, (100, base_joints, add_joints, add_joints))
 
-    add_joints_amber_cost_multiple_second_term = model.NewIntVar('add joints amber cost multiple second term', lb = 0)
-    model.AddMultiplicationEquality(add_joints_amber_cost_multiple_second_term, (100, base_joints, add_joints, add_joints))
+        add_joints_amber_cost_multiple_third_term = model.NewIntVar('add joints amber cost multiple third term', lb = 0)
+        model.AddMultiplicationEquality(add_joints_amber_cost_multiple_third_term, (100, base_joints, add_joints))
 
-    add_joints_amber_cost_multiple_third_term = model.NewIntVar('add joints amber cost multiple third term', lb = 0)
-    model.AddMultiplicationEquality(add_joints_amber_cost_multiple_third_term, (100, base_joints, add_joints))
+        add_joints_amber_cost_multiple_fourth_term = model.NewIntVar('add joints amber cost multiple fourth term', lb = 0)
+        add_joints_amber_cost_multiple_fourth_term_numerator = model.NewIntVar('add joints amber cost multiple fourth term numerator', lb = 0)
+        add_joints_amber_cost_multiple_fourth_term_numerator_first_term = model.NewIntVar('add joints amber cost multiple fourth term numerator first term', lb = 0)
+        model.AddMultiplicationEquality(add_joints_amber_cost_multiple_fourth_term_numerator_first_term, (400, add_joints, add_joints, add_joints))
+        model.Add(add_joints_amber_cost_multiple_fourth_term_numerator == add_joints_amber_cost_multiple_fourth_term_numerator_first_term + 200*add_joints)
+        model.AddDivisionEquality(add_joints_amber_cost_multiple_fourth_term, add_joints_amber_cost_multiple_fourth_term_numerator, 3)
+        del add_joints_amber_cost_multiple_fourth_term_numerator, add_joints_amber_cost_multiple_fourth_term_numerator_first_term
 
-    add_joints_amber_cost_multiple_fourth_term = model.NewIntVar('add joints amber cost multiple fourth term', lb = 0)
-    add_joints_amber_cost_multiple_fourth_term_numerator = model.NewIntVar('add joints amber cost multiple fourth term numerator', lb = 0)
-    add_joints_amber_cost_multiple_fourth_term_numerator_first_term = model.NewIntVar('add joints amber cost multiple fourth term numerator first term', lb = 0)
-    model.AddMultiplicationEquality(add_joints_amber_cost_multiple_fourth_term_numerator_first_term, (400, add_joints, add_joints, add_joints))
-    model.Add(add_joints_amber_cost_multiple_fourth_term_numerator == add_joints_amber_cost_multiple_fourth_term_numerator_first_term + 200*add_joints)
-    model.AddDivisionEquality(add_joints_amber_cost_multiple_fourth_term, add_joints_amber_cost_multiple_fourth_term_numerator, 3)
-    del add_joints_amber_cost_multiple_fourth_term_numerator, add_joints_amber_cost_multiple_fourth_term_numerator_first_term
+        add_joints_amber_cost_multiple_fifth_term = model.NewIntVar('add joints amber cost multiple fifth term', lb = 0)
+        model.AddMultiplicationEquality(add_joints_amber_cost_multiple_fifth_term, (200, add_joints, add_joints))
 
-    add_joints_amber_cost_multiple_fifth_term = model.NewIntVar('add joints amber cost multiple fifth term', lb = 0)
-    model.AddMultiplicationEquality(add_joints_amber_cost_multiple_fifth_term, (200, add_joints, add_joints))
+        model.Add(add_joints_amber_cost_multiple == add_joints_amber_cost_multiple_first_term + add_joints_amber_cost_multiple_second_term - add_joints_amber_cost_multiple_third_term + add_joints_amber_cost_multiple_fourth_term - add_joints_amber_cost_multiple_fifth_term)
 
-    model.Add(add_joints_amber_cost_multiple == add_joints_amber_cost_multiple_first_term + add_joints_amber_cost_multiple_second_term - add_joints_amber_cost_multiple_third_term + add_joints_amber_cost_multiple_fourth_term - add_joints_amber_cost_multiple_fifth_term)
+        del add_joints_amber_cost_multiple_first_term, add_joints_amber_cost_multiple_second_term, add_joints_amber_cost_multiple_third_term, add_joints_amber_cost_multiple_fourth_term, add_joints_amber_cost_multiple_fifth_term
 
-    del add_joints_amber_cost_multiple_first_term, add_joints_amber_cost_multiple_second_term, add_joints_amber_cost_multiple_third_term, add_joints_amber_cost_multiple_fourth_term, add_joints_amber_cost_multiple_fifth_term
+        model.AddMultiplicationEquality(add_joints_amber_cost, (add_joints_amber_cost_multiple, Cost.WARM_AMBER.value))
 
-    model.AddMultiplicationEquality(add_joints_amber_cost, (add_joints_amber_cost_multiple, Cost.WARM_AMBER.value))
+        del add_joints_amber_cost_multiple
 
-    del add_joints, add_joints_amber_cost_multiple
+    del add_joints, base_joints, joints
 
 
     # Calculate cost of adding segments.
@@ -360,240 +626,161 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
     base_segments = model.NewIntVar('base segments', lb = -1)
     model.Add(base_segments == cp_model.LinearExpr.WeightedSum([value for (key, value) in actions.items() if isinstance(key, (Torso, Skull))], [action.value.segments for action in chain(Torso, Skull)]) - 1)
 
-    first_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                25,
-                *repeat(add_segments, 4),
-            )
-        ),
-        'add segments brass cost multiple first term'
-    )
+    if cost_tables:
+        # Each skull slot of the torso can hold the skull with the most segments
+        model.AddAllowedAssignments(
+                (base_segments, add_segments, add_segments_brass_cost),
+                _AddedPartTable(AddSegmentsBrassCost, range(-1, max(torso.value.segments + torso.value.skulls_needed*max(skull.value.segments for skull in Skull) for torso in Torso)), maximum_cost)
+        )
+    else:
+        first_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    25,
+                    *repeat(add_segments, 4),
+                )
+            ),
+            'add segments brass cost multiple first term'
+        )
 
-    second_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                100,
-                *repeat(add_segments, 3),
-                base_segments,
-            )
-        ),
-        'add segments brass cost multiple second term'
-    )
+        second_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    100,
+                    *repeat(add_segments, 3),
+                    base_segments,
+                )
+            ),
+            'add segments brass cost multiple second term'
+        )
 
-    third_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                50,
-                *repeat(add_segments, 3),
-            )
-        ),
-        'add segments brass cost multiple third term'
-    )
+        third_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    50,
+                    *repeat(add_segments, 3),
+                )
+            ),
+            'add segments brass cost multiple third term'
+        )
 
-    fourth_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                150,
-                *repeat(add_segments, 2),
-                *repeat(base_segments, 2),
-            )
-        ),
-        'add segments brass cost multiple fourth term'
-    )
+        fourth_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    150,
+                    *repeat(add_segments, 2),
+                    *repeat(base_segments, 2),
+                )
+            ),
+            'add segments brass cost multiple fourth term'
+        )
 
-    fifth_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                150,
-                *repeat(add_segments, 2),
-                base_segments,
-            )
-        ),
-        'add segments brass cost multiple fifth term'
-    )
+        fifth_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    150,
+                    *repeat(add_segments, 2),
+                    base_segments,
+                )
+            ),
+            'add segments brass cost multiple fifth term'
+        )
 
-    sixth_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                25,
-                *repeat(add_segments, 2),
-            )
-        ),
-        'add segments brass cost multiple sixth term'
-    )
+        sixth_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    25,
+                    *repeat(add_segments, 2),
+                )
+            ),
+            'add segments brass cost multiple sixth term'
+        )
 
-    seventh_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                100,
-                add_segments,
-                *repeat(base_segments, 3),
-            )
-        ),
-        'add segments brass cost multiple seventh term'
-    )
+        seventh_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    100,
+                    add_segments,
+                    *repeat(base_segments, 3),
+                )
+            ),
+            'add segments brass cost multiple seventh term'
+        )
 
-    eighth_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                150,
-                add_segments,
-                *repeat(base_segments, 2),
-            )
-        ),
-        'add segments brass cost multiple eighth term'
-    )
+        eighth_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    150,
+                    add_segments,
+                    *repeat(base_segments, 2),
+                )
+            ),
+            'add segments brass cost multiple eighth term'
+        )
 
-    ninth_term, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                50,
-                add_segments,
-                base_segments,
-            )
-        ),
-        'add segments brass cost multiple ninth term'
-    )
+        ninth_term, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    50,
+                    add_segments,
+                    base_segments,
+                )
+            ),
+            'add segments brass cost multiple ninth term'
+        )
 
-    add_segments_brass_cost_multiple, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddDivisionEquality,
-            num=first_term + second_term + third_term + fourth_term + fifth_term + sixth_term + seventh_term + eighth_term + ninth_term,
-            denom=2
-        ),
-        'add segments brass cost multiple'
-    )
+        add_segments_brass_cost_multiple, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddDivisionEquality,
+                num=first_term + second_term + third_term + fourth_term + fifth_term + sixth_term + seventh_term + eighth_term + ninth_term,
+                denom=2
+            ),
+            'add segments brass cost multiple'
+        )
 
-    del first_term, second_term, third_term, fourth_term, fifth_term, sixth_term, seventh_term, eighth_term, ninth_term
+        del first_term, second_term, third_term, fourth_term, fifth_term, sixth_term, seventh_term, eighth_term, ninth_term
 
-    add_segments_brass_cost, *_ = model.NewIntermediateIntVar(
-        partialmethod(BoneMarketModel.AddMultiplicationEquality,
-            variables=(
-                add_segments_brass_cost_multiple,
-                Cost.NEVERCOLD_BRASS.value,
-            )
-        ),
-        'add segments brass cost'
-    )
+        add_segments_brass_cost, *_ = model.NewIntermediateIntVar(
+            partialmethod(BoneMarketModel.AddMultiplicationEquality,
+                variables=(
+                    add_segments_brass_cost_multiple,
+                    Cost.NEVERCOLD_BRASS.value,
+                )
+            ),
+            'add segments brass cost'
+        )
+
+        del add_segments_brass_cost_multiple
 
-    del add_segments, base_segments, add_segments_brass_cost_multiple
+    del add_segments, base_segments
 
 
     cost = model.NewIntVar('cost', lb = 0, ub = maximum_cost)
     model.Add(cost == cp_model.LinearExpr.WeightedSum(actions.values(), [int(action.value.cost) for action in actions.keys()]) + add_joints_amber_cost + add_segments_brass_cost + sale_cost)
 
-    del sale_cost, add_joints_amber_cost, add_segments_brass_cost
+    del add_joints_amber_cost, add_segments_brass_cost
 
 
     # Type of skeleton
     skeleton_in_progress = model.NewIntVar('skeleton in progress', lb = 0)
 
-    # Chimera
-    model.Add(skeleton_in_progress == 100) \
-            .OnlyEnforceIf(actions[Declaration.CHIMERA])
-    # Humanoid
-    model.Add(skeleton_in_progress == 110) \
-            .OnlyEnforceIf(actions[Declaration.HUMANOID]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity == 0))
-    # Ancient Humanoid (UNCERTAIN)
-    model.Add(skeleton_in_progress == 111) \
-            .OnlyEnforceIf(actions[Declaration.HUMANOID]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (1, 5))))
-    # Neanderthal
-    model.Add(skeleton_in_progress == 112) \
-            .OnlyEnforceIf(actions[Declaration.HUMANOID]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 6))
-    # Ape (UNCERTAIN)
-    model.Add(skeleton_in_progress == 120) \
-            .OnlyEnforceIf(actions[Declaration.APE]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Primordial Ape (UNCERTAIN)
-    model.Add(skeleton_in_progress == 121) \
-            .OnlyEnforceIf(actions[Declaration.APE]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 2))
-    # Monkey
-    model.Add(skeleton_in_progress == 125) \
-            .OnlyEnforceIf(actions[Declaration.MONKEY]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity == 0))
-    # Catarrhine Monkey (UNCERTAIN)
-    model.Add(skeleton_in_progress == 126) \
-            .OnlyEnforceIf(actions[Declaration.MONKEY]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (1, 8))))
-    # Catarrhine Monkey
-    model.Add(skeleton_in_progress == 128) \
-            .OnlyEnforceIf(actions[Declaration.MONKEY]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 9))
-    # Crocodile
-    model.Add(skeleton_in_progress == 160) \
-            .OnlyEnforceIf(actions[Declaration.REPTILE]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Dinosaur
-    model.Add(skeleton_in_progress == 161) \
-            .OnlyEnforceIf(actions[Declaration.REPTILE]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (2, 4))))
-    # Mesosaur (UNCERTAIN)
-    model.Add(skeleton_in_progress == 162) \
-            .OnlyEnforceIf(actions[Declaration.REPTILE]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 5))
-    # Toad
-    model.Add(skeleton_in_progress == 170) \
-            .OnlyEnforceIf(actions[Declaration.AMPHIBIAN]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Primordial Amphibian
-    model.Add(skeleton_in_progress == 171) \
-            .OnlyEnforceIf(actions[Declaration.AMPHIBIAN]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (2, 4))))
-    # Temnospondyl
-    model.Add(skeleton_in_progress == 172) \
-            .OnlyEnforceIf(actions[Declaration.AMPHIBIAN]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 5))
-    # Owl
-    model.Add(skeleton_in_progress == 180) \
-            .OnlyEnforceIf(actions[Declaration.BIRD]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Archaeopteryx
-    model.Add(skeleton_in_progress == 181) \
-            .OnlyEnforceIf(actions[Declaration.BIRD]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (2, 4))))
-    # Ornithomimosaur (UNCERTAIN)
-    model.Add(skeleton_in_progress == 182) \
-            .OnlyEnforceIf(actions[Declaration.BIRD]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 5))
-    # Lamprey
-    model.Add(skeleton_in_progress == 190) \
-            .OnlyEnforceIf(actions[Declaration.FISH]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity == 0))
-    # Coelacanth (UNCERTAIN)
-    model.Add(skeleton_in_progress == 191) \
-            .OnlyEnforceIf(actions[Declaration.FISH]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 1))
-    # Spider (UNCERTAIN)
-    model.Add(skeleton_in_progress == 200) \
-            .OnlyEnforceIf(actions[Declaration.SPIDER]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Primordial Orb-Weaver (UNCERTAIN)
-    model.Add(skeleton_in_progress == 201) \
-            .OnlyEnforceIf(actions[Declaration.SPIDER]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (2, 7))))
-    # Trigonotarbid
-    model.Add(skeleton_in_progress == 203) \
-            .OnlyEnforceIf(actions[Declaration.SPIDER]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 8))
-    # Beetle (UNCERTAIN)
-    model.Add(skeleton_in_progress == 210) \
-            .OnlyEnforceIf(actions[Declaration.INSECT]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity <= 1))
-    # Primordial Beetle (UNCERTAIN)
-    model.Add(skeleton_in_progress == 211) \
-            .OnlyEnforceIf(actions[Declaration.INSECT]) \
-            .OnlyEnforceIf(model.BoolExpression(cp_model.BoundedLinearExpression(antiquity, (2, 6))))
-    # Rhyniognatha
-    model.Add(skeleton_in_progress == 212) \
-            .OnlyEnforceIf(actions[Declaration.INSECT]) \
-            .OnlyEnforceIf(model.BoolExpression(antiquity >= 7))
-    # Curator
-    model.Add(skeleton_in_progress == 300) \
-            .OnlyEnforceIf(actions[Declaration.CURATOR])
+    # Antiquity beyond the highest rung of every ladder makes no difference
+    highest_rung = max(minimum_antiquity for ladder in SKELETON_TYPES.values() for minimum_antiquity, _ in ladder)
+    ladder_antiquity = model.NewIntVar('ladder antiquity', lb = 0, ub = highest_rung)
+    model.AddMinEquality(ladder_antiquity, [antiquity, highest_rung])
+
+    declaration_index = model.NewIntVar('declaration index', lb = 0, ub = len(Declaration) - 1)
+    model.Add(declaration_index == cp_model.LinearExpr.WeightedSum([actions[declaration] for declaration in Declaration], list(range(len(Declaration)))))
+
+    model.AddAllowedAssignments(
+            (declaration_index, ladder_antiquity, skeleton_in_progress),
+            (
+                (index, ladder_antiquity, next(skeleton_type for minimum_antiquity, skeleton_type in reversed(SKELETON_TYPES[declaration]) if ladder_antiquity >= minimum_antiquity))
+                for index, declaration in enumerate(Declaration)
+                for ladder_antiquity in range(highest_rung + 1)
+            )
+    )
+
+    del highest_rung, ladder_antiquity, declaration_index
 
 
     # Skull requirements
@@ -683,6 +870,9 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         torso_style >= 20,
     )
 
+    # These equalities are the only link between slots and parts.
+    # Redundant constraints on total limbs, per-torso bounds on parts, and per-buyer bounds on revenue were all tried, and each made some scenarios much slower without consistently helping others.
+
     # Skeleton must have no unfilled skulls
     model.Add(cp_model.LinearExpr.WeightedSum(actions.values(), [action.value.skulls_needed for action in actions.keys()]) == 0)
 
@@ -698,7 +888,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         skeleton_in_progress >= 100,
         primary_revenue == value + zoological_mania_bonus + 5,
         secondary_revenue == 500,
-        difficulty_level == 40*implausibility,
+        ScaledSaleCost(40),
         added_exhaustion == 0,
     )
 
@@ -706,10 +896,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         skeleton_in_progress >= 100,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue,
-            (250, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
+            (250, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
         ),
         secondary_revenue == 0,
-        difficulty_level == 25*implausibility,
+        ScaledSaleCost(25),
         added_exhaustion == 0,
     )
 
@@ -718,10 +908,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         antiquity == 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 1000,
-            (250, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
+            (250, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
         ),
         secondary_revenue == 250*counter_church,
-        difficulty_level == 50*implausibility,
+        ScaledSaleCost(50),
         added_exhaustion == 0,
     )
 
@@ -730,10 +920,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         menace == 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 1000,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         secondary_revenue == 0,
-        difficulty_level == 50*implausibility,
+        ScaledSaleCost(50),
         added_exhaustion == 0,
     )
 
@@ -742,10 +932,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         amalgamy == 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 1000,
-            (250, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
+            (250, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=250)),
         ),
         secondary_revenue == 0,
-        difficulty_level == 50*implausibility,
+        ScaledSaleCost(50),
         added_exhaustion == 0,
     )
 
@@ -754,10 +944,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         antiquity > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         secondary_revenue == 250*(antiquity + (1 if bone_market_fluctuations == Fluctuation.ANTIQUITY else 0)),
-        difficulty_level == 45*implausibility,
+        ScaledSaleCost(45),
         added_exhaustion == 0,
     )
 
@@ -766,10 +956,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         menace > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         secondary_revenue == 250*menace,
-        difficulty_level == 45*implausibility,
+        ScaledSaleCost(45),
         added_exhaustion == 0,
     )
 
@@ -778,10 +968,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         amalgamy > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         secondary_revenue == 250*(amalgamy + (1 if bone_market_fluctuations == Fluctuation.AMALGAMY else 0)),
-        difficulty_level == 45*implausibility,
+        ScaledSaleCost(45),
         added_exhaustion == 0,
     )
 
@@ -790,7 +980,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         antiquity > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -808,18 +998,17 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
                         ) if bone_market_fluctuations == Fluctuation.ANTIQUITY else
                         (
                             4,
-                            antiquity,
-                            antiquity,
+                            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, antiquity)),
                         ),
                     ),
                     denom=5,
                 ),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(antiquity, antiquity)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, antiquity)),
             25,
         ),
     )
@@ -829,7 +1018,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         menace > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (10, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=10)),
+            (10, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=10)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -839,14 +1028,13 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             ) if bone_market_fluctuations == Fluctuation.MENACE else
             (
                 200,
-                menace,
-                menace,
+                partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(menace, menace)),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(menace, menace)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(menace, menace)),
             25,
         ),
     )
@@ -856,7 +1044,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         amalgamy > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -866,14 +1054,13 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             ) if bone_market_fluctuations == Fluctuation.AMALGAMY else
             (
                 200,
-                amalgamy,
-                amalgamy,
+                partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(amalgamy, amalgamy)),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(amalgamy, amalgamy)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(amalgamy, amalgamy)),
             25,
         ),
     )
@@ -884,7 +1071,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         menace > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -908,14 +1095,13 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             ) if bone_market_fluctuations == Fluctuation.ANTIQUITY else
             (
                 250,
-                antiquity,
-                menace,
+                partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, menace)),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(antiquity, menace)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, menace)),
             20,
         ),
     )
@@ -926,7 +1112,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         amalgamy > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (10, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=10)),
+            (10, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=10)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -950,14 +1136,13 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             ) if bone_market_fluctuations == Fluctuation.ANTIQUITY else
             (
                 250,
-                antiquity,
-                amalgamy,
+                partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, amalgamy)),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(antiquity, amalgamy)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(antiquity, amalgamy)),
             20,
         ),
     )
@@ -968,7 +1153,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         menace > 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -992,14 +1177,13 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             ) if bone_market_fluctuations == Fluctuation.AMALGAMY else
             (
                 250,
-                amalgamy,
-                menace,
+                partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(amalgamy, menace)),
             ),
         ),
-        difficulty_level == 75*implausibility,
+        ScaledSaleCost(75),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(amalgamy, menace)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(amalgamy, menace)),
             20,
         ),
     )
@@ -1008,10 +1192,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         cp_model.BoundedLinearExpression(skeleton_in_progress, (110, 119)),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 1000,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value, denom=50)),
         ),
         secondary_revenue == 0,
-        difficulty_level == 50*implausibility,
+        ScaledSaleCost(50),
         added_exhaustion == 0,
     )
 
@@ -1026,7 +1210,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
                 partialmethod(BoneMarketModel.AddApproximateExponentiationEquality, var = skulls-1, exp=1.8, upto=MAXIMUM_ATTRIBUTE),
             ),
         ),
-        difficulty_level == 60*implausibility,
+        ScaledSaleCost(60),
         partialmethod(BoneMarketModel.AddDivisionEquality, added_exhaustion, secondary_revenue, 5000),
     )
 
@@ -1036,10 +1220,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         counter_church == 0,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 300,
-            (3, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=3)),
+            (3, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=3)),
         ),
         secondary_revenue == 250,
-        difficulty_level == 100*implausibility,
+        ScaledSaleCost(100),
         added_exhaustion == 0,
     )
 
@@ -1050,10 +1234,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             attribute >= 4,
             partialmethod(BoneMarketModel.AddMultiplicationEquality,
                 primary_revenue - 100,
-                (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
+                (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
             ),
             partialmethod(BoneMarketModel.AddMultiplicationEquality, secondary_revenue - 250, (250, attribute, implausibility)),
-            difficulty_level == 0,
+            FixedSaleCost(0),
             partialmethod(BoneMarketModel.AddDivisionEquality, added_exhaustion, secondary_revenue, 5000),
         ) for style, attribute in (
                 ('BAZAARINE', amalgamy),
@@ -1067,7 +1251,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         skeleton_in_progress >= 100,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue - 250,
-            (250, partialmethod(BoneMarketModel.AddDivisionEquality, num=value, denom=250)),
+            (250, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value, denom=250)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
@@ -1079,10 +1263,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
                 ),
             ),
         ),
-        difficulty_level == 60*implausibility,
+        ScaledSaleCost(60),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(tentacles, tentacles)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(tentacles, tentacles)),
             100,
         ),
     )
@@ -1094,16 +1278,16 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         legs >= 4,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue,
-            (50, partialmethod(BoneMarketModel.AddDivisionEquality, num = value+zoological_mania_bonus, denom=50)),
+            (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value + zoological_mania_bonus, denom=50)),
         ),
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             secondary_revenue,
             (50, partialmethod(BoneMarketModel.AddApproximateExponentiationEquality, var=legs, exp=2.2, upto=MAXIMUM_ATTRIBUTE)),
         ),
-        difficulty_level == 0,
+        FixedSaleCost(0),
         partialmethod(BoneMarketModel.AddDivisionEquality,
             added_exhaustion,
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, variables=(legs, legs)),
+            partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(legs, legs)),
             100,
         ),
     )
@@ -1113,10 +1297,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         value >= 250,
         partialmethod(BoneMarketModel.AddMultiplicationEquality,
             primary_revenue,
-            (250, partialmethod(BoneMarketModel.AddDivisionEquality, num=value, denom=250)),
+            (250, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value, denom=250)),
         ),
         secondary_revenue == 0,
-        difficulty_level == 200,
+        FixedSaleCost(200),
         added_exhaustion == 0,
     )
 
@@ -1125,7 +1309,7 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
         value + zoological_mania_bonus >= 30000,
         primary_revenue == 31250,
         secondary_revenue == 0,
-        difficulty_level == 100*implausibility,
+        ScaledSaleCost(100),
         added_exhaustion == 0,
     )
 
@@ -1136,10 +1320,10 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             attribute >= 5,
             partialmethod(BoneMarketModel.AddMultiplicationEquality,
                 primary_revenue - 50,
-                (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value, denom=50)),
+                (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value, denom=50)),
             ),
-            partialmethod(BoneMarketModel.AddMultiplicationEquality, secondary_revenue, (50, attribute, attribute)),
-            difficulty_level == 0,
+            partialmethod(BoneMarketModel.AddMultiplicationEquality, secondary_revenue, (50, partialmethod(BoneMarketModel.AddSharedMultiplicationEquality, variables=(attribute, attribute)))),
+            FixedSaleCost(0),
             partialmethod(BoneMarketModel.AddDivisionEquality, added_exhaustion, secondary_revenue, 5000),
         ) for attribute in (
                 amalgamy,
@@ -1152,20 +1336,20 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             *criteria,
             partialmethod(BoneMarketModel.AddMultiplicationEquality,
                 primary_revenue - 50,
-                (50, partialmethod(BoneMarketModel.AddDivisionEquality, num=value, denom=50)),
+                (50, partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=value, denom=50)),
             ),
             partialmethod(BoneMarketModel.AddMultiplicationEquality,
                 secondary_revenue,
                 (
                     50,
                     partialmethod(BoneMarketModel.AddApproximateExponentiationEquality,
-                        var=partialmethod(BoneMarketModel.AddDivisionEquality, num = amalgamy+antiquity+menace, denom=3),
+                        var=partialmethod(BoneMarketModel.AddSharedDivisionEquality, num=amalgamy + antiquity + menace, denom=3),
                         exp=2.2,
                         upto=MAXIMUM_ATTRIBUTE,
                     ),
                 ),
             ),
-            difficulty_level == 0,
+            FixedSaleCost(0),
             partialmethod(BoneMarketModel.AddDivisionEquality, added_exhaustion, secondary_revenue, 5000),
         ) for fascination, criteria in (
                 ('AMPHIBIAN', (cp_model.BoundedLinearExpression(skeleton_in_progress, (170, 179)),)),
@@ -1205,6 +1389,76 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
 
     model.Maximize(profit_margin)
 
+    return model, actions, {
+            'shadowy_level': shadowy,
+            'torso_style': torso_style,
+            'skulls': skulls,
+            'arms': arms,
+            'legs': legs,
+            'tails': tails,
+            'wings': wings,
+            'fins': fins,
+            'segments': segments,
+            'tentacles': tentacles,
+            'value': value,
+            'zoological_mania_bonus': zoological_mania_bonus,
+            'amalgamy': amalgamy,
+            'antiquity': antiquity,
+            'menace': menace,
+            'implausibility': implausibility,
+            'counter_church': counter_church,
+            'exhaustion': exhaustion,
+            'skeleton_in_progress': skeleton_in_progress,
+            'primary_revenue': primary_revenue,
+            'secondary_revenue': secondary_revenue,
+            'total_revenue': total_revenue,
+            'cost': cost,
+            'net_profit': net_profit,
+            'profit_margin': profit_margin,
+            }
+
+
+def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = float('inf'), workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False, blacklist = [], prune_dominated = True, cost_tables = False, precheck = True, search_strategy = 'default', value_heuristic = 'min', preset = None, presets_file = PRESETS_FILE, profile_memory = False, greedy_hint = True, on_greedy = None, stdscr = None):
+    # A skeleton built greedily is shown before the model is built, and helps the solver find a good first solution
+    greedy = None
+    if greedy_hint:
+        from .greedy import GreedySkeleton
+
+        greedy = GreedySkeleton(shadowy_level, bone_market_fluctuations, zoological_mania, occasional_buyer, diplomat_fascination, desired_buyers, maximum_cost, maximum_exhaustion, blacklist, prune_dominated)
+
+    if greedy is not None:
+        if stdscr is not None:
+            stdscr.clear()
+            stdscr.addstr(str(greedy))
+            stdscr.addstr(stdscr.getmaxyx()[0] - 1, 0, "Greedy skeleton")
+            stdscr.refresh()
+
+        if on_greedy is not None:
+            on_greedy(greedy)
+
+    build = partial(CreateModel,
+            shadowy_level = shadowy_level,
+            bone_market_fluctuations = bone_market_fluctuations,
+            zoological_mania = zoological_mania,
+            occasional_buyer = occasional_buyer,
+            diplomat_fascination = diplomat_fascination,
+            desired_buyers = desired_buyers,
+            maximum_cost = maximum_cost,
+            maximum_exhaustion = maximum_exhaustion,
+            blacklist = blacklist,
+            prune_dominated = prune_dominated,
+            cost_tables = cost_tables,
+            precheck = precheck,
+            )
+
+    if profile_memory:
+        (model, actions, qualities), memory = ProfileBuild(build)
+    else:
+        model, actions, qualities = build()
+
+
+    # Imported here, since results are described in terms of this module
+    from .result import SolveResult
 
     class SkeletonPrinter(cp_model.CpSolverSolutionCallback):
         """A class that prints the steps that comprise a skeleton as well as relevant attributes."""
@@ -1215,47 +1469,12 @@ def Solve(shadowy_level, bone_market_fluctuations = None, zoological_mania = Non
             cp_model.CpSolverSolutionCallback.__init__(self)
             self.__solution_count = 0
 
-        def PrintableSolution(self, solver = None):
-            """Print the latest solution of a provided solver."""
-
-            output = ""
-
-            # Allows use as a callback
-            if solver is None:
-                solver = self
-
-            for action in actions.keys():
-                for _ in range(int(solver.Value(actions[action]))):
-                    output += str(action) + "\n"
-
-            output += f"""
-Profit: £{solver.Value(net_profit)/100:,.2f}
-Profit Margin: {solver.Value(profit_margin)/PROFIT_MARGIN_MULTIPLIER:+,.2%}
-
-Total Revenue: £{solver.Value(total_revenue)/100:,.2f}
-Primary Revenue: £{solver.Value(primary_revenue)/100:,.2f}
-Secondary Revenue: £{solver.Value(secondary_revenue)/100:,.2f}
-
-Cost: £{solver.Value(cost)/100:,.2f}
-
-Value: £{solver.Value(value)/100:,.2f}
-Amalgamy: {solver.Value(amalgamy):n}
-Antiquity: {solver.Value(antiquity):n}
-Menace: {solver.Value(menace):n}
-Counter-Church: {solver.Value(counter_church):n}
-Implausibility: {solver.Value(implausibility):n}
-
-Exhaustion: {solver.Value(exhaustion):n}"""
-
-            return output
-
-
         def OnSolutionCallback(self):
             self.__solution_count += 1
 
             # Prints current solution to window
             stdscr.clear()
-            stdscr.addstr(self.PrintableSolution())
+            stdscr.addstr(str(SolveResult.FromResponse(self.Response(), actions, qualities, 'FEASIBLE')))
 
             stdscr.addstr(stdscr.getmaxyx()[0] - 1, 0, f"Skeleton #{self.__solution_count:n}")
 
@@ -1268,17 +1487,41 @@ Exhaustion: {solver.Value(exhaustion):n}"""
 
     printer = SkeletonPrinter()
 
-    solver = cp_model.CpSolver()
-    if workers:
-        solver.parameters.num_workers = workers
-    solver.parameters.max_time_in_seconds = time_limit
+    if greedy is not None:
+        counts = dict(greedy.actions)
+
+        # Excluded actions may share a single constant, which can only be hinted once
+        for variable, value in {variable.Index(): (variable, counts.get(action, 0)) for action, variable in actions.items()}.values():
+            model.AddHint(variable, value)
+
+        del counts
+
+    solver = NewSolver(time_limit, workers, deterministic_time, random_seed, interleave_search)
+
+    if preset is not None:
+        ApplyParameters(solver, LoadPreset(preset, presets_file))
+
+    AddSearchStrategy(model, actions, solver, search_strategy, value_heuristic)
 
     # There's no window in verbose mode
     if stdscr is None:
+        if prune_dominated:
+            print(*(f"Pruned {dominated}, which is dominated by {dominator}" for dominated, dominator in DominatedActions(occasional_buyer, diplomat_fascination, desired_buyers, blacklist).items()), sep="\n")
+
+        if precheck:
+            from .feasibility import FeasibleCombinations
+
+            feasible = FeasibleCombinations(occasional_buyer, diplomat_fascination, desired_buyers, blacklist, bone_market_fluctuations, prune_dominated)
+            combinations = len(Torso)*len(Declaration)*len(AvailableBuyers(occasional_buyer, diplomat_fascination, desired_buyers))
+            print(f"Ruled out {combinations - len(feasible)} of {combinations} combinations of torso, declaration, and buyer")
+            print(*(f"{torso} can only become: {', '.join(declaration.name.title() for declaration in Declaration if any((torso, declaration, buyer) in feasible for buyer in Buyer)) or 'nothing'}" for torso in Torso), sep="\n")
+
         solver.parameters.log_search_progress = True
-        solver.Solve(model)
-    else:
-        solver.Solve(model, printer)
+
+    if profile_memory:
+        ResetPeakResidentSetSize()
+
+    solver.Solve(model, printer if stdscr is not None else None)
 
     status = solver.StatusName()
 
@@ -1286,7 +1529,15 @@ Exhaustion: {solver.Value(exhaustion):n}"""
         raise RuntimeError("There is no satisfactory skeleton.")
     elif status == 'FEASIBLE':
         print("WARNING: skeleton may be suboptimal.")
+    elif status == 'UNKNOWN' and greedy is not None:
+        print("WARNING: the solver found nothing within the time limit, so the greedy skeleton is returned. It may be far from optimal.")
     elif status != 'OPTIMAL':
         raise RuntimeError(f"Unknown status returned: {status}.")
 
-    return printer.PrintableSolution(solver)
+    # The solver may run out of time before finding anything, but the greedy skeleton is still valid
+    result = SolveResult.FromResponse(solver.ResponseProto(), actions, qualities) if status != 'UNKNOWN' else replace(greedy, wall_time = solver.WallTime(), deterministic_time = solver.ResponseProto().deterministic_time)
+
+    if profile_memory:
+        result = replace(result, memory = replace(memory, proto_size = model.Proto().ByteSize(), solve_peak_rss = PeakResidentSetSize()))
+
+    return result
@@ -0,0 +1,136 @@
+"""Find how the best skeleton changes with Shadowy by solving one model for a range of levels."""
+
+__all__ = ['PrintableSweep', 'SolveShadowySweep', 'SweepPoint']
+__author__ = "Jeremy Saklad"
+
+from dataclasses import dataclass
+from os import cpu_count
+
+from ortools.sat.python import cp_model
+
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.torsos import Torso
+from .presets import PRESETS_FILE, ApplyParameters, LoadPreset
+from .solve import PROFIT_MARGIN_MULTIPLIER, AddSearchStrategy, CreateModel, NewSolver
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """The best skeleton found at a certain level of Shadowy."""
+
+    shadowy_level: int
+
+    net_profit: int = 0
+
+    # Multiplied by PROFIT_MARGIN_MULTIPLIER
+    profit_margin: int = 0
+
+    # Each action used by the skeleton and the number of times it is used
+    actions: tuple = ()
+
+    # Whether the solver proved that no better skeleton exists at this level
+    optimal: bool = False
+
+    def Action(self, enum):
+        """Return the first action of the specified enumeration used by the skeleton."""
+        return next((action for action, _ in self.actions if isinstance(action, enum)), None)
+
+
+def PrintableSweep(points, deterministic_time = None):
+    """Format sweep points as a table with one row for each range of levels that share a recipe, followed by the actions that change at each breakpoint."""
+
+    output = f"{'Shadowy':>9}  {'Profit':>25}  {'Profit Margin':>17}  Torso / Declaration / Buyer\n"
+
+    # Consecutive points with the same recipe, so each group starts at a breakpoint
+    groups = []
+    for point in points:
+        if groups and groups[-1][-1].actions == point.actions:
+            groups[-1].append(point)
+        else:
+            groups.append([point])
+
+    def Span(start, end):
+        return start if start == end else f"{start} to {end}"
+
+    for group in groups:
+        first, last = group[0], group[-1]
+        levels = f"{first.shadowy_level}" if first is last else f"{first.shadowy_level}-{last.shadowy_level}"
+        profit = Span(f"£{first.net_profit/100:,.2f}", f"£{last.net_profit/100:,.2f}")
+        margin = Span(f"{first.profit_margin/PROFIT_MARGIN_MULTIPLIER:+.2%}", f"{last.profit_margin/PROFIT_MARGIN_MULTIPLIER:+.2%}")
+        suboptimal = not all(point.optimal for point in group)
+
+        output += f"{levels:>9}{'*' if suboptimal else ' '} {profit:>25}  {margin:>17}  {first.Action(Torso).name} / {first.Action(Declaration).name} / {first.Action(Buyer).name}\n"
+
+    for previous, group in zip(groups, groups[1:]):
+        before, after = dict(previous[-1].actions), dict(group[0].actions)
+        changes = sorted((action for action in {*before, *after} if before.get(action, 0) != after.get(action, 0)), key = lambda action : (type(action).__name__, action.name))
+
+        output += f"\nAt Shadowy {group[0].shadowy_level}:\n"
+        output += "".join(f"    {action}: {before.get(action, 0)} -> {after.get(action, 0)}\n" for action in changes)
+
+    if not all(point.optimal for point in points):
+        output += "\n* skeleton may be suboptimal for some of these levels"
+
+    if deterministic_time is not None:
+        output += f"\nDeterministic Time: {deterministic_time:,.2f}s"
+
+    return output.rstrip()
+
+
+def SolveShadowySweep(shadowy_levels, bone_market_fluctuations = None, zoological_mania = None, occasional_buyer = None, diplomat_fascination = None, desired_buyers = [], maximum_cost = cp_model.INT32_MAX, maximum_exhaustion = cp_model.INT32_MAX, time_limit = float('inf'), workers = cpu_count(), deterministic_time = float('inf'), random_seed = None, interleave_search = False, blacklist = [], prune_dominated = True, cost_tables = False, precheck = True, search_strategy = 'default', value_heuristic = 'min', preset = None, presets_file = PRESETS_FILE):
+    """Find the best skeleton at each level of Shadowy in ascending order, and print where the recipe changes.
+
+A single model is built for every level, with Shadowy fixed by its bounds before each solve. Each solve is hinted with the skeleton found at the previous level. `time_limit` and `deterministic_time` apply to each solve."""
+
+    model, actions, qualities = CreateModel(
+            shadowy_level = shadowy_levels,
+            bone_market_fluctuations = bone_market_fluctuations,
+            zoological_mania = zoological_mania,
+            occasional_buyer = occasional_buyer,
+            diplomat_fascination = diplomat_fascination,
+            desired_buyers = desired_buyers,
+            maximum_cost = maximum_cost,
+            maximum_exhaustion = maximum_exhaustion,
+            blacklist = blacklist,
+            prune_dominated = prune_dominated,
+            cost_tables = cost_tables,
+            precheck = precheck,
+            )
+
+    solver = NewSolver(time_limit, workers, deterministic_time, random_seed, interleave_search)
+    if preset is not None:
+        ApplyParameters(solver, LoadPreset(preset, presets_file))
+
+    AddSearchStrategy(model, actions, solver, search_strategy, value_heuristic)
+
+    points = []
+    total_deterministic_time = 0.0
+
+    for level in sorted(shadowy_levels):
+        model.SetBounds(qualities['shadowy_level'], level, level)
+
+        status = solver.Solve(model)
+        total_deterministic_time += solver.ResponseProto().deterministic_time
+
+        # Levels too low to sell to any buyer have no skeleton to report
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            continue
+
+        # Selling only becomes easier with more Shadowy, so the last skeleton is usually still valid.
+        # Only its actions are hinted, since Shadowy and everything that depends on it will change.
+        model.ClearHints()
+        for variable, value in {variable.Index(): (variable, solver.Value(variable)) for variable in actions.values()}.values():
+            model.AddHint(variable, value)
+
+        points.append(SweepPoint(
+            shadowy_level = level,
+            net_profit = solver.Value(qualities['net_profit']),
+            profit_margin = solver.Value(qualities['profit_margin']),
+            actions = tuple((action, count) for action, variable in actions.items() if (count := solver.Value(variable))),
+            optimal = status == cp_model.OPTIMAL,
+            ))
+
+    if not points:
+        raise RuntimeError("There is no satisfactory skeleton.")
+
+    return PrintableSweep(points, total_deterministic_time)
@@ -0,0 +1,166 @@
+"""Find the CP-SAT parameters that solve each class of scenario fastest, and save them as presets."""
+
+__all__ = ['CANDIDATES', 'SCENARIO_CLASSES', 'Tune']
+__author__ = "Jeremy Saklad"
+
+import argparse
+from os import cpu_count
+from typing import Final
+
+from ortools.sat.python import cp_model
+
+from .data.buyers import Buyer
+from .data.declarations import Declaration
+from .data.fluctuations import Fluctuation
+from .data.occasional_buyers import OccasionalBuyer
+from .presets import PRESETS_FILE, ApplyParameters, SavePresets
+from .solve import PROFIT_MARGIN_MULTIPLIER, CreateModel, NewSolver
+
+# Candidate parameter sets, as named in SatParameters
+CANDIDATES: Final = {
+        'default': {},
+        'linearization-0': {'linearization_level': 0},
+        'linearization-2': {'linearization_level': 2},
+        'symmetry-0': {'symmetry_level': 0},
+        'symmetry-4': {'symmetry_level': 4},
+        'no-presolve': {'cp_model_presolve': False},
+        'light-presolve': {'max_presolve_iterations': 1, 'cp_model_probing_level': 0},
+        'lp-workers': {'subsolvers': ['default_lp', 'max_lp', 'reduced_costs', 'pseudo_costs']},
+        'no-lp-workers': {'subsolvers': ['no_lp', 'quick_restart_no_lp', 'core']},
+        'no-lns': {'ignore_subsolvers': ['graph_arc_lns', 'graph_cst_lns', 'graph_dec_lns', 'graph_var_lns', 'rins/rens', 'rnd_cst_lns', 'rnd_var_lns']},
+        'portfolio-search': {'search_branching': 'PORTFOLIO_SEARCH'},
+        'pseudo-cost-search': {'search_branching': 'PSEUDO_COST_SEARCH'},
+        'lp-search': {'search_branching': 'LP_SEARCH'},
+        }
+
+# Representative scenarios for each class, as keyword arguments to CreateModel
+SCENARIO_CLASSES: Final = {
+        'fixed-buyer': (
+            {'shadowy_level': 200, 'desired_buyers': [Buyer.A_PALAEONTOLOGIST_WITH_HOARDING_PROPENSITIES]},
+            {'shadowy_level': 200, 'desired_buyers': [Buyer.A_TENTACLED_SERVANT], 'maximum_exhaustion': 2},
+            {'shadowy_level': 200, 'desired_buyers': [Buyer.A_NAIVE_COLLECTOR]},
+            ),
+        'open-buyer': (
+            {'shadowy_level': 300},
+            {'shadowy_level': 300, 'occasional_buyer': OccasionalBuyer.AN_ENTHUSIAST_IN_SKULLS, 'maximum_exhaustion': 4},
+            ),
+        'fluctuation': (
+            {'shadowy_level': 300, 'bone_market_fluctuations': Fluctuation.ANTIQUITY, 'zoological_mania': Declaration.FISH},
+            {'shadowy_level': 200, 'bone_market_fluctuations': Fluctuation.MENACE, 'desired_buyers': [Buyer.A_TELLER_OF_TERRORS]},
+            ),
+        }
+
+
+def Tune(scenario_classes = SCENARIO_CLASSES, candidates = CANDIDATES, deterministic_time = 10.0, time_limit = float('inf'), workers = cpu_count(), random_seed = None, interleave_search = True):
+    """Solve every scenario with every candidate, and choose the candidate with the least total deterministic time to optimal for each class.
+
+Solves that are not proven optimal within `deterministic_time` count as taking twice as long. Deterministic time counts work done rather than time elapsed, so repeated runs with a fixed `random_seed` choose the same presets, unless `time_limit` cuts a solve short or `interleave_search` is unset with several workers. Candidates that take as long as each other are compared by the total gap between the profit margin found and its bound, so that a class that is never solved to optimality still gets the candidate that came closest.
+
+Returns a dictionary mapping each class to its best preset, recording the number of `workers` it was tuned with, and a table of times."""
+
+    output = f"{'Class':>12}  {'Candidate':>18}  {'Optimal':>7}  {'Time':>9}  {'Gap':>9}\n"
+    presets = {}
+
+    for scenario_class, scenarios in scenario_classes.items():
+        scores = {}
+
+        for name, parameters in candidates.items():
+            optimal = 0
+            time, gap = 0.0, 0.0
+
+            for scenario in scenarios:
+                model, _, _ = CreateModel(**scenario)
+
+                solver = NewSolver(time_limit, workers, deterministic_time, random_seed, interleave_search)
+                ApplyParameters(solver, parameters)
+
+                status = solver.Solve(model)
+
+                if status == cp_model.OPTIMAL:
+                    optimal += 1
+                    time += solver.ResponseProto().deterministic_time
+                else:
+                    time += 2*deterministic_time
+                    gap += solver.BestObjectiveBound() - solver.ObjectiveValue() if status == cp_model.FEASIBLE else float('inf')
+
+            scores[name] = (time, gap)
+
+            output += f"{scenario_class:>12}  {name:>18}  {f'{optimal}/{len(scenarios)}':>7}  {time:>8.2f}s  {gap/PROFIT_MARGIN_MULTIPLIER:>9.2%}\n"
+
+        # Ties go to the earlier candidate, so the defaults win unless something is actually better
+        best = min(scores, key = scores.get)
+        presets[scenario_class] = {'parameters': candidates[best], 'workers': workers}
+
+        output += f"Best for {scenario_class}: {best}\n\n"
+
+    return presets, output.rstrip()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            prog='python -m bonemarketsolver.tuning',
+            description="Find the CP-SAT parameters that solve each class of scenario fastest, and save them as presets named after each class.",
+            )
+
+    parser.add_argument(
+            "-c", "--classes",
+            nargs="+",
+            choices=SCENARIO_CLASSES.keys(),
+            default=SCENARIO_CLASSES.keys(),
+            help="classes of scenario to tune (default: all)",
+            dest='classes'
+            )
+
+    parser.add_argument(
+            "-o", "--output",
+            default=PRESETS_FILE,
+            help=f"file to save presets to, keeping presets for other classes (default: {PRESETS_FILE} in the working directory)",
+            dest='output'
+            )
+
+    parser.add_argument(
+            "-d", "--deterministic-time",
+            default=10.0,
+            type=float,
+            help="maximum number of deterministic seconds to run each solve, which is the same on every machine",
+            dest='deterministic_time'
+            )
+
+    parser.add_argument(
+            "-t", "--time-limit",
+            default=float('inf'),
+            type=float,
+            help="maximum number of seconds to run each solve, which makes the presets chosen depend on the machine",
+            dest='time_limit'
+            )
+
+    parser.add_argument(
+            "-w", "--workers",
+            default=cpu_count(),
+            type=int,
+            help="number of search worker threads to run in parallel",
+            dest='workers'
+            )
+
+    parser.add_argument(
+            "-s", "--seed",
+            type=int,
+            help="random seed for the solver",
+            dest='random_seed'
+            )
+
+    parser.add_argument(
+            "-i", "--interleave-search",
+            action=argparse.BooleanOptionalAction,
+            default=True,
+            help="whether workers should take turns, which makes results repeatable with several workers (default: true)",
+            dest='interleave_search'
+            )
+
+    args = parser.parse_args()
+
+    presets, output = Tune({scenario_class: SCENARIO_CLASSES[scenario_class] for scenario_class in args.classes}, deterministic_time=args.deterministic_time, time_limit=args.time_limit, workers=args.workers, random_seed=args.random_seed, interleave_search=args.interleave_search)
+    print(output)
+
+    SavePresets(presets, args.output)
+    print(f"\nSaved presets to {args.output}")